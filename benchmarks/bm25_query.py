@@ -0,0 +1,71 @@
+"""
+BM25 index build time and query latency at scale.
+
+Usage:
+    python benchmarks/bm25_query.py [--sizes 10000,100000] [--queries 200]
+
+Indexes synthetic job descriptions and times queries made of a typical
+resume's skills / tools / roles (about 15 terms), reporting p50 / p95 /
+p99 latency per index size.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.bm25 import BM25Index  # noqa: E402
+
+# Zipf-ish vocabulary: a few very common terms, a long tail of rare ones
+VOCAB = [f"term{i}" for i in range(20000)]
+WEIGHTS = [1.0 / (i + 1) for i in range(len(VOCAB))]
+
+
+def make_docs(n: int, rng: random.Random) -> list[str]:
+    return [
+        " ".join(rng.choices(VOCAB, weights=WEIGHTS, k=rng.randint(80, 400)))
+        for _ in range(n)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--terms", type=int, default=15)
+    parser.add_argument("--top-k", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        docs = make_docs(size, rng)
+
+        index = BM25Index()
+        start = time.perf_counter()
+        index.add_many(docs)
+        build = time.perf_counter() - start
+
+        queries = [
+            rng.choices(VOCAB[:2000], k=args.terms) for _ in range(args.queries)
+        ]
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, top_k=args.top_k)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(
+            f"{size:>7} jobs: build {build:6.2f}s ({size / build:,.0f} docs/s), "
+            f"query p50 {p50:6.2f} ms  p95 {p95:6.2f} ms  p99 {p99:6.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
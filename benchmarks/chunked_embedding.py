@@ -0,0 +1,66 @@
+"""
+Cost of chunk-and-pool document embeddings vs one truncating encode.
+
+Usage:
+    python benchmarks/chunked_embedding.py [--jobs 200] [--words 600]
+
+Synthetic job descriptions of about `--words` words are embedded with
+`EmbeddingModel.embed` (one batched encode, truncated at the model's
+input length) and with `embed_documents` (overlapping windows, one
+length-sorted encode across all jobs, pooled). The second
+`embed_documents` pass is served from the chunk cache.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.settings import settings  # noqa: E402
+from tools.embedding import EmbeddingModel, chunk_text  # noqa: E402
+
+WORDS = (
+    "python java sql aws docker kubernetes spark react team build ship "
+    "scalable services data pipelines models product design experience "
+    "years strong communication remote hybrid benefits equity growth"
+).split()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--words", type=int, default=600)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    descriptions = [
+        " ".join(rng.choices(WORDS, k=rng.randint(args.words // 2, args.words)))
+        for _ in range(args.jobs)
+    ]
+    chunks = sum(
+        len(chunk_text(
+            d, settings.EMBEDDING_CHUNK_WORDS, settings.EMBEDDING_CHUNK_OVERLAP_WORDS
+        ))
+        for d in descriptions
+    )
+
+    model = EmbeddingModel()
+    model.embed(descriptions[:8])  # load + warm up
+
+    print(f"{args.jobs} descriptions, {chunks} windows")
+    for name, run in (
+        ("embed (truncated)", lambda: model.embed(descriptions)),
+        ("embed_documents", lambda: model.embed_documents(descriptions)),
+        ("  cached", lambda: model.embed_documents(descriptions)),
+    ):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        print(f"{name:<20}{elapsed:>8.2f}s{args.jobs / elapsed:>10,.0f} docs/s")
+
+
+if __name__ == "__main__":
+    main()
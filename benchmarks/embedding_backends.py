@@ -0,0 +1,93 @@
+"""
+Accuracy and CPU throughput check for the embedding backends.
+
+Usage:
+    python benchmarks/embedding_backends.py [--texts N] [--threads N]
+                                            [--tolerance 0.98]
+
+Embeds the same synthetic job descriptions with the fp32 torch backend
+and the ONNX Runtime backend (fp32 and int8), verifies that every ONNX
+embedding stays within `tolerance` cosine similarity of its torch
+counterpart, and reports texts/sec for each backend.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.embedding import DEFAULT_EMBEDDING_MODEL, EmbeddingModel  # noqa: E402
+
+WORDS = (
+    "python machine learning engineer data pipelines sql nlp pytorch "
+    "tensorflow kubernetes docker aws gcp spark airflow remote intern "
+    "senior team product analytics research deploy models experience "
+    "years communication fraud detection recommendation systems"
+).split()
+
+
+def make_texts(n: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 200)))
+        for _ in range(n)
+    ]
+
+
+def throughput(model: EmbeddingModel, texts: list[str]) -> tuple[np.ndarray, float]:
+    model.embed(texts[:8])  # load + warm up
+    start = time.perf_counter()
+    embeddings = model.embed(texts)
+    elapsed = time.perf_counter() - start
+    return embeddings, len(texts) / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.98)
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts)
+
+    reference = EmbeddingModel(
+        DEFAULT_EMBEDDING_MODEL, backend="torch", num_threads=args.threads
+    )
+    ref_emb, ref_tps = throughput(reference, texts)
+    print(f"torch fp32 : {ref_tps:8.1f} texts/sec")
+
+    failed = False
+    for quantize in (False, True):
+        label = "onnx int8 " if quantize else "onnx fp32 "
+        model = EmbeddingModel(
+            DEFAULT_EMBEDDING_MODEL,
+            backend="onnx",
+            quantize=quantize,
+            num_threads=args.threads,
+        )
+        emb, tps = throughput(model, texts)
+
+        # Both sides are L2-normalized, so the row-wise dot is the cosine
+        cos = np.sum(ref_emb * emb, axis=1)
+        ok = cos.min() >= args.tolerance
+        failed |= not ok
+
+        print(
+            f"{label}: {tps:8.1f} texts/sec "
+            f"({tps / ref_tps:.2f}x)  "
+            f"cosine vs fp32 min={cos.min():.4f} mean={cos.mean():.4f} "
+            f"[{'ok' if ok else 'FAIL'}]"
+        )
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
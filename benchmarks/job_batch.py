@@ -0,0 +1,104 @@
+"""
+Memory and construction time: pydantic Jobs vs the columnar JobBatch.
+
+Usage:
+    python benchmarks/job_batch.py [--jobs 100000] [--syndication 0.3]
+
+Synthetic postings arrive as JSON lines (as from the search API, so
+every string is a fresh object). Each representation is built from them
+and the memory it retains is measured with tracemalloc. `--syndication`
+is the share of postings whose description repeats an earlier one.
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from schemas.job import Job  # noqa: E402
+from schemas.job_batch import JobBatch  # noqa: E402
+
+WORDS = (
+    "python java sql aws docker kubernetes spark react team build ship "
+    "scalable services data pipelines models product design experience "
+    "years strong communication remote hybrid benefits equity growth"
+).split()
+
+
+def make_lines(n: int, syndication: float, rng: random.Random) -> list[bytes]:
+    companies = [f"Company {i} Inc" for i in range(2000)]
+    locations = [f"City {i}" for i in range(200)] + [None]
+    descriptions: list[str] = []
+    lines = []
+    for i in range(n):
+        if descriptions and rng.random() < syndication:
+            description = rng.choice(descriptions)
+        else:
+            description = " ".join(rng.choices(WORDS, k=rng.randint(150, 400)))
+            descriptions.append(description)
+        lines.append(json.dumps({
+            "job_id": f"job-{i}",
+            "title": f"Engineer {rng.randint(0, 5000)}",
+            "company": rng.choice(companies),
+            "location": rng.choice(locations),
+            "employment_type": rng.choice(["Full-time", "Contract", "Intern"]),
+            "description": description,
+            "skills": rng.sample(WORDS[:8], k=3),
+            "source": "google_jobs",
+            "url": f"https://example.com/jobs/{i}",
+        }).encode("utf-8"))
+    return lines
+
+
+def build_models(lines: list[bytes]) -> list[Job]:
+    return [Job(**json.loads(line)) for line in lines]
+
+
+def build_batch(lines: list[bytes]) -> JobBatch:
+    batch = JobBatch()
+    for line in lines:
+        batch.append(**json.loads(line))
+    return batch
+
+
+def measure(build, lines: list[bytes]) -> tuple[float, float]:
+    # Timed without tracemalloc, which slows allocation-heavy code
+    gc.collect()
+    start = time.perf_counter()
+    result = build(lines)
+    elapsed = time.perf_counter() - start
+    del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = build(lines)
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, retained / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--syndication", type=float, default=0.3)
+    args = parser.parse_args()
+
+    lines = make_lines(args.jobs, args.syndication, random.Random(0))
+
+    print(f"{args.jobs} jobs, {args.syndication:.0%} syndicated descriptions")
+    print(f"{'representation':<18}{'build s':>10}{'jobs/s':>12}{'MiB':>10}")
+    for name, build in (("pydantic Job", build_models), ("JobBatch", build_batch)):
+        elapsed, mib = measure(build, lines)
+        print(f"{name:<18}{elapsed:>10.2f}{args.jobs / elapsed:>12,.0f}{mib:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Scaling benchmark for multi-process embedding.
+
+Usage:
+    python benchmarks/multiprocess_encode.py [--texts N] [--workers 1,2,4,8]
+
+Embeds N synthetic job descriptions in-process and through
+`EmbeddingModel.embed_stream` with an increasing number of worker
+processes, checks that results match the single-process output row for
+row, and reports throughput and speed-up per worker count.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.embedding_backends import make_texts  # noqa: E402
+from tools.embedding import DEFAULT_EMBEDDING_MODEL, EmbeddingModel  # noqa: E402
+
+
+def main() -> None:
+    cpus = os.cpu_count() or 1
+    default_workers = ",".join(
+        str(n) for n in (1, 2, 4, 8, 16, 32) if n <= cpus
+    )
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=4000)
+    parser.add_argument("--workers", default=default_workers)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--model", default=DEFAULT_EMBEDDING_MODEL)
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts)
+
+    # Single-process, single-thread baseline
+    baseline = EmbeddingModel(args.model, num_threads=1)
+    baseline.embed(texts[:8])
+    start = time.perf_counter()
+    reference = baseline.embed(texts)
+    base_tps = len(texts) / (time.perf_counter() - start)
+    print(f"in-process (1 thread): {base_tps:8.1f} texts/sec")
+
+    for workers in (int(w) for w in args.workers.split(",")):
+        model = EmbeddingModel(args.model)
+        model.start_multi_process_pool(num_workers=workers)
+        try:
+            # Warm-up so worker model loading isn't timed
+            model.embed_many(texts[: workers * args.batch_size])
+
+            start = time.perf_counter()
+            embeddings = model.embed_many(texts, batch_size=args.batch_size)
+            tps = len(texts) / (time.perf_counter() - start)
+        finally:
+            model.stop_multi_process_pool()
+
+        max_err = float(np.abs(embeddings - reference).max())
+        print(
+            f"{workers:3d} worker(s):        {tps:8.1f} texts/sec "
+            f"({tps / base_tps:.2f}x, efficiency {tps / base_tps / workers:.0%}, "
+            f"max abs diff {max_err:.1e})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Single-core throughput of the Aho-Corasick skill extractor.
+
+Usage:
+    python benchmarks/skill_extraction.py [--docs 5000] [--words 400]
+
+Builds synthetic job descriptions that mix vocabulary skills with filler
+text and reports descriptions/sec and the average number of skills
+found per description. Before timing, it checks that ambiguous short
+names (go, r, c) used as plain words are not reported as skills.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.skills import DEFAULT_SKILL_ALIASES, SkillExtractor  # noqa: E402
+
+FILLER = (
+    "we are looking for a motivated engineer to join our growing team "
+    "you will work closely with product and design to ship features "
+    "experience with modern tooling and strong communication skills"
+).split()
+
+
+def make_docs(n: int, words: int, rng: random.Random) -> list[str]:
+    skills = [name for name in DEFAULT_SKILL_ALIASES]
+    docs = []
+    for _ in range(n):
+        body = rng.choices(FILLER, k=words)
+        for _ in range(rng.randint(3, 15)):
+            body.insert(rng.randrange(len(body)), rng.choice(skills) + ",")
+        docs.append(" ".join(body))
+    return docs
+
+
+# Plain-English uses of ambiguous names must not be reported as skills
+AMBIGUITY_CHECKS = {
+    "We go to market fast and iterate. R and C are fine.": [],
+    "Golang services, RStudio notebooks and C++.": ["Go", "R", "C++"],
+}
+
+
+def check_ambiguous_names(extractor: SkillExtractor) -> None:
+    for text, expected in AMBIGUITY_CHECKS.items():
+        found = extractor.extract(text)
+        if found != expected:
+            raise SystemExit(f"extract({text!r}) = {found}, expected {expected}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--words", type=int, default=400)
+    args = parser.parse_args()
+
+    docs = make_docs(args.docs, args.words, random.Random(0))
+
+    start = time.perf_counter()
+    extractor = SkillExtractor()
+    build = time.perf_counter() - start
+    check_ambiguous_names(extractor)
+
+    start = time.perf_counter()
+    found = extractor.extract_many(docs)
+    elapsed = time.perf_counter() - start
+
+    print(f"automaton build: {build * 1000:.1f} ms")
+    print(
+        f"{args.docs} descriptions of ~{args.words} words: "
+        f"{args.docs / elapsed:,.0f} docs/sec, "
+        f"{sum(map(len, found)) / args.docs:.1f} skills/doc"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Cold-start benchmark based on `python -X importtime`.
+
+Usage:
+    python benchmarks/startup_time.py [module] [--top N] [--runs N]
+
+Imports `module` (default: main) in a fresh interpreter, reports the
+wall-clock boot time and the slowest imports by cumulative time, and
+flags any heavy dependency that was imported eagerly.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that must only be imported on first use
+HEAVY_MODULES = ("torch", "sentence_transformers", "groq", "onnxruntime")
+
+
+def run_once(module: str) -> Tuple[float, str]:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - start
+
+    if proc.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{proc.stderr}")
+
+    return elapsed, proc.stderr
+
+
+def parse_importtime(stderr: str) -> List[Tuple[int, str]]:
+    """
+    Return (cumulative_us, module) for every top-level import line.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|", 2)
+        rows.append((int(cumulative_us.strip()), name.rstrip()))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("module", nargs="?", default="main")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    timings = []
+    stderr = ""
+    for _ in range(args.runs):
+        elapsed, stderr = run_once(args.module)
+        timings.append(elapsed)
+
+    rows = parse_importtime(stderr)
+    rows.sort(reverse=True)
+
+    print(f"Boot time for `import {args.module}` over {args.runs} run(s):")
+    print(f"  min {min(timings) * 1000:.0f} ms, max {max(timings) * 1000:.0f} ms")
+    print()
+    print(f"Top {args.top} imports by cumulative time:")
+    for cumulative_us, name in rows[: args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name.strip()}")
+
+    imported = {name.strip() for _, name in rows}
+    eager = [m for m in HEAVY_MODULES if m in imported]
+    print()
+    if eager:
+        print(f"Eagerly imported heavy modules: {', '.join(eager)}")
+        sys.exit(1)
+    print("No heavy modules imported at startup.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Per-worker memory with and without preloading the model before fork.
+
+Usage:
+    python benchmarks/worker_memory.py [--workers 8] [--model NAME]
+
+Forks N workers the way gunicorn does and reports RSS and PSS (RSS with
+shared pages divided between the processes sharing them) per worker:
+
+  per-worker  – every worker loads its own model after fork
+  preload     – the master loads the model and gc.freeze()s before fork,
+                as gunicorn.conf.py does with preload_app
+
+Linux only (reads /proc/<pid>/smaps_rollup).
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.embedding import DEFAULT_EMBEDDING_MODEL, EmbeddingModel  # noqa: E402
+
+
+def read_memory_kb(pid: int) -> dict:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as fh:
+        for line in fh:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                values[parts[0][:-1]] = int(parts[1])
+    return values
+
+
+def run(mode: str, workers: int, model_name: str) -> None:
+    # Workers run inference with one thread each, as in a real deployment
+    model = EmbeddingModel(model_name, num_threads=1)
+    if mode == "preload":
+        model.backend
+        gc.freeze()
+
+    pids = []
+    ready_r, ready_w = os.pipe()
+    release_r, release_w = os.pipe()
+
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            os.close(release_w)
+            model.embed(["warm up the worker like a first request would"])
+            os.write(ready_w, b".")
+            os.read(release_r, 1)  # block until the parent has measured
+            os._exit(0)
+        pids.append(pid)
+
+    os.close(ready_w)
+    os.close(release_r)
+    for _ in range(workers):
+        os.read(ready_r, 1)
+    time.sleep(0.5)
+
+    stats = [read_memory_kb(pid) for pid in pids]
+    os.write(release_w, b"." * workers)
+    for pid in pids:
+        os.waitpid(pid, 0)
+    os.close(ready_r)
+    os.close(release_w)
+
+    rss = sum(s["Rss"] for s in stats) / workers / 1024
+    pss = sum(s["Pss"] for s in stats) / workers / 1024
+    print(
+        f"{mode:>10}: {workers} workers, per worker RSS {rss:7.1f} MiB, "
+        f"PSS {pss:7.1f} MiB, total PSS {pss * workers:8.1f} MiB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--model", default=DEFAULT_EMBEDDING_MODEL)
+    args = parser.parse_args()
+
+    # Each mode runs in its own process so the first can't warm the second
+    for mode in ("per-worker", "preload"):
+        pid = os.fork()
+        if pid == 0:
+            run(mode, args.workers, args.model)
+            os._exit(0)
+        os.waitpid(pid, 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -8,12 +8,83 @@ class Settings(BaseSettings):
 
     # Groq API
     GROQ_API_KEY: Optional[str] = None
+    GROQ_TIMEOUT_S: float = 30.0  # per call, also capped by request deadlines
+    GROQ_MAX_RETRIES: int = 1
+    GROQ_SLOW_CALL_S: float = 10.0  # counts towards the slow-call rate
 
     # SerpAPI
     SERPAPI_API_KEY: Optional[str] = None
+    SERPAPI_MAX_CONCURRENCY: int = 4  # parallel searches per discovery
+    SERPAPI_TIMEOUT_S: float = 15.0
+    SERPAPI_SLOW_CALL_S: float = 8.0
+
+    # Job search pipeline stages (crew/pipeline.py)
+    PIPELINE_EMBED_BATCH: int = 32
+    PIPELINE_SCORE_WORKERS: int = 4
+    PIPELINE_OUTREACH_WORKERS: int = 4
+    PIPELINE_TRACK_BATCH: int = 32  # applications per bulk insert
+
+    # Outreach for jobs whose embedding score already meets min_score
+    # starts during LLM scoring (0 = only once scored)
+    SPECULATIVE_OUTREACH_WORKERS: int = 4
+
+    # Fair-share LLM scheduler: concurrent Groq calls per process, and
+    # weighted fair queuing weights by tenant (default 1.0)
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_TENANT_WEIGHTS: Dict[str, float] = {}
+    # API key (X-API-Key) -> tenant name. Requests without a known key
+    # are queued per client IP at weight 1.0.
+    LLM_TENANT_API_KEYS: Dict[str, str] = {}
+
+    # Circuit breakers (Groq, SerpAPI): open when either rate is reached
+    # over the last CIRCUIT_WINDOW calls, stay open CIRCUIT_OPEN_S
+    CIRCUIT_FAILURE_RATE: float = 0.5
+    CIRCUIT_SLOW_CALL_RATE: float = 0.5
+    CIRCUIT_WINDOW: int = 20
+    CIRCUIT_MIN_CALLS: int = 5
+    CIRCUIT_OPEN_S: float = 30.0
 
     # LLM
     DEFAULT_LLM_MODEL: str = "llama-3.1-8b-instant"
+    LLM_ROUTING_ENABLED: bool = True  # per-task model routing / cascade
+    # Outreach uses DEFAULT_LLM_MODEL unless set (e.g. to a larger model)
+    OUTREACH_LLM_MODEL: Optional[str] = None
+    # Semantic LLM cache (llm/semantic_cache.py): stages to enable it for
+    # ("score", "resume_parse"), cosine similarity needed for a hit,
+    # entries per (stage, model) and the share of hits re-checked
+    SEMANTIC_CACHE_STAGES: List[str] = []
+    SEMANTIC_CACHE_THRESHOLD: float = 0.97
+    SEMANTIC_CACHE_CAPACITY: int = 2000
+    SEMANTIC_CACHE_VERIFY_RATE: float = 0.02
+
+    # Embeddings
+    EMBEDDING_BACKEND: str = "torch"  # torch | onnx
+    EMBEDDING_ONNX_QUANTIZE: bool = True  # dynamic int8 (onnx backend only)
+    EMBEDDING_NUM_THREADS: Optional[int] = None  # intra-op threads
+    EMBEDDING_CACHE_DIR: str = "storage/models"
+    EMBEDDING_STORE_DIR: Optional[str] = None  # shared mmap vector store
+    # Long texts are embedded as overlapping word windows (the model
+    # truncates at 256 word pieces, ~190 words) pooled into one vector
+    EMBEDDING_CHUNK_WORDS: int = 150
+    EMBEDDING_CHUNK_OVERLAP_WORDS: int = 30
+    EMBEDDING_POOLING: str = "mean"  # mean | max
+    EMBEDDING_CHUNK_CACHE_SIZE: int = 20_000  # chunk vectors kept in memory
+
+    # Multi-worker deployment (gunicorn.conf.py)
+    WEB_CONCURRENCY: int = 1
+    PRELOAD_EMBEDDING_MODEL: bool = True  # load before fork (copy-on-write)
+
+    # Saved searches (scheduler runs in-process when enabled)
+    SAVED_SEARCH_SCHEDULER_ENABLED: bool = False
+    SAVED_SEARCH_POLL_S: float = 60.0
+    SAVED_SEARCH_STAGGER_S: float = 10.0  # max random pause between due runs
+    SAVED_SEARCH_JITTER: float = 0.1  # ± fraction of each search's interval
+    SAVED_SEARCH_LEASE_MIN: int = 30  # claim held while a refresh runs
+
+    # On-demand request profiling (disabled unless a token is set)
+    PROFILING_TOKEN: Optional[str] = None
+    PROFILING_INTERVAL_MS: float = 5.0
+    PROFILE_DIR: str = "storage/profiles"
 
     # Environment
     ENV: str = "development"
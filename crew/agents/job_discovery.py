@@ -1,7 +1,12 @@
-from typing import List, Optional
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+from typing import List, Optional, Sequence, Tuple, Union
 
+from config.settings import settings
 from schemas.job import Job
 from tools.serp_search import SerpJobSearch
+from tools.skills import get_skill_extractor
 
 
 class JobDiscoveryAgent:
@@ -10,20 +15,107 @@ class JobDiscoveryAgent:
     based on search queries.
     """
 
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None):
         self.search_tool = SerpJobSearch()
+        self.max_workers = max_workers or settings.SERPAPI_MAX_CONCURRENCY
 
     def discover(
         self,
-        query: str,
-        location: Optional[str] = None,
+        query: Union[str, Sequence[str]],
+        location: Union[str, Sequence[str], None] = None,
         max_results: int = 10,
     ) -> List[Job]:
         """
         Discover jobs using the search tool.
+
+        `query` and `location` may each be a single value or a list; every
+        (query, location) combination is searched concurrently (bounded by
+        `max_workers`), with `max_results` per search. Results are merged
+        in input order and deduplicated by job_id. Each job's `skills`
+        are filled in from its description. No queries, no jobs.
+        """
+        searches = self.expand_searches(query, location)
+        if not searches:
+            return []
+
+        if len(searches) == 1:
+            q, loc = searches[0]
+            return self._tag_skills(
+                self.search_tool.search(
+                    query=q,
+                    location=loc,
+                    max_results=max_results,
+                )
+            )
+
+        def run(search):
+            q, loc = search
+            return self.search_one(q, loc, max_results)
+
+        # Copy the caller's context so searches see the request deadline
+        contexts = [contextvars.copy_context() for _ in searches]
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(searches))
+        ) as pool:
+            outcomes = list(pool.map(
+                lambda ctx, search: ctx.run(run, search), contexts, searches
+            ))
+
+        return self.merge(outcomes)
+
+    @staticmethod
+    def expand_searches(
+        query: Union[str, Sequence[str]],
+        location: Union[str, Sequence[str], None] = None,
+    ) -> List[Tuple[str, Optional[str]]]:
+        """Every (query, location) combination, in input order."""
+        queries = [query] if isinstance(query, str) else list(query)
+        locations = (
+            [location] if location is None or isinstance(location, str)
+            else list(location) or [None]
+        )
+        return list(product(queries, locations))
+
+    def search_one(
+        self, query: str, location: Optional[str], max_results: int
+    ) -> Union[List[Job], Exception]:
+        """One search; a failure is returned rather than raised."""
+        try:
+            return self.search_tool.search(
+                query=query, location=location, max_results=max_results
+            )
+        except Exception as e:
+            return e
+
+    def merge(self, outcomes: Sequence[Union[List[Job], Exception]]) -> List[Job]:
+        """
+        Combine `search_one` outcomes (in search order): failures are
+        skipped unless every search failed, jobs are deduplicated by
+        job_id and tagged with skills.
         """
-        return self.search_tool.search(
-            query=query,
-            location=location,
-            max_results=max_results,
-        )
\ No newline at end of file
+        errors = [o for o in outcomes if isinstance(o, Exception)]
+        if errors and len(errors) == len(outcomes):
+            # Nothing succeeded: surface the failure like a single search
+            raise errors[0]
+
+        jobs: List[Job] = []
+        seen_ids = set()
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                continue
+            for job in outcome:
+                if job.job_id:
+                    if job.job_id in seen_ids:
+                        continue
+                    seen_ids.add(job.job_id)
+                jobs.append(job)
+
+        return self._tag_skills(jobs)
+
+    def _tag_skills(self, jobs: List[Job]) -> List[Job]:
+        extractor = get_skill_extractor()
+        for job in jobs:
+            if not job.skills:
+                job.skills = extractor.extract(f"{job.title}\n{job.description}")
+        return jobs
@@ -1,27 +1,43 @@
-from typing import List, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import hashlib
+import json
 import re
 
+from config.settings import settings
 from llm.groq_client import GroqLLM
+from llm.routing import TaskType
+from llm.semantic_cache import SemanticCache
+from llm.usage import TokenBudgetExceeded
 from schemas.job import Job
+from schemas.job_batch import JobBatch, JobLike
 from schemas.resume import Resume
+from schemas.score import FitScore
+from storage.db import get_cached_scores, save_cached_scores
+from tools.circuit_breaker import CircuitOpenError
+from tools.embedding import (
+    EmbeddingModel,
+    cosine_similarity,
+    get_embedding_model,
+    pool_embeddings,
+)
 
-from sentence_transformers import SentenceTransformer, util
 import numpy as np
 
 
+# Near-duplicate (resume, job) pairs reuse an earlier score (opt-in)
+_semantic_cache = SemanticCache(TaskType.SCORE.value)
+
+
 class MatcherAgent:
     """
     Agent responsible for matching jobs to a resume and scoring fit.
     Uses lightweight RAG + LLM refinement.
     """
 
-    _embedder = None
-
     @classmethod
-    def get_embedder(cls):
-        if cls._embedder is None:
-            cls._embedder = SentenceTransformer("all-MiniLM-L6-v2")
-        return cls._embedder
+    def get_embedder(cls) -> EmbeddingModel:
+        # Shared, lazily-loaded model (torch is imported on first encode)
+        return get_embedding_model()
 
     # -----------------------------
     # PROMPTS
@@ -63,75 +79,346 @@ Job Description:
 Fit score (0–100, integer only):
 """
 
+    # Bump when the scoring logic changes in a way the prompts don't show
+    SCORING_VERSION = "2"  # 2: chunk-and-pool job embeddings
+
+    # A semantic cache hit is counted as false when a fresh LLM score
+    # differs from the cached one by more than this
+    SEMANTIC_SCORE_TOLERANCE = 5
+
     # -----------------------------
     # INIT
     # -----------------------------
 
-    def __init__(self, llm: GroqLLM | None = None):
+    def __init__(
+        self,
+        llm: GroqLLM | None = None,
+        use_cache: bool = True,
+        escalation_threshold: int | None = None,
+        escalation_band: int = 10,
+    ):
+        """
+        Args:
+            llm: LLM client (routed by default)
+            use_cache: Serve previously scored pairs from the score cache
+            escalation_threshold: The caller's min_score. Scores within
+                `escalation_band` of it are re-asked of the larger model
+                in the scoring cascade, as are unparseable answers.
+        """
         self.llm = llm or GroqLLM()
+        self.use_cache = use_cache
+        self.escalation_threshold = escalation_threshold
+        self.escalation_band = escalation_band
+        self._resume_memo = None
 
     # -----------------------------
     # PUBLIC API
     # -----------------------------
 
     def score(self, resume: Resume, jobs: List[Job]) -> List[Tuple[Job, int]]:
-        embedder = self.get_embedder()
-        scored: List[Tuple[Job, int]] = []
+        return [
+            (job, fit.final_score)
+            for job, fit in self.score_detailed(resume, jobs)
+        ]
+
+    def score_detailed(
+        self, resume: Resume, jobs: List[Job]
+    ) -> List[Tuple[Job, FitScore]]:
+        """
+        Score jobs, returning base / LLM / final components.
+
+        Previously scored (resume, job) pairs are served from the
+        persistent score cache with a single batched lookup; only the
+        misses are embedded and sent to the LLM.
+        """
+        return list(zip(jobs, self._score_all(resume, jobs)))
+
+    def score_batch(self, resume: Resume, batch: JobBatch) -> List[FitScore]:
+        """
+        `score_detailed` for a columnar JobBatch: one FitScore per row,
+        in order, without building pydantic Jobs.
+        """
+        return self._score_all(resume, list(batch))
+
+    def prepare(
+        self, resume: Resume, jobs: Sequence[JobLike]
+    ) -> List["ScoringTask"]:
+        """
+        Everything before the LLM call, for a batch of jobs: one batched
+        score cache lookup and one batched embedding of the misses.
+        Returns a ScoringTask per job, in order.
+        """
+        job_hashes = [self.job_hash(job) for job in jobs]
+
+        if not self._prepare_resume_chunks(resume):
+            zero = FitScore(base_score=0, final_score=0)
+            return [
+                ScoringTask(job, job_hash, cached=zero)
+                for job, job_hash in zip(jobs, job_hashes)
+            ]
+
+        cached: Dict[str, FitScore] = (
+            get_cached_scores(*self._cache_key(resume), job_hashes)
+            if self.use_cache else {}
+        )
 
-        resume_chunks = self._prepare_resume_chunks(resume)
-        if not resume_chunks:
-            return [(job, 0) for job in jobs]
+        # Window vectors of every distinct uncached description, in one encode
+        unique = {
+            job_hash: job for job, job_hash in zip(jobs, job_hashes)
+            if job_hash not in cached
+        }
+        job_chunk_embs: Dict[str, np.ndarray] = {}
+        if unique:
+            _, _, resume_emb = self._resume_state(resume)
+            job_chunk_embs = dict(zip(unique, self.get_embedder().embed_chunks(
+                [job.description or "" for job in unique.values()]
+            )))
+
+        tasks = []
+        for job, job_hash in zip(jobs, job_hashes):
+            if job_hash in cached:
+                tasks.append(ScoringTask(job, job_hash, cached=cached[job_hash]))
+                continue
+            embs = job_chunk_embs[job_hash]
+            tasks.append(ScoringTask(
+                job,
+                job_hash,
+                base_score=self._base_score(resume_emb, embs),
+                job_chunk_embs=embs,
+            ))
+        return tasks
+
+    def score_prepared(self, resume: Resume, task: "ScoringTask") -> FitScore:
+        """LLM scoring of one prepared job (nothing to do when cached)."""
+        if task.cached is not None:
+            return task.cached
+
+        resume_chunks, chunk_embs, _ = self._resume_state(resume)
+        return self._score_job(
+            resume,
+            task.job,
+            resume_chunks,
+            chunk_embs,
+            task.job_chunk_embs,
+            task.base_score,
+        )
+
+    def save_scores(
+        self,
+        resume: Resume,
+        scored: Iterable[Tuple["ScoringTask", FitScore]],
+    ) -> None:
+        """Write freshly, fully scored jobs to the score cache in one go."""
+        if not self.use_cache:
+            return
+        fresh = {
+            task.job_hash: fit for task, fit in scored
+            if task.cached is None and not fit.degraded
+        }
+        if not fresh:
+            return
+        try:
+            save_cached_scores(*self._cache_key(resume), fresh)
+        except Exception as e:
+            # The scores are still returned; only their reuse is lost
+            print(f"[matcher] score cache write failed: {e}")
+
+    def _score_all(
+        self, resume: Resume, jobs: Sequence[JobLike]
+    ) -> List[FitScore]:
+        tasks = self.prepare(resume, jobs)
+
+        fits: Dict[str, FitScore] = {}
+        for task in tasks:
+            if task.job_hash not in fits:
+                fits[task.job_hash] = self.score_prepared(resume, task)
+
+        self.save_scores(resume, [(task, fits[task.job_hash]) for task in tasks])
+        return [fits[task.job_hash] for task in tasks]
 
-        # Aggregate resume embedding
-        resume_emb = (
-            embedder.encode(resume_chunks, convert_to_tensor=True)
-            .mean(dim=0)
-            .unsqueeze(0)
+    # -----------------------------
+    # CACHE KEYS
+    # -----------------------------
+
+    def _cache_key(self, resume: Resume) -> Tuple[str, str, str]:
+        return (
+            self.resume_fingerprint(resume),
+            self.model_key(),
+            self.prompt_version(),
         )
 
-        for job in jobs:
-            job_text = job.description or ""
-            job_emb = embedder.encode(job_text, convert_to_tensor=True).unsqueeze(0)
+    def model_key(self) -> str:
+        """
+        Models that may produce the score, including the escalation band
+        since it decides which model's answer is kept.
+        """
+        key = self.llm.model_key(TaskType.SCORE)
+        if self.escalation_threshold is not None and ">" in key:
+            key += f"@{self.escalation_threshold}±{self.escalation_band}"
+        return key
 
-            # Base semantic similarity score
-            sim = util.pytorch_cos_sim(resume_emb, job_emb).item()
-            base_score = max(0, min(100, int(sim * 100)))
+    @classmethod
+    def prompt_version(cls) -> str:
+        """
+        Changes whenever the prompts, scoring logic or embedding model
+        change, which invalidates previously cached scores.
+        """
+        material = "\x00".join([
+            cls.SCORING_VERSION,
+            cls.SYSTEM_PROMPT,
+            cls.USER_PROMPT_TEMPLATE,
+            cls.get_embedder().model_name,
+            str(settings.EMBEDDING_CHUNK_WORDS),
+            str(settings.EMBEDDING_CHUNK_OVERLAP_WORDS),
+            settings.EMBEDDING_POOLING,
+        ])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def resume_fingerprint(resume: Resume) -> str:
+        canonical = json.dumps(resume.model_dump(), sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def job_hash(job: JobLike) -> str:
+        content = "\x00".join([job.title, job.company, job.description or ""])
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
 
-            # Retrieve top-k relevant resume chunks
-            relevant = self._retrieve_relevant_chunks(
-                resume_chunks, job_emb, top_k=3
-            )
+    # -----------------------------
+    # INTERNAL HELPERS
+    # -----------------------------
 
-            prompt = self.USER_PROMPT_TEMPLATE.format(
-                resume_summary=resume.summary or "",
-                resume_skills=", ".join(resume.skills),
-                resume_roles=", ".join(resume.roles),
-                resume_tools=", ".join(resume.tools),
-                relevant_snippets="; ".join(relevant),
-                job_title=job.title,
-                company=job.company,
-                description=job_text,
-            )
+    def _score_job(
+        self,
+        resume: Resume,
+        job: JobLike,
+        resume_chunks: List[str],
+        chunk_embs: np.ndarray,
+        job_chunk_embs: np.ndarray,
+        base_score: int,
+    ) -> FitScore:
+        job_text = job.description or ""
+
+        # Retrieve top-k relevant resume chunks
+        relevant = self._retrieve_relevant_chunks(
+            resume_chunks, job_chunk_embs, top_k=3, chunk_embs=chunk_embs
+        )
+
+        prompt = self.USER_PROMPT_TEMPLATE.format(
+            resume_summary=resume.summary or "",
+            resume_skills=", ".join(resume.skills),
+            resume_roles=", ".join(resume.roles),
+            resume_tools=", ".join(resume.tools),
+            relevant_snippets="; ".join(relevant),
+            job_title=job.title,
+            company=job.company,
+            description=job_text,
+        )
 
-            response = (
-                self.llm.generate(
+        def accept(response: str) -> bool:
+            llm_score = self._parse_score(response)
+            if llm_score is None:
+                return False
+            if self.escalation_threshold is None:
+                return True
+            final = max(base_score, llm_score)
+            return abs(final - self.escalation_threshold) > self.escalation_band
+
+        try:
+            response = _semantic_cache.get_or_generate(
+                self.model_key(),
+                # Resume and job are matched separately; the job id is
+                # left out so reposts match
+                [
+                    "\n".join(self._prepare_resume_chunks(resume)),
+                    f"{job.title}\n{job.company}\n{job_text}",
+                ],
+                lambda: self.llm.generate(
                     prompt=prompt,
                     system_prompt=self.SYSTEM_PROMPT,
+                    task=TaskType.SCORE,
+                    accept=accept,
+                    accept_key=(
+                        f"{base_score}@{self.escalation_threshold}"
+                        f"±{self.escalation_band}"
+                    ),
                 )
-                or ""
+                or "",
+                same=self._same_score,
+                valid=lambda response: self._parse_score(response) is not None,
+            )
+        except TimeoutError:
+            # DeadlineExceeded, or a coalesced call outlived our deadline:
+            # fall back to the embedding score
+            return FitScore(
+                base_score=base_score,
+                final_score=base_score,
+                timed_out=True,
+            )
+        except TokenBudgetExceeded:
+            return FitScore(
+                base_score=base_score,
+                final_score=base_score,
+                budget_exceeded=True,
+            )
+        except CircuitOpenError:
+            # Groq is failing: embedding-only score instead of waiting
+            return FitScore(
+                base_score=base_score,
+                final_score=base_score,
+                llm_unavailable=True,
             )
 
-            match = re.search(r"\d+", response)
-            llm_score = int(match.group()) if match else base_score
+        llm_score = self._parse_score(response)
 
-            final_score = max(base_score, llm_score)
-            scored.append((job, min(100, final_score)))
+        final_score = max(base_score, llm_score or 0)
+        return FitScore(
+            base_score=base_score,
+            llm_score=llm_score,
+            final_score=min(100, final_score),
+        )
 
-        return scored
+    def _resume_state(
+        self, resume: Resume
+    ) -> Tuple[List[str], np.ndarray | None, np.ndarray | None]:
+        """
+        Resume chunks, their embeddings and the aggregate resume
+        embedding; remembered for the last resume seen.
+        """
+        fingerprint = self.resume_fingerprint(resume)
+        memo = self._resume_memo
+        if memo is not None and memo[0] == fingerprint:
+            return memo[1]
 
-    # -----------------------------
-    # INTERNAL HELPERS
-    # -----------------------------
+        resume_chunks = self._prepare_resume_chunks(resume)
+        if not resume_chunks:
+            state = (resume_chunks, None, None)
+        else:
+            chunk_embs = self.get_embedder().embed(resume_chunks)
+            state = (resume_chunks, chunk_embs, chunk_embs.mean(axis=0, keepdims=True))
+
+        self._resume_memo = (fingerprint, state)
+        return state
+
+    @staticmethod
+    def _base_score(resume_emb: np.ndarray, job_chunk_embs: np.ndarray) -> int:
+        # Semantic similarity to the whole description, not just what
+        # fits in the model's input
+        job_emb = pool_embeddings(job_chunk_embs)
+        sim = float(cosine_similarity(resume_emb, job_emb)[0, 0])
+        return max(0, min(100, int(sim * 100)))
+
+    @staticmethod
+    def _parse_score(response: str) -> int | None:
+        match = re.search(r"\d+", response or "")
+        return int(match.group()) if match else None
+
+    @classmethod
+    def _same_score(cls, cached: str, fresh: str) -> bool:
+        cached_score, fresh_score = cls._parse_score(cached), cls._parse_score(fresh)
+        if cached_score is None or fresh_score is None:
+            return cached_score == fresh_score
+        return abs(cached_score - fresh_score) <= cls.SEMANTIC_SCORE_TOLERANCE
 
     def _prepare_resume_chunks(self, resume: Resume) -> List[str]:
         chunks = []
@@ -146,15 +433,44 @@ Fit score (0–100, integer only):
         return chunks
 
     def _retrieve_relevant_chunks(
-        self, chunks: List[str], job_emb, top_k: int = 3
+        self,
+        chunks: List[str],
+        job_emb: np.ndarray,
+        top_k: int = 3,
+        chunk_embs: np.ndarray | None = None,
     ) -> List[str]:
         if not chunks:
             return []
 
-        embedder = self.get_embedder()
-        chunk_embs = embedder.encode(chunks, convert_to_tensor=True)
+        if chunk_embs is None:
+            chunk_embs = self.get_embedder().embed(chunks)
 
-        sims = util.pytorch_cos_sim(job_emb, chunk_embs)[0]
-        top_indices = np.argsort(sims.cpu().numpy())[-top_k:][::-1]
+        # Best match against any part of the description
+        sims = cosine_similarity(job_emb, chunk_embs).max(axis=0)
+        top_indices = np.argsort(sims)[-top_k:][::-1]
 
         return [chunks[i] for i in top_indices]
+
+
+class ScoringTask:
+    """
+    A job prepared for scoring by MatcherAgent.prepare: either its final
+    score came from the cache, or its embedding score is known and only
+    the LLM call is left.
+    """
+
+    __slots__ = ("job", "job_hash", "cached", "base_score", "job_chunk_embs")
+
+    def __init__(
+        self,
+        job: JobLike,
+        job_hash: str,
+        cached: Optional[FitScore] = None,
+        base_score: int = 0,
+        job_chunk_embs: Optional[np.ndarray] = None,
+    ):
+        self.job = job
+        self.job_hash = job_hash
+        self.cached = cached
+        self.base_score = base_score
+        self.job_chunk_embs = job_chunk_embs
@@ -1,7 +1,10 @@
 from llm.groq_client import GroqLLM
+from llm.routing import TaskType
 from schemas.job import Job
 from schemas.resume import Resume
-from sentence_transformers import SentenceTransformer, util
+from tools.circuit_breaker import CircuitOpenError
+from tools.embedding import EmbeddingModel, cosine_similarity, get_embedding_model
+from tools.skills import get_skill_extractor
 import numpy as np
 
 
@@ -11,14 +14,10 @@ class OutreachAgent:
     Uses RAG to retrieve and infuse relevant resume content.
     """
 
-    # Class-level embedder to preload once
-    _embedder = None
-
     @classmethod
-    def get_embedder(cls):
-        if cls._embedder is None:
-            cls._embedder = SentenceTransformer('all-MiniLM-L6-v2')
-        return cls._embedder
+    def get_embedder(cls) -> EmbeddingModel:
+        # Shared, lazily-loaded model (torch is imported on first encode)
+        return get_embedding_model()
 
     SYSTEM_PROMPT = """
 You are an expert career consultant specializing in personalized job outreach.
@@ -33,6 +32,9 @@ Rules (must follow all):
 - Make it unique: Avoid generic phrases like "I am excited to apply."
 """
 
+    # Fit scores above this get the confident tone
+    CONFIDENT_ABOVE = 70
+
     def __init__(self, llm: GroqLLM | None = None):
         self.llm = llm or GroqLLM()
         # Use class-level embedder
@@ -47,14 +49,18 @@ Rules (must follow all):
         # Prepare resume chunks for retrieval
         resume_chunks = self._prepare_resume_chunks(resume)
         
-        # Embed job description
-        job_embedding = self.embedder.encode(job.description, convert_to_tensor=True)
+        # Embed job description: window vectors, cached when the job
+        # was just scored
+        job_embedding = self.embedder.embed_chunks(job.description)[0]
         
         # Retrieve top-matching resume chunks
         relevant_chunks = self._retrieve_relevant_chunks(resume_chunks, job_embedding, top_k=3)
         
         # Determine tone based on fit score
-        tone = "confident and direct" if fit_score > 70 else "approachable and exploratory"
+        tone = (
+            "confident and direct" if self.confident(fit_score)
+            else "approachable and exploratory"
+        )
         
         prompt = f"""
 Generate a personalized outreach message for a job application.
@@ -81,8 +87,54 @@ Focus on matching skills/experiences to job needs, express genuine interest, and
         return self.llm.generate(
             prompt=prompt,
             system_prompt=self.SYSTEM_PROMPT,
+            task=TaskType.OUTREACH,
         )
 
+    def message_or_template(
+        self,
+        resume: Resume,
+        job: Job,
+        fit_score: int,
+    ) -> tuple[str, bool]:
+        """
+        `generate_message`, or `template_message` while the LLM circuit
+        is open. Returns the message and whether the template was used.
+        """
+        try:
+            return self.generate_message(resume, job, fit_score), False
+        except CircuitOpenError:
+            return self.template_message(resume, job, fit_score), True
+
+    def template_message(self, resume: Resume, job: Job, fit_score: int) -> str:
+        """
+        Fill-in-the-blanks message used while the LLM is unavailable.
+        """
+        own = {skill.lower() for skill in resume.skills + resume.tools}
+        shared = [kw for kw in self._extract_keywords(job.description) if kw.lower() in own]
+        skills = ", ".join(shared[:3] or resume.skills[:3])
+
+        if self.confident(fit_score):
+            opening = f"I'm reaching out about the {job.title} role at {job.company}."
+            pitch = f"My background in {skills} maps directly onto what the team needs." if skills \
+                else "My background maps directly onto what the team needs."
+            close = "I'd welcome a conversation about how I can contribute."
+        else:
+            opening = f"I came across the {job.title} role at {job.company} and wanted to reach out."
+            pitch = f"I've been working with {skills} and would like to learn more about the team's work." if skills \
+                else "I'd like to learn more about the team's work."
+            close = "Would you be open to a short chat?"
+
+        name = resume.name or "Candidate"
+        return f"Hi,\n\n{opening} {pitch} {close}\n\nBest,\n{name}"
+
+    @classmethod
+    def confident(cls, fit_score: int) -> bool:
+        """
+        Which tone a message is written in. Messages for two scores on
+        the same side of the boundary are interchangeable.
+        """
+        return fit_score > cls.CONFIDENT_ABOVE
+
     def _prepare_resume_chunks(self, resume: Resume) -> list[str]:
         """
         Break resume into meaningful chunks for embedding.
@@ -106,15 +158,14 @@ Focus on matching skills/experiences to job needs, express genuine interest, and
         if not chunks:
             return []
         
-        chunk_embeddings = self.embedder.encode(chunks, convert_to_tensor=True)
-        similarities = util.pytorch_cos_sim(job_embedding, chunk_embeddings)[0]
-        top_indices = np.argsort(similarities.cpu().numpy())[-top_k:][::-1]  # Top similar
+        chunk_embeddings = self.embedder.embed(chunks)
+        # Best match against any part of the description
+        similarities = cosine_similarity(job_embedding, chunk_embeddings).max(axis=0)
+        top_indices = np.argsort(similarities)[-top_k:][::-1]  # Top similar
         return [chunks[i] for i in top_indices]
 
     def _extract_keywords(self, description: str) -> list[str]:
         """
-        Simple keyword extraction from job description (can be enhanced with NLP).
+        Canonical skills mentioned in the job description.
         """
-        words = description.lower().split()
-        keywords = [word for word in words if len(word) > 3 and word not in ['with', 'and', 'the', 'for', 'are', 'you']]
-        return list(set(keywords))[:10]
\ No newline at end of file
+        return get_skill_extractor().extract(description)[:10]
@@ -1,8 +1,28 @@
+import hashlib
 import json
 from typing import Any
 
 from llm.groq_client import GroqLLM
+from llm.routing import TaskType
+from llm.semantic_cache import SemanticCache
+from llm.usage import TokenBudgetExceeded, check_token_budget
 from schemas.resume import Resume
+from tools.circuit_breaker import CircuitOpenError
+from tools.deadline import DeadlineExceeded, check_deadline, clamp_timeout
+from tools.singleflight import SingleFlight
+from tools.skills import get_skill_extractor
+
+
+# Double-submitted resumes are parsed once
+_parse_flight = SingleFlight(
+    "resume_parse",
+    share=lambda resume: resume.model_copy(deep=True),
+)
+
+# Resumes re-submitted with case / whitespace edits reuse an earlier
+# parse (opt-in). Exact only: resumes on a shared template differ only in
+# name and contact lines, and would be near matches of each other.
+_semantic_cache = SemanticCache(TaskType.RESUME_PARSE.value, exact_only=True)
 
 
 class ResumeAgent:
@@ -43,13 +63,60 @@ Resume text:
         """
         Parse raw resume text into a Resume schema.
         """
+        key = (
+            self.llm.model_key(TaskType.RESUME_PARSE),
+            hashlib.sha256(resume_text.strip().encode("utf-8")).hexdigest(),
+        )
+        try:
+            return _parse_flight.do(
+                key,
+                lambda: self._parse(resume_text),
+                timeout=clamp_timeout(None),
+            )
+        except (DeadlineExceeded, TokenBudgetExceeded):
+            # Possibly another request's deadline / budget: retry on ours
+            check_deadline("resume parsing")
+            check_token_budget("resume parsing")
+            return self._parse(resume_text)
+
+    def parse_or_fallback(self, resume_text: str) -> tuple[Resume, bool]:
+        """
+        `parse`, or `fallback_parse` while the LLM circuit is open.
+        Returns the resume and whether the fallback was used.
+        """
+        try:
+            return self.parse(resume_text), False
+        except CircuitOpenError:
+            return self.fallback_parse(resume_text), True
+
+    @staticmethod
+    def fallback_parse(resume_text: str) -> Resume:
+        """
+        Skills-only resume from the local skill extractor (no LLM).
+        """
+        text = resume_text.strip()
+        return Resume(
+            skills=get_skill_extractor().extract(text),
+            summary=text[:500] or None,
+        )
+
+    def _parse(self, resume_text: str) -> Resume:
         prompt = self.USER_PROMPT_TEMPLATE.format(
             resume_text=resume_text.strip()
         )
 
-        response = self.llm.generate(
-            prompt=prompt,
-            system_prompt=self.SYSTEM_PROMPT,
+        response = _semantic_cache.get_or_generate(
+            self.llm.model_key(TaskType.RESUME_PARSE),
+            [resume_text],
+            lambda: self.llm.generate(
+                prompt=prompt,
+                system_prompt=self.SYSTEM_PROMPT,
+                task=TaskType.RESUME_PARSE,
+                accept=self._is_json,
+                accept_key="json",
+            ),
+            same=self._same_parse,
+            valid=self._is_json,
         )
 
         try:
@@ -60,3 +127,35 @@ Resume text:
             ) from e
 
         return Resume.model_validate(data)
+
+    @staticmethod
+    def _same_parse(cached: str, fresh: str) -> bool:
+        # Wording of the summary may vary between calls; the extracted
+        # fields should not
+        try:
+            a, b = json.loads(cached), json.loads(fresh)
+        except json.JSONDecodeError:
+            return cached == fresh
+        if not isinstance(a, dict) or not isinstance(b, dict):
+            return a == b
+        fields = ("name", "skills", "roles", "tools")
+        return all(
+            _normalized(a.get(field)) == _normalized(b.get(field))
+            for field in fields
+        )
+
+    @staticmethod
+    def _is_json(response: str) -> bool:
+        try:
+            json.loads(response)
+        except json.JSONDecodeError:
+            return False
+        return True
+
+
+def _normalized(value: Any) -> Any:
+    if isinstance(value, list):
+        return sorted(str(item).strip().lower() for item in value)
+    if isinstance(value, str):
+        return value.strip().lower()
+    return value
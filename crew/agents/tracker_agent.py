@@ -1,5 +1,7 @@
+from typing import Iterable
+
 from schemas.application import Application
-from storage.db import save_application
+from storage.db import save_application, save_applications
 
 
 class TrackerAgent:
@@ -23,4 +25,8 @@ class TrackerAgent:
             outreach_message=outreach_message,
         )
 
-        save_application(application)
\ No newline at end of file
+        save_application(application)
+
+    def track_many(self, applications: Iterable[Application]) -> None:
+        """Persist several applications in one transaction."""
+        save_applications(applications)
\ No newline at end of file
@@ -0,0 +1,372 @@
+"""
+Offline batch runs over (resume, query) records.
+
+Usage:
+    python -m crew.batch input.jsonl output.jsonl [--workers 4]
+
+Each input line is a JSON object:
+
+    {"id": "...", "resume_text": "...", "query": "..." | [...],
+     "location": "..." | [...], "max_results": 5, "min_score": 50,
+     "token_budget": 20000}
+
+Only resume_text and query are required; records without an id are
+identified by their line number. Results are appended to the output file
+as they complete, one line per record, in completion order.
+
+Progress is checkpointed next to the output (<output>.ckpt). Re-running
+the same command after an interruption skips finished records and
+continues where it stopped. Records that fail transiently (an open
+circuit breaker, a timeout) are not marked done, so a re-run retries
+them. Input is read lazily and at most a few records per worker are in
+flight, so memory stays flat for any input size.
+"""
+
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from config.settings import settings
+
+
+class BatchRecord(BaseModel):
+    id: Optional[str] = None
+    resume_text: str
+    query: str | list[str]
+    location: str | list[str] | None = None
+    max_results: int = 5
+    min_score: int = Field(default=50, ge=0, le=100)
+    token_budget: Optional[int] = Field(default=None, ge=1)
+
+
+# -----------------------------
+# Checkpoint
+# -----------------------------
+
+class Checkpoint(BaseModel):
+    """
+    Progress of one run.
+
+    Records finish out of order, so progress is a watermark (every line
+    before `line` is done; input resumes at byte `offset`) plus the few
+    finished lines past it. `output_size` is the output length covered
+    by this checkpoint: anything written after it is truncated on resume
+    and redone, so the output never holds a record twice.
+    """
+
+    line: int = 0
+    offset: int = 0
+    done_ahead: Dict[int, int] = Field(
+        default_factory=dict,
+        description="line -> byte offset after that line, for lines past the watermark",
+    )
+    output_size: int = 0
+    completed: int = 0
+    errors: int = 0
+    deferred: int = Field(
+        default=0,
+        description="Records that failed transiently in the last run; not marked done",
+    )
+
+    @classmethod
+    def load(cls, path: Path) -> "Checkpoint":
+        if not path.exists():
+            return cls()
+        return cls.model_validate_json(path.read_text(encoding="utf-8"))
+
+    def save(self, path: Path) -> None:
+        # Atomic: a crash leaves either the old or the new checkpoint
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(self.model_dump_json(), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def mark_done(self, line: int, end_offset: int) -> None:
+        self.done_ahead[line] = end_offset
+        while self.line in self.done_ahead:
+            self.offset = self.done_ahead.pop(self.line)
+            self.line += 1
+
+
+# -----------------------------
+# Worker side
+# -----------------------------
+
+_agents: Dict[str, object] = {}
+
+
+def _init_worker(num_threads: Optional[int]) -> None:
+    if num_threads and "torch" in sys.modules:
+        # Weights were loaded before fork; size torch's pool per worker
+        import torch
+
+        torch.set_num_threads(num_threads)
+
+    from crew.pipeline import JobSearchPipeline
+
+    # Results go to the output file, not the applications table
+    _agents["pipeline"] = JobSearchPipeline(track=False)
+
+
+def process_record(record: BatchRecord) -> dict:
+    """Run the pipeline for one record (in a worker process)."""
+    result = _agents["pipeline"].run(
+        record.resume_text,
+        query=record.query,
+        location=record.location,
+        max_results=record.max_results,
+        min_score=record.min_score,
+        escalation_threshold=record.min_score,
+    )
+    dedup = result.dedup
+
+    return {
+        "jobs_found": dedup.jobs_out if dedup else 0,
+        "duplicates_removed": dedup.duplicates_removed if dedup else 0,
+        "results": [
+            {
+                "job_id": scored.job.job_id,
+                "title": scored.job.title,
+                "company": scored.job.company,
+                "fit_score": scored.fit.final_score,
+                "outreach_message": scored.outreach_message,
+                "url": scored.job.url,
+                "status": scored.status.value,
+            }
+            for scored in result.jobs
+        ],
+    }
+
+
+def _run_one(record: BatchRecord) -> Tuple[bool, bool, dict]:
+    """(ok, transient, body). Transient failures are retried by a later run."""
+    from llm.scheduler import Priority, Tenant, tenant_scope
+    from llm.usage import UsageMeter, usage_scope
+    from tools.circuit_breaker import CircuitOpenError
+
+    meter = UsageMeter(token_budget=record.token_budget)
+    # Each worker process has its own scheduler and runs one record at a time
+    tenant = Tenant("batch", Priority.BATCH)
+    transient = False
+    with usage_scope(meter), tenant_scope(tenant):
+        try:
+            ok, body = True, process_record(record)
+        except Exception as e:
+            # An outage (e.g. SerpAPI's circuit open) or a timeout
+            transient = isinstance(e, (CircuitOpenError, TimeoutError))
+            ok, body = False, {"error": f"{type(e).__name__}: {e}"}
+
+    body["usage"] = meter.summary().model_dump()
+    return ok, transient, body
+
+
+# -----------------------------
+# Driver
+# -----------------------------
+
+def _read_records(
+    path: Path, start_line: int, start_offset: int
+) -> Iterator[Tuple[int, int, Optional[BatchRecord], Optional[str]]]:
+    """
+    Yield (line number, offset after the line, record, error) from
+    `start_offset` on. Blank lines yield neither record nor error.
+    """
+    with open(path, "rb") as f:
+        f.seek(start_offset)
+        offset = start_offset
+        for line_no, raw in enumerate(f, start=start_line):
+            offset += len(raw)
+            if not raw.strip():
+                yield line_no, offset, None, None
+                continue
+            try:
+                yield line_no, offset, BatchRecord.model_validate_json(raw), None
+            except ValueError as e:
+                yield line_no, offset, None, f"Invalid record: {e}"
+
+
+def _count_records(path: Path) -> int:
+    with open(path, "rb") as f:
+        return sum(1 for raw in f if raw.strip())
+
+
+class _Progress:
+    """Throughput / ETA lines on stderr, at most every `every_s`."""
+
+    def __init__(self, total: int, already_done: int, every_s: float = 5.0):
+        self.total = total
+        self.already_done = already_done
+        self.every_s = every_s
+        self.done = 0
+        self.start = time.perf_counter()
+        self._last = self.start
+
+    def advance(self) -> None:
+        self.done += 1
+        if time.perf_counter() - self._last >= self.every_s:
+            self.report()
+
+    def report(self) -> None:
+        now = time.perf_counter()
+        self._last = now
+
+        elapsed = now - self.start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        finished = self.already_done + self.done
+        remaining = max(0, self.total - finished)
+        eta = _format_duration(remaining / rate) if rate > 0 else "?"
+        print(
+            f"[batch] {finished}/{self.total} records, "
+            f"{rate:.2f} rec/s, ETA {eta}",
+            file=sys.stderr,
+        )
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{secs:02d}s" if hours else f"{minutes}m{secs:02d}s"
+
+
+def _preload_model() -> None:
+    # Same approach as gunicorn.conf.py: load weights (no inference) in
+    # the parent so forked workers share them copy-on-write
+    if settings.PRELOAD_EMBEDDING_MODEL:
+        from tools.embedding import get_embedding_model
+
+        get_embedding_model().backend
+    gc.freeze()
+
+
+def run_batch(
+    input_path: str,
+    output_path: str,
+    workers: int = 4,
+    progress_every_s: float = 5.0,
+) -> Checkpoint:
+    """
+    Process every record of `input_path`, appending results to
+    `output_path`. Resumes from `<output_path>.ckpt` if present.
+    """
+    from storage.db import init_db
+
+    source = Path(input_path)
+    output = Path(output_path)
+    ckpt_path = output.with_name(output.name + ".ckpt")
+
+    ckpt = Checkpoint.load(ckpt_path)
+    ckpt.deferred = 0
+    output.touch()
+    # Drop results written after the last checkpoint; they will be redone
+    os.truncate(output, ckpt.output_size)
+
+    init_db()
+    progress = _Progress(
+        total=_count_records(source),
+        already_done=ckpt.completed + ckpt.errors,
+        every_s=progress_every_s,
+    )
+
+    start_method = (
+        "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+    )
+    if start_method == "fork":
+        _preload_model()
+
+    pending: Dict[Future, Tuple[int, int, str]] = {}
+    max_in_flight = workers * 2
+
+    with open(output, "ab") as out, ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(start_method),
+        initializer=_init_worker,
+        initargs=(max(1, (os.cpu_count() or 1) // workers),),
+    ) as pool:
+
+        def write(line_no: int, end: int, record_id: str, ok: bool, body: dict):
+            row = {"id": record_id, "status": "ok" if ok else "error", **body}
+            out.write(json.dumps(row).encode("utf-8") + b"\n")
+            out.flush()
+
+            ckpt.output_size = out.tell()
+            ckpt.mark_done(line_no, end)
+            if ok:
+                ckpt.completed += 1
+            else:
+                ckpt.errors += 1
+            ckpt.save(ckpt_path)
+            progress.advance()
+
+        def drain(block_until: int) -> None:
+            while len(pending) > block_until:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    line_no, end, record_id = pending.pop(future)
+                    ok, transient, body = future.result()
+                    if transient:
+                        # Left unfinished: the watermark stops here, so a
+                        # resumed run retries this record
+                        ckpt.deferred += 1
+                        print(
+                            f"[batch] {record_id} deferred: {body['error']}",
+                            file=sys.stderr,
+                        )
+                        progress.advance()
+                        continue
+                    write(line_no, end, record_id, ok, body)
+
+        for line_no, end, record, error in _read_records(
+            source, ckpt.line, ckpt.offset
+        ):
+            if line_no in ckpt.done_ahead:
+                continue
+
+            record_id = (record.id if record else None) or f"line-{line_no + 1}"
+            if error is not None:
+                write(line_no, end, record_id, False, {"error": error})
+            elif record is None:
+                ckpt.mark_done(line_no, end)
+            else:
+                pending[pool.submit(_run_one, record)] = (line_no, end, record_id)
+                drain(block_until=max_in_flight - 1)
+
+        drain(block_until=0)
+        ckpt.save(ckpt_path)
+
+    progress.report()
+    return ckpt
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("input", help="Input JSONL")
+    parser.add_argument("output", help="Output JSONL (appended to)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--progress-every", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    ckpt = run_batch(
+        args.input,
+        args.output,
+        workers=args.workers,
+        progress_every_s=args.progress_every,
+    )
+    print(
+        f"[batch] done: {ckpt.completed} ok, {ckpt.errors} error(s), "
+        f"{ckpt.deferred} deferred (re-run to retry)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,5 @@
-from crew.agents.resume_agent import ResumeAgent
-from crew.agents.job_discovery import JobDiscoveryAgent
-from crew.agents.matcher_agent import MatcherAgent
-from crew.agents.outreach_agent import OutreachAgent
-from crew.agents.tracker_agent import TrackerAgent
+from crew.pipeline import JobSearchPipeline
 from storage.db import init_db
-from utils import dedupe_text  # Import from utils
 
 
 def run():
@@ -22,47 +17,30 @@ Experience:
 Worked on fraud detection and NLP systems.
 """
 
-    resume_agent = ResumeAgent()
-    job_agent = JobDiscoveryAgent()
-    matcher_agent = MatcherAgent()
-    outreach_agent = OutreachAgent()
-    tracker_agent = TrackerAgent()
-
-    resume = resume_agent.parse(resume_text)
-
-    jobs = job_agent.discover(
+    # Fit-score gate, outreach, output stabilization and tracking all
+    # happen inside the pipeline
+    result = JobSearchPipeline().run(
+        resume_text,
         query="machine learning intern",
         location="India",
         max_results=3,
+        min_score=50,
+        escalation_threshold=50,
     )
 
-    scored = matcher_agent.score(resume, jobs)
-
-    for job, score in scored:
-        # ---- Fit-score gate (important) ----
-        if score < 50:
-            continue
-
-        message = outreach_agent.generate_message(
-            resume, job, score
-        )
-
-        # ---- Output stabilization ----
-        message = dedupe_text(message)
-
-        tracker_agent.track(
-            job_id=job.job_id,
-            job_title=job.title,
-            company=job.company,
-            fit_score=score,
-            outreach_message=message,
+    dedup_stats = result.dedup
+    if dedup_stats and dedup_stats.duplicates_removed:
+        print(
+            f"Collapsed {dedup_stats.duplicates_removed} duplicate posting(s), "
+            f"saving up to {dedup_stats.llm_calls_saved} LLM calls"
         )
 
+    for scored in result.jobs:
+        job = scored.job
         print(f"\nApplied Logic Preview → {job.title} @ {job.company}")
-        print(f"Fit score: {score}")
-        print(message)
+        print(f"Fit score: {scored.fit.final_score}")
+        print(scored.outreach_message)
         print("-" * 60)
 
-
 if __name__ == "__main__":
     run()
\ No newline at end of file
@@ -0,0 +1,382 @@
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Union
+
+from pydantic import BaseModel, ConfigDict
+
+from config.settings import settings
+from crew.agents.job_discovery import JobDiscoveryAgent
+from crew.agents.matcher_agent import MatcherAgent, ScoringTask
+from crew.agents.outreach_agent import OutreachAgent
+from crew.agents.resume_agent import ResumeAgent
+from crew.agents.tracker_agent import TrackerAgent
+from llm.groq_client import GroqLLM
+from llm.usage import TokenBudgetExceeded
+from schemas.application import Application
+from schemas.job import Job
+from schemas.resume import Resume
+from schemas.score import FitScore
+from tools.bm25 import prefilter_jobs
+from tools.deadline import clamp_timeout, deadline_expired
+from tools.dedup import DedupStats, JobDeduplicator
+from tools.pipeline import Stage, StagedPipeline, StageStats
+from tools.skills import gate_by_skill_overlap
+from utils import dedupe_text
+
+
+class JobStatus(str, Enum):
+    COMPLETE = "complete"
+    # Scored, but outreach was not started before the deadline
+    SCORED_ONLY = "scored_only"
+    # Outreach was started but did not finish before the deadline
+    MESSAGE_PENDING = "message_pending"
+    # LLM scoring did not finish; fit_score is the embedding score
+    TIMED_OUT = "timed_out"
+    # Token budget spent before LLM scoring or outreach for this job
+    BUDGET_EXCEEDED = "budget_exceeded"
+    # LLM circuit open: embedding score and/or template message
+    DEGRADED = "degraded"
+
+
+class ScoredJob(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    job: Job
+    fit: FitScore
+    outreach_message: Optional[str] = None
+    status: JobStatus = JobStatus.COMPLETE
+
+
+class PipelineResult(BaseModel):
+    resume: Resume
+    # Jobs at or above min_score, in discovery order
+    jobs: List[ScoredJob]
+    # Every job that was scored, whatever its score, in discovery order
+    scored: List[ScoredJob] = []
+    dedup: Optional[DedupStats] = None
+    stages: List[StageStats]
+
+
+class _Item:
+    # One job on its way through the stages
+    __slots__ = ("index", "job", "task", "fit", "pending", "message", "status")
+
+    def __init__(self, index: int, job: Job):
+        self.index = index
+        self.job = job
+        self.task: Optional[ScoringTask] = None
+        self.fit: Optional[FitScore] = None
+        # Speculative outreach: (score it was written for, future)
+        self.pending: Optional[Tuple[int, Future]] = None
+        self.message: Optional[str] = None
+        self.status = JobStatus.COMPLETE
+
+
+class _Run:
+    # State shared by the stages of one run
+    def __init__(self, min_score: int, skip_degraded: bool = False):
+        self.min_score = min_score
+        self.skip_degraded = skip_degraded
+        self.resume_future: Optional[Future] = None
+        self.speculation: Optional[ThreadPoolExecutor] = None
+        self.dedup: Optional[DedupStats] = None
+        self.lock = threading.Lock()
+        self.scored: List[_Item] = []
+
+    def resume(self) -> Resume:
+        resume, _ = self.resume_future.result(timeout=clamp_timeout(None))
+        return resume
+
+
+class JobSearchPipeline:
+    """
+    The job search (discover → dedupe → embed → score → outreach →
+    track) as a StagedPipeline, shared by the API, the CLI demo and the
+    Streamlit app.
+
+    Searches run concurrently, and the resume is parsed while they run.
+    Dedup sees every discovered job at once. After that, jobs stream
+    through the remaining stages. Embedding runs in batches. Scoring and
+    outreach each have several workers, so LLM calls for different jobs
+    overlap (the LLM scheduler caps them process-wide). Tracking writes
+    applications in bulk. Outreach for a job whose embedding score
+    already meets min_score starts while it is still being LLM-scored,
+    and is only rewritten if the final score changes the tone.
+    """
+
+    NAME = "job_search"
+
+    def __init__(
+        self,
+        llm: Optional[GroqLLM] = None,
+        resume_agent: Optional[ResumeAgent] = None,
+        discovery_agent: Optional[JobDiscoveryAgent] = None,
+        outreach_agent: Optional[OutreachAgent] = None,
+        tracker_agent: Optional[TrackerAgent] = None,
+        outreach: bool = True,
+        track: bool = True,
+    ):
+        self.llm = llm or GroqLLM()
+        self.resume_agent = resume_agent or ResumeAgent(llm=self.llm)
+        self.discovery_agent = discovery_agent or JobDiscoveryAgent()
+        self.outreach_agent = outreach_agent or OutreachAgent(llm=self.llm)
+        self.tracker_agent = tracker_agent or TrackerAgent()
+        self.outreach = outreach
+        self.track = track
+
+    # -----------------------------
+    # PUBLIC API
+    # -----------------------------
+
+    def run(
+        self,
+        resume_text: str,
+        query: Union[str, List[str]],
+        location: Union[str, List[str], None] = None,
+        max_results: int = 5,
+        min_score: int = 50,
+        escalation_threshold: Optional[int] = None,
+        min_skill_overlap: Optional[float] = None,
+        prefilter_top_k: Optional[int] = None,
+        resume: Optional[Resume] = None,
+        job_filter: Optional[Callable[[List[Job]], List[Job]]] = None,
+        skip_degraded: bool = False,
+    ) -> PipelineResult:
+        """
+        Run the whole pipeline. `escalation_threshold` is passed to
+        MatcherAgent (usually min_score).
+
+        Args:
+            resume: Already parsed resume; `resume_text` is not parsed
+            job_filter: Applied to the deduplicated jobs before any are
+                embedded, e.g. to drop postings seen earlier
+            skip_degraded: Jobs not fully LLM-scored (timed out, over
+                budget, circuit open) get no outreach and are left out
+                of `jobs`
+        """
+        searches = self.discovery_agent.expand_searches(query, location)
+        matcher = MatcherAgent(llm=self.llm, escalation_threshold=escalation_threshold)
+        run = _Run(min_score, skip_degraded)
+
+        def dedupe(outcomes: List[Tuple[int, Any]]) -> List[_Item]:
+            outcomes.sort(key=lambda outcome: outcome[0])
+            jobs = self.discovery_agent.merge([o for _, o in outcomes])
+            jobs, run.dedup = JobDeduplicator().dedupe(jobs)
+            if job_filter is not None:
+                jobs = job_filter(jobs)
+
+            resume = run.resume()
+            if min_skill_overlap is not None:
+                jobs, _ = gate_by_skill_overlap(resume, jobs, min_skill_overlap)
+            if prefilter_top_k:
+                jobs = prefilter_jobs(resume, jobs, prefilter_top_k)
+
+            return [_Item(i, job) for i, job in enumerate(jobs)]
+
+        stages = [
+            Stage(
+                "discover",
+                lambda batch: [
+                    (i, self.discovery_agent.search_one(q, loc, max_results))
+                    for i, q, loc in batch
+                ],
+                workers=min(settings.SERPAPI_MAX_CONCURRENCY, len(searches)),
+            ),
+            Stage("dedupe", dedupe, batch_size=None),
+            Stage(
+                "embed",
+                lambda batch: self._embed(run, matcher, batch),
+                batch_size=settings.PIPELINE_EMBED_BATCH,
+            ),
+            Stage(
+                "score",
+                lambda batch: self._score(run, matcher, batch),
+                workers=settings.PIPELINE_SCORE_WORKERS,
+            ),
+            *self._output_stages(run),
+        ]
+
+        pool = ThreadPoolExecutor(
+            max_workers=1 + settings.SPECULATIVE_OUTREACH_WORKERS,
+            thread_name_prefix="job-search",
+        )
+        if self.outreach and settings.SPECULATIVE_OUTREACH_WORKERS:
+            run.speculation = pool
+
+        try:
+            if resume is not None:
+                run.resume_future = Future()
+                run.resume_future.set_result((resume, False))
+            else:
+                # Parse the resume while discovery runs
+                run.resume_future = pool.submit(
+                    contextvars.copy_context().run,
+                    self.resume_agent.parse_or_fallback,
+                    resume_text,
+                )
+            items, stats = StagedPipeline(self.NAME, stages).run(
+                (i, q, loc) for i, (q, loc) in enumerate(searches)
+            )
+        finally:
+            # Messages still being written past the deadline are dropped
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        resume = run.resume()
+        matcher.save_scores(resume, [(item.task, item.fit) for item in run.scored])
+
+        return PipelineResult(
+            resume=resume,
+            jobs=self._results(items),
+            scored=self._results(run.scored),
+            dedup=run.dedup,
+            stages=stats,
+        )
+
+    def write_outreach(
+        self, resume: Resume, scored: Sequence[Tuple[Job, FitScore]]
+    ) -> PipelineResult:
+        """
+        Only the outreach and track stages, for jobs scored earlier
+        (e.g. by a run with outreach=False).
+        """
+        run = _Run(min_score=0)
+        run.resume_future = Future()
+        run.resume_future.set_result((resume, False))
+
+        items = []
+        for i, (job, fit) in enumerate(scored):
+            item = _Item(i, job)
+            item.fit = fit
+            items.append(item)
+
+        items, stats = StagedPipeline(self.NAME, self._output_stages(run)).run(items)
+        return PipelineResult(resume=resume, jobs=self._results(items), stages=stats)
+
+    # -----------------------------
+    # STAGES
+    # -----------------------------
+
+    def _output_stages(self, run: _Run) -> List[Stage]:
+        stages = []
+        if self.outreach:
+            stages.append(Stage(
+                "outreach",
+                lambda batch: [self._write_message(run, item) for item in batch],
+                workers=settings.PIPELINE_OUTREACH_WORKERS,
+            ))
+        if self.track:
+            stages.append(Stage(
+                "track",
+                self._track,
+                batch_size=settings.PIPELINE_TRACK_BATCH,
+            ))
+        return stages
+
+    def _embed(
+        self, run: _Run, matcher: MatcherAgent, batch: List[_Item]
+    ) -> List[_Item]:
+        resume = run.resume()
+        tasks = matcher.prepare(resume, [item.job for item in batch])
+
+        for item, task in zip(batch, tasks):
+            item.task = task
+            # final_score is never below base_score: this job is kept, so
+            # start its message now
+            if (
+                run.speculation is not None
+                and task.cached is None
+                and task.base_score >= run.min_score
+                and not deadline_expired()
+            ):
+                item.pending = (task.base_score, run.speculation.submit(
+                    contextvars.copy_context().run,
+                    self._message, resume, item.job, task.base_score,
+                ))
+        return batch
+
+    def _score(
+        self, run: _Run, matcher: MatcherAgent, batch: List[_Item]
+    ) -> List[_Item]:
+        kept = []
+        for item in batch:
+            item.fit = matcher.score_prepared(run.resume(), item.task)
+            item.status = (
+                JobStatus.TIMED_OUT if item.fit.timed_out
+                else JobStatus.BUDGET_EXCEEDED if item.fit.budget_exceeded
+                else JobStatus.DEGRADED if item.fit.llm_unavailable
+                else JobStatus.COMPLETE
+            )
+            with run.lock:
+                run.scored.append(item)
+            if run.skip_degraded and item.fit.degraded:
+                continue
+            if item.fit.final_score >= run.min_score:
+                kept.append(item)
+        return kept
+
+    def _write_message(self, run: _Run, item: _Item) -> _Item:
+        fit = item.fit
+        score = fit.final_score
+
+        pending = item.pending
+        if pending is not None and (
+            OutreachAgent.confident(pending[0]) != OutreachAgent.confident(score)
+        ):
+            # Written in the tone of the lower score
+            pending[1].cancel()
+            pending = None
+
+        # item.status already reflects how the job was scored
+        if pending is None and (fit.timed_out or fit.budget_exceeded):
+            return item
+        if pending is None and deadline_expired() and not fit.llm_unavailable:
+            item.status = JobStatus.SCORED_ONLY
+            return item
+
+        try:
+            item.message, templated = (
+                pending[1].result(timeout=clamp_timeout(None))
+                if pending is not None
+                else self._message(run.resume(), item.job, score)
+            )
+            if templated and item.status == JobStatus.COMPLETE:
+                item.status = JobStatus.DEGRADED
+        except TimeoutError:
+            item.status = JobStatus.MESSAGE_PENDING
+        except TokenBudgetExceeded:
+            item.status = JobStatus.BUDGET_EXCEEDED
+        return item
+
+    def _message(self, resume: Resume, job: Job, score: int) -> Tuple[str, bool]:
+        message, templated = self.outreach_agent.message_or_template(
+            resume, job, score
+        )
+        return dedupe_text(message), templated
+
+    def _track(self, batch: List[_Item]) -> List[_Item]:
+        self.tracker_agent.track_many([
+            Application(
+                job_id=item.job.job_id,
+                job_title=item.job.title,
+                company=item.job.company,
+                fit_score=item.fit.final_score,
+                outreach_message=item.message,
+            )
+            for item in batch
+        ])
+        return batch
+
+    @staticmethod
+    def _results(items: List[_Item]) -> List[ScoredJob]:
+        items.sort(key=lambda item: item.index)
+        return [
+            ScoredJob(
+                job=item.job,
+                fit=item.fit,
+                outreach_message=item.message,
+                status=item.status,
+            )
+            for item in items
+        ]
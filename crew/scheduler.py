@@ -0,0 +1,243 @@
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from config.settings import settings
+from crew.agents.matcher_agent import MatcherAgent
+from crew.agents.resume_agent import ResumeAgent
+from crew.agents.tracker_agent import TrackerAgent
+from crew.pipeline import JobSearchPipeline
+from llm.scheduler import Priority, Tenant, tenant_scope
+from schemas.application import Application
+from schemas.job import Job
+from schemas.resume import Resume
+from schemas.saved_search import RefreshedJob, RefreshResult, SavedSearch
+from storage.db import (
+    add_seen_jobs,
+    claim_saved_search,
+    due_saved_searches,
+    finish_saved_search_run,
+    get_saved_search_resume,
+    get_seen_job_keys,
+    set_saved_search_resume,
+)
+
+
+def jittered(interval_minutes: float, jitter: Optional[float] = None) -> timedelta:
+    """
+    `interval_minutes` ± `jitter` (a fraction), so searches created
+    together drift apart instead of refreshing in lockstep.
+    """
+    jitter = settings.SAVED_SEARCH_JITTER if jitter is None else jitter
+    factor = 1 + random.uniform(-jitter, jitter)
+    return timedelta(minutes=interval_minutes * factor)
+
+
+def first_run_at(interval_minutes: int, now: Optional[datetime] = None) -> datetime:
+    """
+    When a new saved search first runs: a random point within the first
+    `jitter` share of its interval.
+    """
+    now = now or datetime.utcnow()
+    spread = interval_minutes * settings.SAVED_SEARCH_JITTER
+    return now + timedelta(minutes=random.uniform(0, spread))
+
+
+# -----------------------------
+# Incremental refresh
+# -----------------------------
+
+def refresh_saved_search(search: SavedSearch) -> RefreshResult:
+    """
+    Re-run discovery for a saved search and process only postings that
+    earlier refreshes have not seen. The parsed resume is stored on the
+    first run, so later runs make no resume-parsing LLM call.
+    """
+    result = RefreshResult(search_id=search.id)
+
+    def unseen(jobs: List[Job]) -> List[Job]:
+        result.discovered = len(jobs)
+        seen = get_seen_job_keys(search.id, [_job_key(job) for job in jobs])
+        new = [job for job in jobs if _job_key(job) not in seen]
+        result.new_jobs = len(new)
+        return new
+
+    # Tracked below, only once outreach is written
+    run = JobSearchPipeline(track=False).run(
+        search.resume_text,
+        query=search.queries,
+        location=search.locations or None,
+        max_results=search.max_results,
+        min_score=search.min_score,
+        escalation_threshold=search.min_score,
+        resume=_load_resume(search),
+        job_filter=unseen,
+        # Not fully scored: left for the next refresh
+        skip_degraded=True,
+    )
+
+    processed = {}
+    try:
+        written = []
+        for scored in run.jobs:
+            if scored.outreach_message is None:
+                # Outreach failed: not tracked or marked seen, so the next
+                # refresh retries it
+                print(
+                    f"[scheduler] search {search.id}: no outreach for "
+                    f"{_job_key(scored.job)} ({scored.status.value})"
+                )
+                continue
+            written.append(scored)
+
+        TrackerAgent().track_many([
+            Application(
+                job_id=scored.job.job_id,
+                job_title=scored.job.title,
+                company=scored.job.company,
+                fit_score=scored.fit.final_score,
+                outreach_message=scored.outreach_message,
+            )
+            for scored in written
+        ])
+        for scored in written:
+            job = scored.job
+            result.results.append(
+                RefreshedJob(
+                    job_id=job.job_id,
+                    title=job.title,
+                    company=job.company,
+                    fit_score=scored.fit.final_score,
+                    outreach_message=scored.outreach_message,
+                    url=job.url,
+                )
+            )
+            processed[_job_key(job)] = scored.fit.final_score
+
+        # Fully scored jobs below the threshold are done too
+        for scored in run.scored:
+            if not scored.fit.degraded and scored.fit.final_score < search.min_score:
+                processed[_job_key(scored.job)] = scored.fit.final_score
+    finally:
+        # Even if a later step fails, jobs already tracked must not be
+        # tracked again by the next refresh
+        add_seen_jobs(search.id, processed)
+
+    return result
+
+
+def _job_key(job: Job) -> str:
+    return job.job_id or MatcherAgent.job_hash(job)
+
+
+def _load_resume(search: SavedSearch) -> Resume:
+    cached = get_saved_search_resume(search.id)
+    if cached:
+        return Resume.model_validate_json(cached)
+
+    resume = ResumeAgent().parse(search.resume_text)
+    set_saved_search_resume(search.id, resume.model_dump_json())
+    return resume
+
+
+# -----------------------------
+# Scheduler
+# -----------------------------
+
+class SavedSearchScheduler:
+    """
+    In-process scheduler that refreshes due saved searches.
+
+    A daemon thread polls for due searches every `poll_s` (with jitter)
+    and runs them one at a time, pausing a random `stagger_s` between
+    them, so a batch of searches due at once reaches SerpAPI and Groq as
+    a trickle rather than a burst. Each run is claimed in the database
+    first, so several workers may each run a scheduler safely; the next
+    run is scheduled `interval_minutes` ± jitter after the current one.
+    """
+
+    def __init__(
+        self,
+        poll_s: Optional[float] = None,
+        stagger_s: Optional[float] = None,
+    ):
+        self.poll_s = poll_s if poll_s is not None else settings.SAVED_SEARCH_POLL_S
+        self.stagger_s = (
+            stagger_s if stagger_s is not None else settings.SAVED_SEARCH_STAGGER_S
+        )
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._loop, name="saved-search-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_due(self) -> int:
+        """Refresh every search due now; returns how many ran."""
+        ran = 0
+        for search in due_saved_searches(datetime.utcnow()):
+            if self._stop.is_set():
+                break
+            if ran and self._stop.wait(random.uniform(0, self.stagger_s)):
+                break
+            if self._run(search):
+                ran += 1
+        return ran
+
+    # -----------------------------
+    # INTERNAL HELPERS
+    # -----------------------------
+
+    def _loop(self) -> None:
+        # Desynchronise workers that started together
+        if self._stop.wait(random.uniform(0, self.poll_s)):
+            return
+        while not self._stop.is_set():
+            try:
+                self.run_due()
+            except Exception as e:  # keep the scheduler alive
+                print(f"[scheduler] poll failed: {e}")
+            if self._stop.wait(self.poll_s * random.uniform(0.8, 1.2)):
+                return
+
+    def _run(self, search: SavedSearch) -> bool:
+        started = datetime.utcnow()
+        # Lease long enough for one refresh; renewed by finishing the run
+        lease_until = started + timedelta(minutes=settings.SAVED_SEARCH_LEASE_MIN)
+        if not claim_saved_search(search.id, search.next_run_at, lease_until):
+            return False
+
+        error = None
+        start = time.perf_counter()
+        try:
+            # Background work: queued behind interactive requests
+            with tenant_scope(Tenant(f"saved-search:{search.id}", Priority.BATCH)):
+                result = refresh_saved_search(search)
+            print(
+                f"[scheduler] search {search.id}: {result.new_jobs} new of "
+                f"{result.discovered}, {len(result.results)} above threshold "
+                f"({time.perf_counter() - start:.1f}s)"
+            )
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"[scheduler] search {search.id} failed: {error}")
+
+        finish_saved_search_run(
+            search.id,
+            ran_at=started,
+            next_run_at=started + jittered(search.interval_minutes),
+            error=error,
+        )
+        return True
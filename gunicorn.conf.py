@@ -0,0 +1,37 @@
+"""
+Multi-worker deployment:
+
+    gunicorn main:app -c gunicorn.conf.py
+
+The app and the embedding model are loaded once in the master process
+before workers are forked, so the model weights are shared
+copy-on-write instead of being loaded once per worker. Set
+EMBEDDING_STORE_DIR to also share cached embedding vectors between
+workers through a memory-mapped file.
+"""
+
+import gc
+
+from config.settings import settings
+
+bind = "0.0.0.0:8000"
+workers = settings.WEB_CONCURRENCY
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+
+def when_ready(server):
+    if settings.PRELOAD_EMBEDDING_MODEL:
+        from tools.embedding import get_embedding_model
+
+        # Load weights only; running inference here would start torch's
+        # thread pool, which does not survive fork.
+        model = get_embedding_model()
+        model.backend
+        server.log.info(
+            f"Preloaded embedding model {model.model_name} ({model.backend_name})"
+        )
+
+    # Move everything loaded so far out of the GC's reach so that
+    # collections in the workers don't touch (and copy) shared pages.
+    gc.freeze()
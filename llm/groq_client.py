@@ -1,29 +1,75 @@
-from typing import Optional, List, Dict
-
-from groq import Groq
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Deque, Optional, List, Dict, Tuple
 
 from config.settings import settings
 from llm.models import GroqReasoningModels
+from llm.routing import (
+    DEFAULT_MAX_TOKENS,
+    LLMCallRecord,
+    ModelRouter,
+    TaskType,
+    estimate_tokens,
+    routing_stats,
+)
+from llm.scheduler import llm_scheduler
+from llm.usage import TokenBudgetExceeded, check_token_budget, current_meter
+from tools.circuit_breaker import (
+    CircuitOpenError,
+    breaker_from_settings,
+    is_client_error,
+)
+from tools.deadline import (
+    DeadlineExceeded,
+    check_deadline,
+    clamp_timeout,
+    deadline_expired,
+)
+from tools.singleflight import SingleFlight
+
+
+# Identical prompts in flight at the same time share one completion
+_generate_flight = SingleFlight("llm_generate")
+
+# Shared by every model: they are all served by the same API
+groq_breaker = breaker_from_settings("groq", settings.GROQ_SLOW_CALL_S)
 
 
 class GroqLLM:
     """
     Thin wrapper around Groq chat completion API.
     This class is ONLY for reasoning / generation models.
+
+    Unless a model is pinned, each call is routed by task type and prompt
+    size (see llm.routing). Callers may pass `accept` to run a cascade:
+    if it rejects a model's answer, the next model in the route is tried.
+
+    Token usage of every call is recorded in the process-wide routing
+    stats and in the current request's UsageMeter (see llm.usage), which
+    may also refuse calls once a per-request token budget is spent.
     """
 
     def __init__(
         self,
         model: Optional[GroqReasoningModels] = None,
         temperature: float = 0.3,
-        max_tokens: int = 1024,
+        max_tokens: Optional[int] = None,
+        router: Optional[ModelRouter] = None,
     ):
         if not settings.GROQ_API_KEY:
             raise RuntimeError(
                 "GROQ_API_KEY is not set. Add it to your .env file."
             )
 
-        self.client = Groq(api_key=settings.GROQ_API_KEY)
+        # Imported here so that importing the agents stays cheap
+        from groq import Groq
+
+        self.client = Groq(
+            api_key=settings.GROQ_API_KEY,
+            timeout=settings.GROQ_TIMEOUT_S,
+            max_retries=settings.GROQ_MAX_RETRIES,
+        )
 
         # Default to env-defined reasoning model
         self.model: GroqReasoningModels = (
@@ -32,18 +78,121 @@ class GroqLLM:
             else GroqReasoningModels(settings.DEFAULT_LLM_MODEL)
         )
 
+        # A pinned model disables routing
+        self.router: Optional[ModelRouter] = (
+            None
+            if model is not None or not settings.LLM_ROUTING_ENABLED
+            else router or ModelRouter(default_model=self.model)
+        )
+
         self.temperature = temperature
+        # None: per-task defaults (DEFAULT_MAX_TOKENS)
         self.max_tokens = max_tokens
 
+        # Most recent calls made through this client
+        self.history: Deque[LLMCallRecord] = deque(maxlen=1000)
+
+    def max_tokens_for(self, task: TaskType) -> int:
+        if self.max_tokens is not None:
+            return self.max_tokens
+        return DEFAULT_MAX_TOKENS.get(task, DEFAULT_MAX_TOKENS[TaskType.DEFAULT])
+
+    def model_key(self, task: TaskType = TaskType.DEFAULT) -> str:
+        """
+        Identifies which model(s) may answer `task`, for cache keys.
+        """
+        if self.router is None:
+            return self.model.value
+        return self.router.signature(task)
+
     def generate(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
+        task: TaskType = TaskType.DEFAULT,
+        accept: Optional[Callable[[str], bool]] = None,
+        accept_key: Optional[str] = None,
     ) -> str:
         """
         Generate a natural-language response from a reasoning model.
+
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system prompt
+            task: Task type, used to route the call
+            accept: Optional check on the response; returning False
+                escalates to the next model in the cascade. The last
+                model's answer is returned either way.
+            accept_key: Identifies the `accept` policy. Identical calls
+                already in flight are coalesced; calls with an `accept`
+                but no `accept_key` never are.
+        """
+        key = self._flight_key(prompt, system_prompt, task, accept, accept_key)
+        if key is None:
+            return self._generate(prompt, system_prompt, task, accept)
+
+        try:
+            return _generate_flight.do(
+                key,
+                lambda: self._generate(prompt, system_prompt, task, accept),
+                timeout=clamp_timeout(None),
+            )
+        except (DeadlineExceeded, TokenBudgetExceeded):
+            # The call we joined may have run out of another request's
+            # time or tokens; only give up if we are out of ours too
+            check_deadline("LLM call")
+            check_token_budget("LLM call")
+            return self._generate(prompt, system_prompt, task, accept)
+
+    async def agenerate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        task: TaskType = TaskType.DEFAULT,
+        accept: Optional[Callable[[str], bool]] = None,
+        accept_key: Optional[str] = None,
+    ) -> str:
         """
+        Async variant of `generate`; coalesces with sync callers too.
+        """
+        def run():
+            return asyncio.to_thread(
+                self._generate, prompt, system_prompt, task, accept
+            )
+
+        key = self._flight_key(prompt, system_prompt, task, accept, accept_key)
+        if key is None:
+            return await run()
+
+        return await _generate_flight.do_async(key, run)
+
+    def _flight_key(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        task: TaskType,
+        accept: Optional[Callable[[str], bool]],
+        accept_key: Optional[str],
+    ) -> Optional[tuple]:
+        if accept is not None and accept_key is None:
+            return None
+        return (
+            self.model_key(task),
+            task.value,
+            self.temperature,
+            self.max_tokens_for(task),
+            system_prompt,
+            prompt,
+            accept_key,
+        )
 
+    def _generate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        task: TaskType,
+        accept: Optional[Callable[[str], bool]],
+    ) -> str:
         messages: List[Dict[str, str]] = []
 
         if system_prompt:
@@ -55,11 +204,81 @@ class GroqLLM:
             {"role": "user", "content": prompt.strip()}
         )
 
-        response = self.client.chat.completions.create(
-            model=self.model.value,
-            messages=messages,
-            temperature=self.temperature,
-            max_tokens=self.max_tokens,
+        cascade = (
+            self.router.cascade(task, prompt)
+            if self.router is not None
+            else [self.model]
+        )
+
+        content = ""
+        for attempt, model in enumerate(cascade):
+            content, record = self._complete(
+                model, messages, task, escalated=attempt > 0
+            )
+
+            if accept is None or attempt == len(cascade) - 1:
+                break
+
+            if accept(content):
+                break
+
+            record.accepted = False
+            routing_stats.record_rejection(task, model)
+
+        return content
+
+    def _complete(
+        self,
+        model: GroqReasoningModels,
+        messages: List[Dict[str, str]],
+        task: TaskType,
+        escalated: bool,
+    ) -> Tuple[str, LLMCallRecord]:
+        check_deadline("LLM call")
+        check_token_budget(f"{task.value} LLM call")
+
+        max_tokens = self.max_tokens_for(task)
+        # Charged to the tenant's fair share
+        cost = sum(estimate_tokens(m["content"]) for m in messages) + max_tokens
+
+        try:
+            # Waits for a slot, then raises CircuitOpenError without calling
+            # while Groq is failing
+            with llm_scheduler.slot(cost=cost):
+                start = time.perf_counter()
+                response = groq_breaker.call(
+                    lambda: self.client.chat.completions.create(
+                        model=model.value,
+                        messages=messages,
+                        temperature=self.temperature,
+                        max_tokens=max_tokens,
+                        timeout=clamp_timeout(settings.GROQ_TIMEOUT_S),
+                    ),
+                    # Cut short by our own deadline, or a bad request (e.g.
+                    # prompt too long): says nothing about Groq
+                    ignore_failure=lambda e: deadline_expired() or is_client_error(e),
+                )
+        except (CircuitOpenError, DeadlineExceeded):
+            raise
+        except Exception as e:
+            if deadline_expired():
+                raise DeadlineExceeded("Deadline exceeded during LLM call") from e
+            raise
+
+        usage = getattr(response, "usage", None)
+        record = LLMCallRecord(
+            task=task,
+            model=model.value,
+            latency_ms=(time.perf_counter() - start) * 1000,
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+            escalated=escalated,
         )
+        self.history.append(record)
+        routing_stats.record(record)
+
+        meter = current_meter()
+        if meter is not None:
+            meter.record(record)
 
-        return response.choices[0].message.content.strip()
+        return response.choices[0].message.content.strip(), record
@@ -0,0 +1,176 @@
+import threading
+from collections import defaultdict
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from config.settings import settings
+from llm.models import GroqReasoningModels
+
+
+class TaskType(str, Enum):
+    DEFAULT = "default"
+    RESUME_PARSE = "resume_parse"
+    SCORE = "score"
+    OUTREACH = "outreach"
+
+
+class Route(BaseModel):
+    """
+    Models to try for a task, cheapest first. Later models are only used
+    when the caller rejects an earlier model's answer (cascade).
+    """
+
+    cascade: List[GroqReasoningModels]
+
+    # Prompts longer than this (estimated tokens) skip straight to the
+    # last model in the cascade
+    long_prompt_tokens: Optional[int] = None
+
+
+DEFAULT_ROUTES: Dict[TaskType, Route] = {
+    # Integer 0–100: the small model is usually enough; escalate when the
+    # answer is unparseable or too close to the caller's threshold
+    TaskType.SCORE: Route(
+        cascade=[GroqReasoningModels.LLAMA3_8B, GroqReasoningModels.LLAMA3_70B],
+    ),
+    # Strict JSON: escalate when the small model's output doesn't parse
+    TaskType.RESUME_PARSE: Route(
+        cascade=[GroqReasoningModels.LLAMA3_8B, GroqReasoningModels.LLAMA3_70B],
+        long_prompt_tokens=6000,
+    ),
+    # Outreach (one call per passing job) has no route: it runs on the
+    # default model unless OUTREACH_LLM_MODEL opts into another one
+}
+
+
+# Completion budget per task, sized to what each stage returns
+DEFAULT_MAX_TOKENS: Dict[TaskType, int] = {
+    TaskType.SCORE: 16,  # a single integer
+    TaskType.RESUME_PARSE: 1024,  # JSON with lists of skills / roles / tools
+    TaskType.OUTREACH: 320,  # one message, under 120 words
+    TaskType.DEFAULT: 1024,
+}
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose
+    return len(text) // 4 + 1
+
+
+class ModelRouter:
+    """
+    Picks the model cascade for a call from its task type and prompt size.
+    """
+
+    def __init__(
+        self,
+        routes: Optional[Dict[TaskType, Route]] = None,
+        default_model: Optional[GroqReasoningModels] = None,
+    ):
+        self.default_model = default_model or GroqReasoningModels(
+            settings.DEFAULT_LLM_MODEL
+        )
+        if routes is None:
+            routes = dict(DEFAULT_ROUTES)
+            if settings.OUTREACH_LLM_MODEL:
+                routes[TaskType.OUTREACH] = Route(
+                    cascade=[GroqReasoningModels(settings.OUTREACH_LLM_MODEL)],
+                )
+        self.routes = routes
+
+    def cascade(self, task: TaskType, prompt: str) -> List[GroqReasoningModels]:
+        route = self.routes.get(task)
+        if route is None or not route.cascade:
+            return [self.default_model]
+
+        if (
+            route.long_prompt_tokens is not None
+            and estimate_tokens(prompt) > route.long_prompt_tokens
+        ):
+            return route.cascade[-1:]
+
+        return list(route.cascade)
+
+    def signature(self, task: TaskType) -> str:
+        """
+        Stable description of the models a task may use (for cache keys).
+        """
+        route = self.routes.get(task)
+        if route is None or not route.cascade:
+            return self.default_model.value
+        return ">".join(model.value for model in route.cascade)
+
+
+# -----------------------------
+# Call records & aggregate stats
+# -----------------------------
+
+class LLMCallRecord(BaseModel):
+    task: TaskType
+    model: str
+    latency_ms: float
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    escalated: bool = Field(
+        default=False,
+        description="True if an earlier model in the cascade was rejected"
+    )
+    accepted: bool = True
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+class RoutingStats:
+    """
+    Process-wide per (task, model) counters.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(
+            lambda: {
+                "calls": 0,
+                "escalations": 0,
+                "rejected": 0,
+                "latency_ms": 0.0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "total_tokens": 0,
+            }
+        )
+
+    def record(self, call: LLMCallRecord) -> None:
+        with self._lock:
+            totals = self._totals[(call.task.value, call.model)]
+            totals["calls"] += 1
+            totals["escalations"] += int(call.escalated)
+            totals["latency_ms"] += call.latency_ms
+            totals["prompt_tokens"] += call.prompt_tokens
+            totals["completion_tokens"] += call.completion_tokens
+            totals["total_tokens"] += call.total_tokens
+
+    def record_rejection(self, task: TaskType, model: GroqReasoningModels) -> None:
+        with self._lock:
+            self._totals[(task.value, model.value)]["rejected"] += 1
+
+    def snapshot(self) -> List[dict]:
+        with self._lock:
+            return [
+                {
+                    "task": task,
+                    "model": model,
+                    **totals,
+                    "avg_latency_ms": (
+                        totals["latency_ms"] / totals["calls"]
+                        if totals["calls"] else 0.0
+                    ),
+                }
+                for (task, model), totals in sorted(self._totals.items())
+            ]
+
+
+routing_stats = RoutingStats()
@@ -0,0 +1,257 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from config.settings import settings
+from tools.deadline import DeadlineExceeded, clamp_timeout
+
+
+class Priority(IntEnum):
+    # Lower value is served first
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+class Tenant:
+    """Who an LLM call is made for, and how it is queued."""
+
+    __slots__ = ("name", "priority", "weight")
+
+    def __init__(
+        self,
+        name: str,
+        priority: Priority = Priority.INTERACTIVE,
+        weight: Optional[float] = None,
+    ):
+        self.name = name
+        self.priority = priority
+        self.weight = (
+            weight if weight is not None
+            else settings.LLM_TENANT_WEIGHTS.get(name, 1.0)
+        )
+
+
+class _Ticket:
+    __slots__ = ("tenant", "start", "finish", "enqueued_at", "granted", "cancelled")
+
+    def __init__(self, tenant: Tenant, start: float, finish: float):
+        self.tenant = tenant
+        self.start = start
+        self.finish = finish
+        self.enqueued_at = time.perf_counter()
+        self.granted = False
+        self.cancelled = False
+
+
+class _Flow:
+    # Per (priority, tenant) queue state
+    __slots__ = ("last_finish", "queued", "active")
+
+    def __init__(self):
+        self.last_finish = 0.0
+        self.queued = 0
+        self.active = 0
+
+
+# Sweep idle flows once this many are tracked
+_MAX_FLOWS = 1000
+
+
+class LLMScheduler:
+    """
+    Process-wide admission for LLM calls: at most `max_concurrency` run
+    at once, and waiting calls are served by weighted fair queuing.
+
+    Each tenant (a user, or a request when no user is known) has its own
+    flow. A queued call gets a virtual finish tag of
+    max(class virtual time, tenant's previous finish) + cost / weight,
+    and the free slot goes to the smallest tag. A tenant with a long
+    backlog therefore cannot hold back a tenant that sends one call: the
+    newcomer's tag starts at the current virtual time, ahead of the
+    backlog. Priority classes are strict: queued interactive calls
+    always go before batch ones.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[int, float, int, _Ticket]] = []
+        self._seq = itertools.count()
+        self._active = 0
+        self._vtime: Dict[Priority, float] = defaultdict(float)
+        self._flows: Dict[Tuple[Priority, str], _Flow] = {}
+
+        self._waits: Dict[Priority, Deque[float]] = defaultdict(lambda: deque(maxlen=1000))
+        self._stats: Dict[Priority, Dict[str, float]] = defaultdict(
+            lambda: {"admitted": 0, "timed_out": 0, "wait_ms": 0.0, "max_wait_ms": 0.0}
+        )
+
+    # -----------------------------
+    # PUBLIC API
+    # -----------------------------
+
+    @contextmanager
+    def slot(self, tenant: Optional[Tenant] = None, cost: float = 1.0) -> Iterator[None]:
+        """
+        Hold one of the concurrency slots for the duration of the block.
+        `cost` (e.g. estimated tokens) is what the tenant is charged.
+        Waiting is bounded by the current request deadline.
+        """
+        tenant = tenant or current_tenant()
+        self._acquire(tenant, cost)
+        try:
+            yield
+        finally:
+            self._release(tenant)
+
+    def stats(self) -> dict:
+        with self._cond:
+            queued: Dict[str, Dict[str, int]] = defaultdict(dict)
+            for (priority, name), flow in self._flows.items():
+                if flow.queued:
+                    queued[priority.name.lower()][name] = flow.queued
+
+            classes = {}
+            for priority in Priority:
+                stats = self._stats[priority]
+                waits = sorted(self._waits[priority])
+                classes[priority.name.lower()] = {
+                    "queued": sum(queued[priority.name.lower()].values()),
+                    "admitted": stats["admitted"],
+                    "timed_out": stats["timed_out"],
+                    "avg_wait_ms": (
+                        stats["wait_ms"] / stats["admitted"] if stats["admitted"] else 0.0
+                    ),
+                    "p95_wait_ms": waits[int(len(waits) * 0.95)] if waits else 0.0,
+                    "max_wait_ms": stats["max_wait_ms"],
+                }
+
+            return {
+                "max_concurrency": self.max_concurrency,
+                "active": self._active,
+                "queued": sum(c["queued"] for c in classes.values()),
+                "classes": classes,
+                "queued_by_tenant": dict(queued),
+            }
+
+    # -----------------------------
+    # INTERNAL HELPERS
+    # -----------------------------
+
+    def _acquire(self, tenant: Tenant, cost: float) -> None:
+        key = (tenant.priority, tenant.name)
+
+        with self._cond:
+            flow = self._flows.setdefault(key, _Flow())
+            start = max(self._vtime[tenant.priority], flow.last_finish)
+            ticket = _Ticket(tenant, start, start + cost / tenant.weight)
+            flow.last_finish = ticket.finish
+            flow.queued += 1
+
+            heapq.heappush(
+                self._heap, (tenant.priority, ticket.finish, next(self._seq), ticket)
+            )
+            self._dispatch()
+
+            while not ticket.granted:
+                timeout = clamp_timeout(None)
+                if timeout is not None and timeout <= 0:
+                    # Left in the heap; skipped when it reaches the top
+                    ticket.cancelled = True
+                    flow.queued -= 1
+                    self._stats[tenant.priority]["timed_out"] += 1
+                    self._forget(key)
+                    raise DeadlineExceeded("Deadline exceeded waiting for an LLM slot")
+                self._cond.wait(timeout)
+
+            wait_ms = (time.perf_counter() - ticket.enqueued_at) * 1000
+            stats = self._stats[tenant.priority]
+            stats["admitted"] += 1
+            stats["wait_ms"] += wait_ms
+            stats["max_wait_ms"] = max(stats["max_wait_ms"], wait_ms)
+            self._waits[tenant.priority].append(wait_ms)
+
+    def _release(self, tenant: Tenant) -> None:
+        key = (tenant.priority, tenant.name)
+        with self._cond:
+            self._active -= 1
+            self._flows[key].active -= 1
+            self._forget(key)
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        granted = False
+        while self._heap and self._active < self.max_concurrency:
+            _, _, _, ticket = heapq.heappop(self._heap)
+            if ticket.cancelled:
+                continue
+
+            tenant = ticket.tenant
+            flow = self._flows[(tenant.priority, tenant.name)]
+            flow.queued -= 1
+            flow.active += 1
+            self._active += 1
+            # Start-time fair queuing: virtual time follows the start tag
+            # of the call last put in service
+            self._vtime[tenant.priority] = max(
+                self._vtime[tenant.priority], ticket.start
+            )
+            ticket.granted = True
+            granted = True
+
+        if granted:
+            self._cond.notify_all()
+
+    def _forget(self, key: Tuple[Priority, str]) -> None:
+        # Drop idle flows so per-request tenants don't accumulate. An idle
+        # flow whose last finish tag is behind the virtual time carries no
+        # state: its next call would start at the virtual time anyway.
+        flow = self._flows.get(key)
+        if flow is not None and self._idle(key, flow):
+            del self._flows[key]
+
+        if len(self._flows) > _MAX_FLOWS:
+            for key, flow in list(self._flows.items()):
+                if self._idle(key, flow):
+                    del self._flows[key]
+
+    def _idle(self, key: Tuple[Priority, str], flow: _Flow) -> bool:
+        return (
+            not flow.queued
+            and not flow.active
+            and flow.last_finish <= self._vtime[key[0]]
+        )
+
+
+llm_scheduler = LLMScheduler(max_concurrency=settings.LLM_MAX_CONCURRENCY)
+
+
+# -----------------------------
+# Tenant of the current request
+# -----------------------------
+
+_DEFAULT_TENANT = Tenant("default", Priority.INTERACTIVE)
+
+# Tenant of the request being served by this thread / task.
+# Thread pools must copy the context (contextvars.copy_context) to see it.
+_current: ContextVar[Optional[Tenant]] = ContextVar("llm_tenant", default=None)
+
+
+def current_tenant() -> Tenant:
+    return _current.get() or _DEFAULT_TENANT
+
+
+@contextmanager
+def tenant_scope(tenant: Optional[Tenant]) -> Iterator[Optional[Tenant]]:
+    token = _current.set(tenant)
+    try:
+        yield tenant
+    finally:
+        _current.reset(token)
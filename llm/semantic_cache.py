@@ -0,0 +1,263 @@
+import random
+import re
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config.settings import settings
+from tools.embedding import get_embedding_model
+
+
+def normalize_input(text: str) -> str:
+    """Case and whitespace differences never change the cache key."""
+    return re.sub(r"\s+", " ", text or "").strip().lower()
+
+
+class _Index:
+    """
+    Fixed-size vector index for one (stage, model) scope. Each entry has
+    one normalized vector per prompt input. The oldest entry is
+    overwritten when the index is full.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.vectors: Optional[np.ndarray] = None  # (capacity, parts, dim)
+        self.outputs: List[Optional[str]] = [None] * capacity
+        self.keys: List[Optional[Tuple[str, ...]]] = [None] * capacity
+        self.exact: Dict[Tuple[str, ...], int] = {}
+        self.size = 0
+        self.next = 0
+
+    def nearest(self, query: np.ndarray) -> Tuple[int, float]:
+        """Best row and its similarity: the lowest cosine over the inputs."""
+        sims = np.einsum("npd,pd->np", self.vectors[: self.size], query).min(axis=1)
+        row = int(np.argmax(sims))
+        return row, float(sims[row])
+
+    def put(
+        self, key: Tuple[str, ...], query: Optional[np.ndarray], output: str
+    ) -> None:
+        # query is None for exact-only caches, which keep no vectors
+        row = self.exact.get(key)
+        if row is None:
+            if self.vectors is None and query is not None:
+                self.vectors = np.zeros(
+                    (self.capacity, *query.shape), dtype=np.float32
+                )
+            row = self.next
+            self.next = (self.next + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+            old = self.keys[row]
+            if old is not None:
+                del self.exact[old]
+            self.keys[row] = key
+            self.exact[key] = row
+        if query is not None:
+            self.vectors[row] = query
+        self.outputs[row] = output
+
+
+class SemanticCache:
+    """
+    Reuses LLM outputs for prompts whose inputs are nearly identical to an
+    earlier call's, e.g. a job reposted with a new id or a resume with
+    whitespace edits.
+
+    The caller passes the prompt's inputs (e.g. resume and job text)
+    rather than the prompt itself. Each input is normalized and embedded
+    with the shared embedding model. An earlier output is reused when
+    every input's cosine similarity to that entry reaches the threshold.
+    Requiring every input to match means an answer is reused only when
+    the resume and the job are both near-identical. Near-identical inputs
+    from different sources (e.g. two candidates' resumes on the same
+    template) can still share an answer. Inputs that normalize to exactly
+    the same strings hit without being embedded.
+
+    With `exact_only`, only inputs that normalize to the same strings
+    hit. Use it for stages where a near match may still call for a
+    different answer.
+
+    Entries are scoped per model key, and each stage has its own
+    instance. A share (`verify_rate`) of hits still make the LLM call.
+    Comparing that answer with the cached one (`same`) estimates the
+    false-hit rate, and the fresh answer replaces the entry.
+    """
+
+    def __init__(
+        self,
+        stage: str,
+        threshold: Optional[float] = None,
+        capacity: Optional[int] = None,
+        verify_rate: Optional[float] = None,
+        exact_only: bool = False,
+    ):
+        self.stage = stage
+        self.exact_only = exact_only
+        self.threshold = (
+            threshold if threshold is not None else settings.SEMANTIC_CACHE_THRESHOLD
+        )
+        self.capacity = capacity or settings.SEMANTIC_CACHE_CAPACITY
+        self.verify_rate = (
+            verify_rate if verify_rate is not None
+            else settings.SEMANTIC_CACHE_VERIFY_RATE
+        )
+
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, _Index] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._false_hits: Deque[dict] = deque(maxlen=20)
+        _registry.append(self)
+
+    @property
+    def enabled(self) -> bool:
+        return self.stage in settings.SEMANTIC_CACHE_STAGES
+
+    # -----------------------------
+    # PUBLIC API
+    # -----------------------------
+
+    def get_or_generate(
+        self,
+        model_key: str,
+        inputs: Sequence[str],
+        generate: Callable[[], str],
+        same: Optional[Callable[[str, str], bool]] = None,
+        valid: Optional[Callable[[str], bool]] = None,
+    ) -> str:
+        """
+        A cached output for `inputs` under `model_key`, or `generate()`,
+        which is then cached unless `valid` rejects it. `same(cached,
+        fresh)` decides whether a verified hit was correct (default:
+        equal strings).
+        """
+        if not self.enabled:
+            return generate()
+
+        key = tuple(normalize_input(text) for text in inputs)
+        query = None
+
+        with self._lock:
+            stats = self._scope_stats(model_key)
+            stats["lookups"] += 1
+            index = self._indexes.get(model_key)
+            row = index.exact.get(key) if index is not None else None
+            if row is not None:
+                hit: Optional[Tuple[str, float]] = (index.outputs[row], 1.0)
+                stats["exact_hits"] += 1
+            else:
+                hit = None
+
+        if hit is None and not self.exact_only:
+            query = get_embedding_model().embed_documents(list(key)).astype(np.float32)
+            with self._lock:
+                index = self._indexes.get(model_key)
+                if index is not None and index.size:
+                    row, similarity = index.nearest(query)
+                    if similarity >= self.threshold:
+                        hit = (index.outputs[row], similarity)
+
+        if hit is None:
+            output = generate()
+            if valid is None or valid(output):
+                self._put(model_key, key, query, output)
+            with self._lock:
+                stats["misses"] += 1
+            return output
+
+        cached, similarity = hit
+        with self._lock:
+            stats["hits"] += 1
+            stats["similarity"] += similarity
+
+        if random.random() >= self.verify_rate:
+            return cached
+
+        try:
+            fresh = generate()
+        except Exception:
+            # Verification is best effort: the cached answer still stands
+            return cached
+
+        correct = same(cached, fresh) if same is not None else cached == fresh
+        with self._lock:
+            stats["verified"] += 1
+            if not correct:
+                stats["false_hits"] += 1
+                self._false_hits.append({
+                    "model": model_key,
+                    "similarity": round(similarity, 4),
+                    "cached": cached[:200],
+                    "fresh": fresh[:200],
+                })
+        if valid is None or valid(fresh):
+            self._put(model_key, key, query, fresh)
+        return fresh
+
+    def stats(self) -> dict:
+        with self._lock:
+            models = {}
+            for model_key, stats in self._stats.items():
+                hits = stats["hits"]
+                index = self._indexes.get(model_key)
+                models[model_key] = {
+                    "entries": index.size if index is not None else 0,
+                    "lookups": stats["lookups"],
+                    "hits": hits,
+                    "exact_hits": stats["exact_hits"],
+                    "misses": stats["misses"],
+                    "hit_rate": hits / stats["lookups"] if stats["lookups"] else 0.0,
+                    "avg_hit_similarity": stats["similarity"] / hits if hits else 0.0,
+                    "verified": stats["verified"],
+                    "false_hits": stats["false_hits"],
+                    "false_hit_rate": (
+                        stats["false_hits"] / stats["verified"]
+                        if stats["verified"] else 0.0
+                    ),
+                }
+            return {
+                "stage": self.stage,
+                "enabled": self.enabled,
+                "threshold": None if self.exact_only else self.threshold,
+                "verify_rate": self.verify_rate,
+                "models": models,
+                "recent_false_hits": list(self._false_hits),
+            }
+
+    # -----------------------------
+    # INTERNAL HELPERS
+    # -----------------------------
+
+    def _put(
+        self,
+        model_key: str,
+        key: Tuple[str, ...],
+        query: Optional[np.ndarray],
+        output: str,
+    ) -> None:
+        if query is None and not self.exact_only:
+            query = get_embedding_model().embed_documents(list(key)).astype(np.float32)
+        with self._lock:
+            index = self._indexes.get(model_key)
+            if index is None:
+                index = self._indexes[model_key] = _Index(self.capacity)
+            index.put(key, query, output)
+
+    def _scope_stats(self, model_key: str) -> Dict[str, float]:
+        stats = self._stats.get(model_key)
+        if stats is None:
+            stats = self._stats[model_key] = {
+                "lookups": 0, "hits": 0, "exact_hits": 0, "misses": 0,
+                "similarity": 0.0, "verified": 0, "false_hits": 0,
+            }
+        return stats
+
+
+_registry: List[SemanticCache] = []
+
+
+def semantic_cache_stats() -> List[dict]:
+    """Hit and false-hit counters for every SemanticCache in the process."""
+    return [cache.stats() for cache in _registry]
@@ -0,0 +1,105 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from pydantic import BaseModel, Field
+
+from llm.routing import LLMCallRecord
+
+
+class TokenBudgetExceeded(RuntimeError):
+    """Raised when an LLM call is attempted after the token budget is spent."""
+
+
+class StageUsage(BaseModel):
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    latency_ms: float = 0.0
+
+    def add(self, call: LLMCallRecord) -> None:
+        self.calls += 1
+        self.prompt_tokens += call.prompt_tokens
+        self.completion_tokens += call.completion_tokens
+        self.total_tokens += call.total_tokens
+        self.latency_ms += call.latency_ms
+
+
+class UsageSummary(BaseModel):
+    total: StageUsage = Field(default_factory=StageUsage)
+    stages: Dict[str, StageUsage] = Field(
+        default_factory=dict,
+        description="Usage per task type (resume_parse, score, outreach, ...)",
+    )
+    token_budget: Optional[int] = None
+    budget_exceeded: bool = False
+
+
+class UsageMeter:
+    """
+    LLM token usage of one request (or batch record).
+
+    Shared by every thread working on the request: copies of the context
+    (contextvars.copy_context) refer to the same meter. With a
+    `token_budget`, calls are refused once the budget is spent; a call
+    already running when that happens may overshoot it by its own size.
+    """
+
+    def __init__(self, token_budget: Optional[int] = None):
+        self.token_budget = token_budget
+        self.records: List[LLMCallRecord] = []
+        self._lock = threading.Lock()
+        self._spent = 0
+        self._refused = False
+
+    @property
+    def spent(self) -> int:
+        return self._spent
+
+    def record(self, call: LLMCallRecord) -> None:
+        with self._lock:
+            self.records.append(call)
+            self._spent += call.total_tokens
+
+    def check(self, what: str = "LLM call") -> None:
+        if self.token_budget is not None and self._spent >= self.token_budget:
+            self._refused = True
+            raise TokenBudgetExceeded(
+                f"Token budget of {self.token_budget} spent before {what}"
+            )
+
+    def summary(self) -> UsageSummary:
+        with self._lock:
+            summary = UsageSummary(
+                token_budget=self.token_budget,
+                budget_exceeded=self._refused,
+            )
+            for call in self.records:
+                summary.total.add(call)
+                summary.stages.setdefault(call.task.value, StageUsage()).add(call)
+            return summary
+
+
+# Meter of the request being served by this thread / task
+_current: ContextVar[Optional[UsageMeter]] = ContextVar("usage_meter", default=None)
+
+
+def current_meter() -> Optional[UsageMeter]:
+    return _current.get()
+
+
+@contextmanager
+def usage_scope(meter: Optional[UsageMeter]) -> Iterator[Optional[UsageMeter]]:
+    token = _current.set(meter)
+    try:
+        yield meter
+    finally:
+        _current.reset(token)
+
+
+def check_token_budget(what: str = "LLM call") -> None:
+    meter = current_meter()
+    if meter is not None:
+        meter.check(what)
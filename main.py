@@ -1,27 +1,111 @@
-from typing import List, Optional
+import hmac
+import os
+import tempfile
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import List, Optional, Union
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, Field, constr
+from starlette.background import BackgroundTask
 
-from crew.agents.resume_agent import ResumeAgent
-from crew.agents.job_discovery import JobDiscoveryAgent
-from crew.agents.matcher_agent import MatcherAgent
-from crew.agents.outreach_agent import OutreachAgent
-from crew.agents.tracker_agent import TrackerAgent
-from storage.db import init_db
-from utils import dedupe_text
+from config.settings import settings
+from crew.pipeline import JobSearchPipeline, JobStatus
+from crew.scheduler import (
+    SavedSearchScheduler,
+    first_run_at,
+    refresh_saved_search,
+)
+from llm.routing import routing_stats
+from llm.scheduler import Tenant, llm_scheduler, tenant_scope
+from llm.semantic_cache import semantic_cache_stats
+from llm.usage import TokenBudgetExceeded, UsageMeter, UsageSummary, usage_scope
+from schemas.saved_search import RefreshResult, SavedSearch, SavedSearchCreate
+from storage.db import (
+    create_saved_search,
+    delete_saved_search,
+    get_saved_search,
+    init_db,
+    iter_applications,
+    list_saved_searches,
+    save_llm_usage,
+)
+from storage.export import ExportFormat, iter_csv, iter_jsonl, write_parquet
+from tools.circuit_breaker import (
+    CircuitOpenError,
+    circuit_breaker_stats,
+    degraded_dependencies,
+)
+from tools.deadline import Deadline, deadline_expired, deadline_scope
+from tools.profiling import (
+    ProfileFormat,
+    SamplingProfiler,
+    find_profile,
+    save_profile,
+)
+from tools.dedup import DedupStats
+from tools.embedding import get_embedding_model, warm_up_in_background
+from tools.pipeline import pipeline_stats
+from tools.singleflight import coalescing_stats
 
 
 # -----------------------------
 # API Schemas (Request / Response)
 # -----------------------------
 
+# A query or location that is not blank once trimmed
+SearchTerm = constr(strip_whitespace=True, min_length=1)
+
+
 class RunRequest(BaseModel):
     resume_text: str
-    query: str
-    location: Optional[str] = None
-    max_results: int = 5
+    query: Union[SearchTerm, List[SearchTerm]] = Field(
+        min_length=1,
+        description="One query, or several to search in parallel",
+    )
+    location: Union[SearchTerm, List[SearchTerm], None] = Field(
+        default=None,
+        description="One location, or several; every query is searched in each",
+    )
+    max_results: int = Field(
+        default=5,
+        description="Maximum results per (query, location) search",
+    )
     min_score: int = 50
+    prefilter_top_k: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Score only the top-k jobs by BM25 match against the resume",
+    )
+    min_skill_overlap: Optional[float] = Field(
+        default=None,
+        ge=0.0,
+        le=1.0,
+        description=(
+            "Skip jobs where the resume covers less than this fraction of "
+            "the job's extracted skills (no model call needed)"
+        ),
+    )
+    deadline_ms: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description=(
+            "Latency budget for the whole request. Outstanding LLM / HTTP "
+            "calls are cut off when it runs out and finished results are "
+            "returned."
+        ),
+    )
+    token_budget: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description=(
+            "Maximum LLM tokens (prompt + completion) for the whole request. "
+            "Once spent, remaining jobs keep their embedding score and get "
+            "no outreach message."
+        ),
+    )
 
 
 class JobResult(BaseModel):
@@ -29,21 +113,51 @@ class JobResult(BaseModel):
     title: str
     company: str
     fit_score: int
-    outreach_message: str
+    outreach_message: Optional[str] = None
     url: Optional[str] = None
+    source_urls: List[str] = []
+    status: JobStatus = JobStatus.COMPLETE
 
 
 class RunResponse(BaseModel):
+    request_id: str
     results: List[JobResult]
+    dedup: Optional[DedupStats] = None
+    deadline_exceeded: bool = False
+    degraded: List[str] = Field(
+        default_factory=list,
+        description="Dependencies whose circuit breaker was open (fallbacks used)",
+    )
+    usage: Optional[UsageSummary] = Field(
+        default=None,
+        description="LLM calls / tokens / latency, in total and per stage",
+    )
 
 
 # -----------------------------
 # App initialization
 # -----------------------------
 
-app = FastAPI(title="Multi-Agent Job Search Backend")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keep import-time work to a minimum: the DB is created here and the
+    # embedding model loads on a background thread, so health checks can
+    # be answered before torch has finished importing.
+    init_db()
+    warm_up_in_background()
+
+    scheduler = None
+    if settings.SAVED_SEARCH_SCHEDULER_ENABLED:
+        scheduler = SavedSearchScheduler()
+        scheduler.start()
+
+    yield
 
-init_db()  # Initialize DB on startup
+    if scheduler is not None:
+        scheduler.stop(timeout=5)
+
+
+app = FastAPI(title="Multi-Agent Job Search Backend", lifespan=lifespan)
 
 
 # -----------------------------
@@ -55,56 +169,269 @@ def root():
     return {"message": "Multi-Agent Job Search API is running. Use /docs for Swagger UI."}
 
 
-@app.post("/run-pipeline", response_model=RunResponse)
-def run_pipeline(payload: RunRequest):
+@app.get("/health")
+def health():
+    return {
+        "status": "ok",
+        "embedding_model_loaded": get_embedding_model().is_loaded,
+    }
+
+
+@app.get("/llm/routing-stats")
+def llm_routing_stats():
+    """Per (task, model) call counts, escalations, latency and tokens."""
+    return {"routes": routing_stats.snapshot()}
+
+
+@app.get("/llm/scheduler-stats")
+def llm_scheduler_stats():
+    """Active and queued LLM calls, per priority class and tenant, and queue waits."""
+    return llm_scheduler.stats()
+
+
+@app.get("/llm/semantic-cache-stats")
+def llm_semantic_cache_stats():
+    """Semantic cache hit rates and sampled false hits, per stage and model."""
+    return {"caches": semantic_cache_stats()}
+
+
+@app.get("/coalescing-stats")
+def coalescing():
+    """Single-flight counters for SerpAPI, resume parsing and LLM calls."""
+    return {"flights": coalescing_stats()}
+
+
+@app.get("/circuit-breakers")
+def circuit_breakers():
+    """State and counters of the Groq / SerpAPI circuit breakers."""
+    return {"breakers": circuit_breaker_stats()}
+
+
+@app.get("/pipeline-stats")
+def pipeline_throughput():
+    """Items, batches and throughput per pipeline stage since start-up."""
+    return {"stages": pipeline_stats()}
+
+
+@app.post("/saved-searches", response_model=SavedSearch)
+def create_search(payload: SavedSearchCreate):
+    """Save a search; the scheduler refreshes it every interval_minutes."""
+    return create_saved_search(
+        payload, next_run_at=first_run_at(payload.interval_minutes)
+    )
+
+
+@app.get("/saved-searches", response_model=List[SavedSearch])
+def list_searches():
+    return list_saved_searches()
+
+
+@app.delete("/saved-searches/{search_id}")
+def delete_search(search_id: int):
+    if not delete_saved_search(search_id):
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    return {"deleted": search_id}
+
+
+@app.post("/saved-searches/{search_id}/refresh", response_model=RefreshResult)
+def refresh_search(search_id: int):
+    """Refresh now; only postings not seen before are scored."""
+    search = get_saved_search(search_id)
+    if search is None:
+        raise HTTPException(status_code=404, detail="Saved search not found")
     try:
-        # Initialize agents per request (avoids startup failures)
-        resume_agent = ResumeAgent()
-        job_agent = JobDiscoveryAgent()
-        matcher_agent = MatcherAgent()
-        outreach_agent = OutreachAgent()
-        tracker_agent = TrackerAgent()
+        with tenant_scope(Tenant(f"saved-search:{search_id}")):
+            return refresh_saved_search(search)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Refresh error: {str(e)}")
 
-        resume = resume_agent.parse(payload.resume_text)
 
-        jobs = job_agent.discover(
-            query=payload.query,
-            location=payload.location,
-            max_results=payload.max_results,
+@app.get("/applications/export")
+def export_applications(
+    format: ExportFormat = ExportFormat.CSV,
+    since: Optional[datetime] = Query(None, description="created_at >= since"),
+    until: Optional[datetime] = Query(None, description="created_at < until"),
+    status: Optional[List[str]] = Query(None, description="Repeatable"),
+):
+    """
+    Stream tracked applications as CSV, JSONL or Parquet.
+    """
+    rows = iter_applications(since=since, until=until, statuses=status)
+    filename = f"applications.{format.value}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+    if format == ExportFormat.PARQUET:
+        # Parquet's footer is written last, so build the file on disk
+        # (batch by batch) and stream it from there
+        fd, path = tempfile.mkstemp(suffix=".parquet")
+        os.close(fd)
+        try:
+            write_parquet(rows, path)
+        except Exception as e:
+            os.unlink(path)
+            raise HTTPException(status_code=500, detail=f"Export error: {str(e)}")
+
+        return FileResponse(
+            path,
+            media_type=format.media_type,
+            filename=filename,
+            background=BackgroundTask(os.unlink, path),
         )
 
-        scored = matcher_agent.score(resume, jobs)
+    chunks = iter_csv(rows) if format == ExportFormat.CSV else iter_jsonl(rows)
+    return StreamingResponse(chunks, media_type=format.media_type, headers=headers)
+
+
+def _check_profiling_token(request: Request) -> None:
+    token = request.headers.get("X-Profile-Token", "")
+    if not settings.PROFILING_TOKEN:
+        raise HTTPException(status_code=403, detail="Profiling is disabled")
+    if not hmac.compare_digest(token, settings.PROFILING_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+
+def _request_tenant(request: Request) -> Tenant:
+    """
+    Fair-share identity of a request. Only a configured API key earns a
+    named tenant (and its LLM_TENANT_WEIGHTS weight). Anything else is
+    queued per client IP at the default weight, so neither a made-up
+    name nor many parallel requests buy a larger share.
+    """
+    key = request.headers.get("X-API-Key", "")
+    if key:
+        for known, name in settings.LLM_TENANT_API_KEYS.items():
+            if hmac.compare_digest(key, known):
+                return Tenant(name)
+
+    host = request.client.host if request.client else "unknown"
+    return Tenant(f"ip:{host}", weight=1.0)
 
-        results: List[JobResult] = []
 
-        for job, score in scored:
-            if score < payload.min_score:
-                continue
+def _requested_profile(request: Request) -> Optional[ProfileFormat]:
+    """
+    Profile format asked for via the X-Profile header or ?profile=...,
+    or None. Requires a valid X-Profile-Token.
+    """
+    value = request.headers.get("X-Profile") or request.query_params.get("profile")
+    if not value:
+        return None
 
-            message = outreach_agent.generate_message(
-                resume, job, score
-            )
-            message = dedupe_text(message)
+    _check_profiling_token(request)
+    try:
+        return ProfileFormat(value)
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown profile format {value!r}; "
+                   f"use one of {[f.value for f in ProfileFormat]}",
+        )
+
+
+@app.get("/profiles/{profile_id}")
+def download_profile(profile_id: str, request: Request):
+    """Download a profile recorded with X-Profile (same token required)."""
+    _check_profiling_token(request)
+    path = find_profile(profile_id, settings.PROFILE_DIR)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, filename=path.name)
+
+
+@app.post("/run-pipeline", response_model=RunResponse)
+def run_pipeline(payload: RunRequest, request: Request, response: Response):
+    profile_format = _requested_profile(request)
+    deadline = (
+        Deadline.from_ms(payload.deadline_ms) if payload.deadline_ms else None
+    )
+    request_id = uuid.uuid4().hex
+    meter = UsageMeter(token_budget=payload.token_budget)
+    # LLM calls are queued fairly per API key, or per client IP
+    tenant = _request_tenant(request)
 
-            tracker_agent.track(
-                job_id=job.job_id,
-                job_title=job.title,
-                company=job.company,
-                fit_score=score,
-                outreach_message=message,
-            )
+    with deadline_scope(deadline), usage_scope(meter), tenant_scope(tenant):
+        try:
+            if profile_format is None:
+                return _run_pipeline(payload, request_id, meter)
 
-            results.append(
+            # Opt-in: sample this request's stacks and store the profile for
+            # download. Its id is returned in headers, including on errors.
+            profiler = SamplingProfiler(settings.PROFILING_INTERVAL_MS / 1000)
+            try:
+                with profiler:
+                    result = _run_pipeline(payload, request_id, meter)
+            except HTTPException as e:
+                e.headers = {**(e.headers or {}), **_store_profile(profiler, profile_format)}
+                raise
+
+            response.headers.update(_store_profile(profiler, profile_format))
+            return result
+        finally:
+            # Usage accounting must not replace the response or the error
+            try:
+                save_llm_usage(request_id, meter.records)
+            except Exception as e:
+                print(f"[run-pipeline] usage write failed for {request_id}: {e}")
+
+
+def _store_profile(profiler: SamplingProfiler, fmt: ProfileFormat) -> dict:
+    profile_id = save_profile(
+        profiler, fmt, settings.PROFILE_DIR, name="/run-pipeline"
+    )
+    return {
+        "X-Profile-Id": profile_id,
+        "X-Profile-URL": f"/profiles/{profile_id}",
+    }
+
+
+def _run_pipeline(
+    payload: RunRequest, request_id: str, meter: UsageMeter
+) -> RunResponse:
+    try:
+        # Cheap to build: models, caches and breakers are process-wide
+        result = JobSearchPipeline().run(
+            resume_text=payload.resume_text,
+            query=payload.query,
+            location=payload.location,
+            max_results=payload.max_results,
+            min_score=payload.min_score,
+            escalation_threshold=payload.min_score,
+            min_skill_overlap=payload.min_skill_overlap,
+            prefilter_top_k=payload.prefilter_top_k,
+        )
+
+        return RunResponse(
+            request_id=request_id,
+            results=[
                 JobResult(
-                    job_id=job.job_id,
-                    title=job.title,
-                    company=job.company,
-                    fit_score=score,
-                    outreach_message=message,
-                    url=job.url,
+                    job_id=scored.job.job_id,
+                    title=scored.job.title,
+                    company=scored.job.company,
+                    fit_score=scored.fit.final_score,
+                    outreach_message=scored.outreach_message,
+                    url=scored.job.url,
+                    source_urls=scored.job.source_urls,
+                    status=scored.status,
                 )
-            )
-
-        return RunResponse(results=results)
+                for scored in result.jobs
+            ],
+            dedup=result.dedup,
+            deadline_exceeded=deadline_expired(),
+            degraded=degraded_dependencies(),
+            usage=meter.summary(),
+        )
+    except CircuitOpenError as e:
+        # Job discovery has no fallback
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, round(e.retry_after_s)))},
+        )
+    except TimeoutError as e:
+        # Deadline hit before any job could be scored (resume parsing or
+        # discovery): nothing partial to return
+        raise HTTPException(status_code=504, detail=f"Pipeline timed out: {str(e)}")
+    except TokenBudgetExceeded as e:
+        # Budget too small to even parse the resume
+        raise HTTPException(status_code=422, detail=f"Token budget exhausted: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Pipeline error: {str(e)}")
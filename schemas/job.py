@@ -27,3 +27,8 @@ class Job(BaseModel):
     )
 
     url: Optional[str] = None
+
+    source_urls: List[str] = Field(
+        default_factory=list,
+        description="All URLs this posting was found at (after dedup)"
+    )
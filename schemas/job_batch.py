@@ -0,0 +1,182 @@
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from schemas.job import Job
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else value
+
+
+class JobRow:
+    """
+    Read-only view of one job in a JobBatch.
+
+    Has the same attributes as schemas.job.Job, so code that only reads
+    jobs (hashing, scoring, dedup) accepts either. Holds no data itself.
+    """
+
+    __slots__ = ("_batch", "index")
+
+    def __init__(self, batch: "JobBatch", index: int):
+        self._batch = batch
+        self.index = index
+
+    job_id = property(lambda self: self._batch.job_ids[self.index])
+    title = property(lambda self: self._batch.titles[self.index])
+    company = property(lambda self: self._batch.companies[self.index])
+    location = property(lambda self: self._batch.locations[self.index])
+    employment_type = property(lambda self: self._batch.employment_types[self.index])
+    description = property(lambda self: self._batch.descriptions[self.index])
+    skills = property(lambda self: list(self._batch.skills[self.index]))
+    source = property(lambda self: self._batch.sources[self.index])
+    url = property(lambda self: self._batch.urls[self.index])
+    source_urls = property(lambda self: list(self._batch.source_urls[self.index]))
+
+    def to_job(self) -> Job:
+        return self._batch.to_job(self.index)
+
+
+# Anything with Job's attributes
+JobLike = Union[Job, JobRow]
+
+
+class JobBatch:
+    """
+    Columnar container for large sets of jobs (batch mode).
+
+    One list per field instead of one pydantic object per job: company,
+    location, employment type, source and skill strings are interned, and
+    identical descriptions (syndicated postings) are stored once. Rows
+    are appended without validation; pydantic Jobs are built only when
+    results leave the pipeline (`to_job` / `to_jobs`).
+    """
+
+    __slots__ = (
+        "job_ids",
+        "titles",
+        "companies",
+        "locations",
+        "employment_types",
+        "descriptions",
+        "skills",
+        "sources",
+        "urls",
+        "source_urls",
+        "_descriptions_seen",
+    )
+
+    def __init__(self):
+        self.job_ids: List[Optional[str]] = []
+        self.titles: List[str] = []
+        self.companies: List[str] = []
+        self.locations: List[Optional[str]] = []
+        self.employment_types: List[Optional[str]] = []
+        self.descriptions: List[str] = []
+        self.skills: List[Tuple[str, ...]] = []
+        self.sources: List[Optional[str]] = []
+        self.urls: List[Optional[str]] = []
+        self.source_urls: List[Tuple[str, ...]] = []
+        self._descriptions_seen: Dict[str, str] = {}
+
+    # -----------------------------
+    # CONSTRUCTION
+    # -----------------------------
+
+    def append(
+        self,
+        title: str,
+        company: str,
+        description: str = "",
+        job_id: Optional[str] = None,
+        location: Optional[str] = None,
+        employment_type: Optional[str] = None,
+        skills: Sequence[str] = (),
+        source: Optional[str] = None,
+        url: Optional[str] = None,
+        source_urls: Sequence[str] = (),
+    ) -> int:
+        """Add a row; returns its index."""
+        description = description or ""
+        description = self._descriptions_seen.setdefault(description, description)
+
+        self.job_ids.append(job_id)
+        self.titles.append(title)
+        self.companies.append(_intern(company))
+        self.locations.append(_intern(location))
+        self.employment_types.append(_intern(employment_type))
+        self.descriptions.append(description)
+        self.skills.append(tuple(sys.intern(skill) for skill in skills))
+        self.sources.append(_intern(source))
+        self.urls.append(url)
+        self.source_urls.append(tuple(source_urls))
+        return len(self.titles) - 1
+
+    @classmethod
+    def from_jobs(cls, jobs: Iterable[JobLike]) -> "JobBatch":
+        batch = cls()
+        for job in jobs:
+            batch.append(
+                title=job.title,
+                company=job.company,
+                description=job.description,
+                job_id=job.job_id,
+                location=job.location,
+                employment_type=job.employment_type,
+                skills=job.skills,
+                source=job.source,
+                url=job.url,
+                source_urls=job.source_urls,
+            )
+        return batch
+
+    def take(self, indices: Iterable[int]) -> "JobBatch":
+        """New batch with the given rows, sharing their strings."""
+        out = JobBatch()
+        for i in indices:
+            out.job_ids.append(self.job_ids[i])
+            out.titles.append(self.titles[i])
+            out.companies.append(self.companies[i])
+            out.locations.append(self.locations[i])
+            out.employment_types.append(self.employment_types[i])
+            out.descriptions.append(self.descriptions[i])
+            out.skills.append(self.skills[i])
+            out.sources.append(self.sources[i])
+            out.urls.append(self.urls[i])
+            out.source_urls.append(self.source_urls[i])
+        return out
+
+    # -----------------------------
+    # ACCESS
+    # -----------------------------
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def __getitem__(self, index: int) -> JobRow:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return JobRow(self, index)
+
+    def __iter__(self) -> Iterator[JobRow]:
+        return (JobRow(self, i) for i in range(len(self)))
+
+    def to_job(self, index: int) -> Job:
+        # Values came from validated Jobs or trusted sources: skip validation
+        return Job.model_construct(
+            job_id=self.job_ids[index],
+            title=self.titles[index],
+            company=self.companies[index],
+            location=self.locations[index],
+            employment_type=self.employment_types[index],
+            description=self.descriptions[index],
+            skills=list(self.skills[index]),
+            source=self.sources[index],
+            url=self.urls[index],
+            source_urls=list(self.source_urls[index]),
+        )
+
+    def to_jobs(self) -> List[Job]:
+        return [self.to_job(i) for i in range(len(self))]
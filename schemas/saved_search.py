@@ -0,0 +1,54 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+
+class SavedSearchCreate(BaseModel):
+    name: Optional[str] = None
+    resume_text: str
+
+    queries: List[str] = Field(min_length=1)
+    locations: List[str] = Field(
+        default_factory=list,
+        description="Every query is searched in each location (none = anywhere)"
+    )
+
+    max_results: int = Field(default=5, ge=1)
+    min_score: int = Field(default=50, ge=0, le=100)
+
+    interval_minutes: int = Field(
+        default=24 * 60,
+        ge=5,
+        description="Refresh cadence; each run is jittered around it"
+    )
+
+
+class SavedSearch(SavedSearchCreate):
+    id: int
+    enabled: bool = True
+
+    created_at: datetime
+    last_run_at: Optional[datetime] = None
+    next_run_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+
+class RefreshedJob(BaseModel):
+    job_id: Optional[str]
+    title: str
+    company: str
+    fit_score: int
+    outreach_message: Optional[str] = None
+    url: Optional[str] = None
+
+
+class RefreshResult(BaseModel):
+    """
+    Outcome of one refresh: only postings not seen by earlier runs of
+    the same saved search are scored.
+    """
+
+    search_id: int
+    discovered: int = 0
+    new_jobs: int = 0
+    results: List[RefreshedJob] = Field(default_factory=list)
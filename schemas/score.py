@@ -0,0 +1,45 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class FitScore(BaseModel):
+    """
+    Components of a job–resume fit score.
+    """
+
+    base_score: int = Field(
+        ge=0,
+        le=100,
+        description="Embedding cosine similarity scaled to 0–100"
+    )
+
+    llm_score: Optional[int] = Field(
+        default=None,
+        description="Score returned by the LLM (None if unparseable)"
+    )
+
+    final_score: int = Field(
+        ge=0,
+        le=100,
+        description="max(base_score, llm_score), capped at 100"
+    )
+
+    timed_out: bool = Field(
+        default=False,
+        description="LLM scoring hit the request deadline; base score only"
+    )
+
+    budget_exceeded: bool = Field(
+        default=False,
+        description="LLM scoring skipped, request token budget spent; base score only"
+    )
+
+    llm_unavailable: bool = Field(
+        default=False,
+        description="LLM scoring skipped, circuit breaker open; base score only"
+    )
+
+    @property
+    def degraded(self) -> bool:
+        """True when final_score is the embedding score alone."""
+        return self.timed_out or self.budget_exceeded or self.llm_unavailable
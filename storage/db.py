@@ -1,16 +1,27 @@
 from sqlalchemy import (
     create_engine,
+    select,
+    Boolean,
     Column,
     String,
     Integer,
+    Float,
     DateTime,
-    Text
+    Index,
+    JSON,
+    Text,
+    update
 )
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import declarative_base, sessionmaker
 from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set
 
 from config.settings import settings
+from llm.routing import LLMCallRecord
 from schemas.application import Application
+from schemas.saved_search import SavedSearch, SavedSearchCreate
+from schemas.score import FitScore
 
 # SQLAlchemy base
 Base = declarative_base()
@@ -31,7 +42,110 @@ class ApplicationORM(Base):
     outreach_message = Column(Text, nullable=True)
 
     applied_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    # Export filters: status (+ date range) and date range alone
+    __table_args__ = (
+        Index("ix_applications_status_created_at", "status", "created_at"),
+    )
+
+
+# Columns written by exports, in order
+APPLICATION_EXPORT_COLUMNS = (
+    "id",
+    "job_id",
+    "job_title",
+    "company",
+    "fit_score",
+    "status",
+    "outreach_message",
+    "applied_at",
+    "created_at",
+)
+
+
+class ScoreCacheORM(Base):
+    """
+    Persisted fit scores. The composite primary key doubles as the
+    lookup index, so a cached pair costs one indexed read.
+    """
+
+    __tablename__ = "score_cache"
+
+    resume_fingerprint = Column(String(64), primary_key=True)
+    model = Column(String, primary_key=True)
+    prompt_version = Column(String(16), primary_key=True)
+    job_hash = Column(String(64), primary_key=True)
+
+    base_score = Column(Integer, nullable=False)
+    llm_score = Column(Integer, nullable=True)
+    final_score = Column(Integer, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class LLMUsageORM(Base):
+    """
+    One row per LLM call, tagged with the API request (or batch record)
+    that made it.
+    """
+
+    __tablename__ = "llm_usage"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    request_id = Column(String(32), nullable=False, index=True)
+
+    task = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    total_tokens = Column(Integer, nullable=False, default=0)
+    latency_ms = Column(Float, nullable=False)
+
+    escalated = Column(Boolean, nullable=False, default=False)
+    accepted = Column(Boolean, nullable=False, default=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class SavedSearchORM(Base):
+    __tablename__ = "saved_searches"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, nullable=True)
+
+    resume_text = Column(Text, nullable=False)
+    # Parsed on the first refresh and reused afterwards
+    resume_json = Column(Text, nullable=True)
+
+    queries = Column(JSON, nullable=False)
+    locations = Column(JSON, nullable=False, default=list)
+    max_results = Column(Integer, nullable=False, default=5)
+    min_score = Column(Integer, nullable=False, default=50)
+
+    interval_minutes = Column(Integer, nullable=False)
+    enabled = Column(Boolean, nullable=False, default=True)
+
     created_at = Column(DateTime, default=datetime.utcnow)
+    last_run_at = Column(DateTime, nullable=True)
+    next_run_at = Column(DateTime, nullable=True, index=True)
+    last_error = Column(Text, nullable=True)
+
+
+class SeenJobORM(Base):
+    """
+    Postings already processed for a saved search, so refreshes only
+    score new ones. `job_key` is the source job_id or a content hash.
+    """
+
+    __tablename__ = "saved_search_jobs"
+
+    search_id = Column(Integer, primary_key=True)
+    job_key = Column(String, primary_key=True)
+
+    fit_score = Column(Integer, nullable=True)
+    first_seen_at = Column(DateTime, default=datetime.utcnow)
 
 
 # Engine & session
@@ -49,35 +163,400 @@ SessionLocal = sessionmaker(
 )
 
 
+def _upsert(orm, rows: List[dict], update_columns: Sequence[str]) -> None:
+    """
+    Insert `rows`, overwriting `update_columns` where the primary key
+    already exists. Atomic on SQLite / PostgreSQL, so concurrent writers
+    of the same keys don't fail. Other databases fall back to merge and
+    leave a row written concurrently as it is.
+    """
+    if not rows:
+        return
+
+    dialect = engine.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+
+        stmt = insert(orm.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[col.name for col in orm.__table__.primary_key],
+            set_={name: stmt.excluded[name] for name in update_columns},
+        )
+        with engine.begin() as conn:
+            conn.execute(stmt, rows)
+        return
+
+    session = SessionLocal()
+    try:
+        for row in rows:
+            session.merge(orm(**row))
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+    finally:
+        session.close()
+
+
 def init_db() -> None:
-    """Create tables if they don't exist."""
+    """Create tables (and indexes added since) if they don't exist."""
     Base.metadata.create_all(bind=engine)
 
+    # create_all skips indexes on tables that already exist
+    for index in ApplicationORM.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
 
 def save_application(app: Application) -> None:
     """Persist an Application schema to the database."""
+    save_applications([app])
+
+
+def save_applications(apps: Iterable[Application]) -> None:
+    """Persist several Applications in one transaction."""
+    session = SessionLocal()
+    try:
+        session.add_all([
+            ApplicationORM(
+                job_id=app.job_id,
+                job_title=app.job_title,
+                company=app.company,
+                fit_score=app.fit_score,
+                status=app.status,
+                outreach_message=app.outreach_message,
+                applied_at=app.applied_at,
+                created_at=app.created_at,
+            )
+            for app in apps
+        ])
+        session.commit()
+    finally:
+        session.close()
+
+
+def get_cached_scores(
+    resume_fingerprint: str,
+    model: str,
+    prompt_version: str,
+    job_hashes: Iterable[str],
+) -> Dict[str, FitScore]:
+    """Return cached scores for the given job hashes (misses omitted)."""
+    job_hashes = list(set(job_hashes))
+    if not job_hashes:
+        return {}
+
+    session = SessionLocal()
+    try:
+        rows = (
+            session.query(ScoreCacheORM)
+            .filter(
+                ScoreCacheORM.resume_fingerprint == resume_fingerprint,
+                ScoreCacheORM.model == model,
+                ScoreCacheORM.prompt_version == prompt_version,
+                ScoreCacheORM.job_hash.in_(job_hashes),
+            )
+            .all()
+        )
+        return {
+            row.job_hash: FitScore(
+                base_score=row.base_score,
+                llm_score=row.llm_score,
+                final_score=row.final_score,
+            )
+            for row in rows
+        }
+    finally:
+        session.close()
+
+
+def save_cached_scores(
+    resume_fingerprint: str,
+    model: str,
+    prompt_version: str,
+    scores: Dict[str, FitScore],
+) -> None:
+    """Insert or replace cached scores keyed by job hash."""
+    _upsert(
+        ScoreCacheORM,
+        [
+            dict(
+                resume_fingerprint=resume_fingerprint,
+                model=model,
+                prompt_version=prompt_version,
+                job_hash=job_hash,
+                base_score=score.base_score,
+                llm_score=score.llm_score,
+                final_score=score.final_score,
+            )
+            for job_hash, score in scores.items()
+        ],
+        update_columns=("base_score", "llm_score", "final_score"),
+    )
+
+
+def save_llm_usage(request_id: str, calls: Iterable[LLMCallRecord]) -> None:
+    """Persist the LLM calls made by one request."""
+    rows = [
+        LLMUsageORM(
+            request_id=request_id,
+            task=call.task.value,
+            model=call.model,
+            prompt_tokens=call.prompt_tokens,
+            completion_tokens=call.completion_tokens,
+            total_tokens=call.total_tokens,
+            latency_ms=call.latency_ms,
+            escalated=call.escalated,
+            accepted=call.accepted,
+        )
+        for call in calls
+    ]
+    if not rows:
+        return
+
+    session = SessionLocal()
+    try:
+        session.add_all(rows)
+        session.commit()
+    finally:
+        session.close()
+
+
+def _to_saved_search(row: SavedSearchORM) -> SavedSearch:
+    return SavedSearch(
+        id=row.id,
+        name=row.name,
+        resume_text=row.resume_text,
+        queries=row.queries,
+        locations=row.locations or [],
+        max_results=row.max_results,
+        min_score=row.min_score,
+        interval_minutes=row.interval_minutes,
+        enabled=row.enabled,
+        created_at=row.created_at,
+        last_run_at=row.last_run_at,
+        next_run_at=row.next_run_at,
+        last_error=row.last_error,
+    )
+
+
+def create_saved_search(
+    search: SavedSearchCreate, next_run_at: datetime
+) -> SavedSearch:
     session = SessionLocal()
     try:
-        orm_obj = ApplicationORM(
-            job_id=app.job_id,
-            job_title=app.job_title,
-            company=app.company,
-            fit_score=app.fit_score,
-            status=app.status,
-            outreach_message=app.outreach_message,
-            applied_at=app.applied_at,
-            created_at=app.created_at,
+        row = SavedSearchORM(
+            name=search.name,
+            resume_text=search.resume_text,
+            queries=search.queries,
+            locations=search.locations,
+            max_results=search.max_results,
+            min_score=search.min_score,
+            interval_minutes=search.interval_minutes,
+            next_run_at=next_run_at,
         )
-        session.add(orm_obj)
+        session.add(row)
         session.commit()
+        return _to_saved_search(row)
     finally:
         session.close()
 
 
+def get_saved_search(search_id: int) -> Optional[SavedSearch]:
+    session = SessionLocal()
+    try:
+        row = session.get(SavedSearchORM, search_id)
+        return _to_saved_search(row) if row is not None else None
+    finally:
+        session.close()
+
+
+def list_saved_searches() -> List[SavedSearch]:
+    session = SessionLocal()
+    try:
+        rows = session.query(SavedSearchORM).order_by(SavedSearchORM.id).all()
+        return [_to_saved_search(row) for row in rows]
+    finally:
+        session.close()
+
+
+def delete_saved_search(search_id: int) -> bool:
+    session = SessionLocal()
+    try:
+        deleted = (
+            session.query(SavedSearchORM)
+            .filter(SavedSearchORM.id == search_id)
+            .delete()
+        )
+        session.query(SeenJobORM).filter(
+            SeenJobORM.search_id == search_id
+        ).delete()
+        session.commit()
+        return bool(deleted)
+    finally:
+        session.close()
+
+
+def due_saved_searches(now: datetime, limit: int = 100) -> List[SavedSearch]:
+    """Enabled searches whose next run is due, most overdue first."""
+    session = SessionLocal()
+    try:
+        rows = (
+            session.query(SavedSearchORM)
+            .filter(
+                SavedSearchORM.enabled.is_(True),
+                SavedSearchORM.next_run_at <= now,
+            )
+            .order_by(SavedSearchORM.next_run_at)
+            .limit(limit)
+            .all()
+        )
+        return [_to_saved_search(row) for row in rows]
+    finally:
+        session.close()
+
+
+def claim_saved_search(
+    search_id: int, expected_next_run_at: datetime, lease_until: datetime
+) -> bool:
+    """
+    Push next_run_at to `lease_until` if nobody else has moved it since
+    it was read. Only the process that wins runs the refresh, so several
+    workers can run schedulers against one database.
+    """
+    session = SessionLocal()
+    try:
+        result = session.execute(
+            update(SavedSearchORM)
+            .where(
+                SavedSearchORM.id == search_id,
+                SavedSearchORM.next_run_at == expected_next_run_at,
+            )
+            .values(next_run_at=lease_until)
+        )
+        session.commit()
+        return result.rowcount == 1
+    finally:
+        session.close()
+
+
+def finish_saved_search_run(
+    search_id: int,
+    ran_at: datetime,
+    next_run_at: datetime,
+    error: Optional[str] = None,
+) -> None:
+    session = SessionLocal()
+    try:
+        session.execute(
+            update(SavedSearchORM)
+            .where(SavedSearchORM.id == search_id)
+            .values(last_run_at=ran_at, next_run_at=next_run_at, last_error=error)
+        )
+        session.commit()
+    finally:
+        session.close()
+
+
+def get_saved_search_resume(search_id: int) -> Optional[str]:
+    session = SessionLocal()
+    try:
+        row = session.get(SavedSearchORM, search_id)
+        return row.resume_json if row is not None else None
+    finally:
+        session.close()
+
+
+def set_saved_search_resume(search_id: int, resume_json: str) -> None:
+    session = SessionLocal()
+    try:
+        session.execute(
+            update(SavedSearchORM)
+            .where(SavedSearchORM.id == search_id)
+            .values(resume_json=resume_json)
+        )
+        session.commit()
+    finally:
+        session.close()
+
+
+def get_seen_job_keys(search_id: int, job_keys: Iterable[str]) -> Set[str]:
+    """The subset of `job_keys` already processed for this search."""
+    job_keys = list(set(job_keys))
+    if not job_keys:
+        return set()
+
+    session = SessionLocal()
+    try:
+        rows = (
+            session.query(SeenJobORM.job_key)
+            .filter(
+                SeenJobORM.search_id == search_id,
+                SeenJobORM.job_key.in_(job_keys),
+            )
+            .all()
+        )
+        return {row.job_key for row in rows}
+    finally:
+        session.close()
+
+
+def add_seen_jobs(search_id: int, scores: Dict[str, Optional[int]]) -> None:
+    """Record processed postings (job key -> fit score)."""
+    _upsert(
+        SeenJobORM,
+        [
+            dict(search_id=search_id, job_key=job_key, fit_score=fit_score)
+            for job_key, fit_score in scores.items()
+        ],
+        update_columns=("fit_score",),
+    )
+
+
 def list_applications():
     """Return all stored applications."""
     session = SessionLocal()
     try:
         return session.query(ApplicationORM).all()
+    finally:
+        session.close()
+
+
+def iter_applications(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    statuses: Optional[Sequence[str]] = None,
+    batch_size: int = 1000,
+) -> Iterator[Dict]:
+    """
+    Stream applications as plain dicts (APPLICATION_EXPORT_COLUMNS),
+    oldest first.
+
+    Rows are fetched `batch_size` at a time through a server-side cursor,
+    so memory stays flat however large the table is. Filters run in SQL
+    against the created_at / (status, created_at) indexes; `since` is
+    inclusive, `until` exclusive.
+    """
+    columns = [
+        getattr(ApplicationORM, name) for name in APPLICATION_EXPORT_COLUMNS
+    ]
+    stmt = select(*columns).order_by(
+        ApplicationORM.created_at, ApplicationORM.id
+    )
+    if since is not None:
+        stmt = stmt.where(ApplicationORM.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(ApplicationORM.created_at < until)
+    if statuses:
+        stmt = stmt.where(ApplicationORM.status.in_(list(statuses)))
+
+    session = SessionLocal()
+    try:
+        result = session.execute(
+            stmt.execution_options(yield_per=batch_size, stream_results=True)
+        )
+        for row in result:
+            yield row._asdict()
     finally:
         session.close()
\ No newline at end of file
@@ -0,0 +1,249 @@
+"""
+Streaming export of tracked applications.
+
+Usage:
+    python -m storage.export --format parquet --out applications.parquet \
+        [--since 2024-01-01] [--until 2024-07-01] [--status applied ...]
+
+CSV and JSONL go to stdout when --out is omitted. Rows are streamed from
+the database in batches (see storage.db.iter_applications) and written as
+they arrive, so memory use does not grow with the table. Parquet needs
+pyarrow and is written one record batch at a time.
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+from datetime import date, datetime
+from enum import Enum
+from typing import IO, Dict, Iterable, Iterator, Optional, Sequence
+
+from storage.db import APPLICATION_EXPORT_COLUMNS, init_db, iter_applications
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    JSONL = "jsonl"
+    PARQUET = "parquet"
+
+    @property
+    def media_type(self) -> str:
+        return {
+            ExportFormat.CSV: "text/csv",
+            ExportFormat.JSONL: "application/x-ndjson",
+            ExportFormat.PARQUET: "application/vnd.apache.parquet",
+        }[self]
+
+
+# -----------------------------
+# TEXT FORMATS
+# -----------------------------
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def iter_csv(
+    rows: Iterable[Dict], batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[str]:
+    """
+    CSV text in chunks of up to `batch_size` rows, header first.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=APPLICATION_EXPORT_COLUMNS)
+    writer.writeheader()
+
+    pending = 0
+    for row in rows:
+        writer.writerow({
+            key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in row.items()
+        })
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    yield buffer.getvalue()
+
+
+def iter_jsonl(
+    rows: Iterable[Dict], batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[str]:
+    """
+    One JSON object per line, in chunks of up to `batch_size` rows.
+    """
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row, default=_json_default) + "\n")
+        if len(lines) >= batch_size:
+            yield "".join(lines)
+            lines = []
+
+    if lines:
+        yield "".join(lines)
+
+
+# -----------------------------
+# PARQUET
+# -----------------------------
+
+def _parquet_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("id", pa.int64()),
+        ("job_id", pa.string()),
+        ("job_title", pa.string()),
+        ("company", pa.string()),
+        ("fit_score", pa.int32()),
+        ("status", pa.string()),
+        ("outreach_message", pa.string()),
+        ("applied_at", pa.timestamp("us")),
+        ("created_at", pa.timestamp("us")),
+    ])
+
+
+def write_parquet(
+    rows: Iterable[Dict],
+    sink,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """
+    Write rows to `sink` (path or binary file) as Parquet, one record
+    batch (row group) per `batch_size` rows. Returns the row count.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError(
+            "Parquet export requires pyarrow (pip install pyarrow)."
+        ) from e
+
+    schema = _parquet_schema()
+    columns: Dict[str, list] = {name: [] for name in schema.names}
+    count = 0
+
+    def flush(writer) -> None:
+        writer.write_batch(pa.record_batch(
+            [columns[name] for name in schema.names], schema=schema
+        ))
+        for values in columns.values():
+            values.clear()
+
+    with pq.ParquetWriter(sink, schema) as writer:
+        for row in rows:
+            for name in schema.names:
+                columns[name].append(row[name])
+            count += 1
+            if count % batch_size == 0:
+                flush(writer)
+
+        if columns["id"]:
+            flush(writer)
+
+    return count
+
+
+# -----------------------------
+# PUBLIC API
+# -----------------------------
+
+def export_applications(
+    fmt: ExportFormat,
+    out: IO,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    statuses: Optional[Sequence[str]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """
+    Export matching applications to `out` (text file for CSV / JSONL,
+    binary file or path for Parquet). Returns the number of rows written.
+    """
+    count = 0
+
+    def counted(rows):
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield row
+
+    rows = counted(iter_applications(
+        since=since, until=until, statuses=statuses, batch_size=batch_size
+    ))
+
+    if fmt == ExportFormat.PARQUET:
+        return write_parquet(rows, out, batch_size=batch_size)
+
+    chunks = (
+        iter_csv(rows, batch_size)
+        if fmt == ExportFormat.CSV
+        else iter_jsonl(rows, batch_size)
+    )
+    for chunk in chunks:
+        out.write(chunk)
+
+    return count
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--format",
+        choices=[fmt.value for fmt in ExportFormat],
+        default=ExportFormat.CSV.value,
+    )
+    parser.add_argument("--out", help="Output file (default: stdout)")
+    parser.add_argument(
+        "--since", type=datetime.fromisoformat, help="created_at >= (ISO date)"
+    )
+    parser.add_argument(
+        "--until", type=datetime.fromisoformat, help="created_at < (ISO date)"
+    )
+    parser.add_argument(
+        "--status", action="append", help="Only this status (repeatable)"
+    )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+    fmt = ExportFormat(args.format)
+
+    init_db()
+
+    filters = dict(
+        since=args.since,
+        until=args.until,
+        statuses=args.status,
+        batch_size=args.batch_size,
+    )
+
+    if fmt == ExportFormat.PARQUET:
+        if not args.out:
+            parser.error("--out is required for parquet")
+        count = export_applications(fmt, args.out, **filters)
+    elif args.out:
+        with open(args.out, "w", newline="", encoding="utf-8") as f:
+            count = export_applications(fmt, f, **filters)
+    else:
+        count = export_applications(fmt, sys.stdout, **filters)
+
+    print(f"Exported {count} application(s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import math
+import re
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from schemas.job import Job
+from schemas.resume import Resume
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our "
+    "that the this to we will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Incremental inverted index with Okapi BM25 ranking.
+
+    Each term maps to a postings list stored as two compact unsigned
+    int arrays (doc ids, term frequencies). Documents are appended with
+    `add`; ids are dense and assigned in insertion order, so postings
+    stay sorted without re-indexing.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._doc_lengths = array("I")
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    # -----------------------------
+    # INDEXING
+    # -----------------------------
+
+    def add(self, text: str) -> int:
+        """
+        Index a document and return its id.
+        """
+        doc_id = len(self._doc_lengths)
+        tokens = tokenize(text)
+
+        for term, tf in Counter(tokens).items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = (array("I"), array("H"))
+                self._postings[term] = postings
+            postings[0].append(doc_id)
+            postings[1].append(min(tf, 0xFFFF))
+
+        self._doc_lengths.append(len(tokens))
+        self._total_length += len(tokens)
+        return doc_id
+
+    def add_many(self, texts: Iterable[str]) -> List[int]:
+        return [self.add(text) for text in texts]
+
+    # -----------------------------
+    # QUERYING
+    # -----------------------------
+
+    def scores(self, query_terms: Iterable[str]) -> np.ndarray:
+        """
+        BM25 score of every document for the query (0 for no match).
+        """
+        num_docs = len(self._doc_lengths)
+        scores = np.zeros(num_docs, dtype=np.float32)
+        if num_docs == 0:
+            return scores
+
+        doc_lengths = np.frombuffer(self._doc_lengths, dtype=np.uint32)
+        avg_length = self._total_length / num_docs or 1.0
+        # Per-document length normalisation, shared by all terms
+        norm = self.k1 * (1 - self.b + self.b * doc_lengths / avg_length)
+
+        for term in set(query_terms):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+
+            doc_ids = np.frombuffer(postings[0], dtype=np.uint32)
+            tfs = np.frombuffer(postings[1], dtype=np.uint16).astype(np.float32)
+
+            df = len(doc_ids)
+            idf = math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+
+            scores[doc_ids] += idf * tfs * (self.k1 + 1) / (tfs + norm[doc_ids])
+
+        return scores
+
+    def search(
+        self, query_terms: Iterable[str], top_k: int = 50
+    ) -> List[Tuple[int, float]]:
+        """
+        Top-k (doc_id, score) pairs with a positive score, best first.
+        """
+        scores = self.scores(query_terms)
+        matched = np.flatnonzero(scores)
+        if matched.size == 0:
+            return []
+
+        if matched.size > top_k:
+            part = np.argpartition(-scores[matched], top_k - 1)[:top_k]
+            matched = matched[part]
+
+        ranked = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(int(i), float(scores[i])) for i in ranked]
+
+
+# -----------------------------
+# Pipeline helpers
+# -----------------------------
+
+def resume_query_terms(resume: Resume) -> List[str]:
+    terms: List[str] = []
+    for phrase in [*resume.skills, *resume.tools, *resume.roles]:
+        terms.extend(tokenize(phrase))
+    return terms
+
+
+def prefilter_jobs(resume: Resume, jobs: Sequence[Job], top_k: int) -> List[Job]:
+    """
+    Keep the `top_k` jobs whose title + description best match the
+    resume's skills, tools and roles under BM25, in rank order.
+
+    If the resume has no usable terms the jobs are returned unfiltered
+    (truncated to top_k).
+    """
+    terms = resume_query_terms(resume)
+    if not terms or len(jobs) <= top_k:
+        return list(jobs)[:top_k]
+
+    index = BM25Index()
+    index.add_many(f"{job.title} {job.description or ''}" for job in jobs)
+
+    scores = index.scores(terms)
+    order = np.argsort(-scores, kind="stable")[:top_k]
+    return [jobs[i] for i in order]
+
@@ -0,0 +1,229 @@
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, List, Optional, Tuple
+
+from config.settings import settings
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a dependency whose breaker is open."""
+
+    def __init__(self, name: str, retry_after_s: float):
+        super().__init__(
+            f"{name} is unavailable (circuit open, retry in {retry_after_s:.0f}s)"
+        )
+        self.name = name
+        self.retry_after_s = retry_after_s
+
+
+class CircuitBreaker:
+    """
+    Fails fast while a dependency is unhealthy.
+
+    Outcomes of the last `window` calls are kept. Once at least
+    `min_calls` are recorded, the breaker opens if the failure rate or
+    the share of calls slower than `slow_call_s` reaches its threshold.
+    While open, calls raise CircuitOpenError immediately. After
+    `open_s` it goes half-open and lets `half_open_calls` probes
+    through: if they all succeed quickly it closes, otherwise it opens
+    again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        slow_call_s: float,
+        failure_rate: float = 0.5,
+        slow_call_rate: float = 0.5,
+        window: int = 20,
+        min_calls: int = 5,
+        open_s: float = 30.0,
+        half_open_calls: int = 2,
+    ):
+        self.name = name
+        self.slow_call_s = slow_call_s
+        self.failure_rate = failure_rate
+        self.slow_call_rate = slow_call_rate
+        self.min_calls = min_calls
+        self.open_s = open_s
+        self.half_open_calls = half_open_calls
+
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        # (failed, slow) per call
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probes_started = 0
+        self._probes_ok = 0
+        self._stats = {"calls": 0, "failures": 0, "slow": 0, "rejected": 0, "opened": 0}
+        _registry.append(self)
+
+    # -----------------------------
+    # PUBLIC API
+    # -----------------------------
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def call(
+        self,
+        fn: Callable[[], Any],
+        ignore_failure: Optional[Callable[[BaseException], bool]] = None,
+    ) -> Any:
+        """
+        Run `fn` through the breaker. Exceptions for which
+        `ignore_failure` returns True (e.g. the caller's own deadline
+        cutting the call short) are re-raised without being recorded.
+        """
+        self._acquire()
+
+        start = time.perf_counter()
+        try:
+            result = fn()
+        except BaseException as e:
+            if ignore_failure is not None and ignore_failure(e):
+                self._release()
+            else:
+                self._record(failed=True, latency_s=time.perf_counter() - start)
+            raise
+
+        self._record(failed=False, latency_s=time.perf_counter() - start)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._maybe_half_open()
+            return {
+                "name": self.name,
+                "state": self._state.value,
+                **self._stats,
+            }
+
+    # -----------------------------
+    # INTERNAL HELPERS
+    # -----------------------------
+
+    def _maybe_half_open(self) -> None:
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.open_s
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._probes_started = 0
+            self._probes_ok = 0
+
+    def _acquire(self) -> None:
+        with self._lock:
+            self._maybe_half_open()
+
+            if self._state == CircuitState.CLOSED:
+                return
+            if (
+                self._state == CircuitState.HALF_OPEN
+                and self._probes_started < self.half_open_calls
+            ):
+                self._probes_started += 1
+                return
+
+            self._stats["rejected"] += 1
+            retry_after = max(0.0, self.open_s - (time.monotonic() - self._opened_at))
+
+        raise CircuitOpenError(self.name, retry_after)
+
+    def _release(self) -> None:
+        # Outcome unknown: give a half-open probe slot back
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN and self._probes_started:
+                self._probes_started -= 1
+
+    def _record(self, failed: bool, latency_s: float) -> None:
+        slow = latency_s >= self.slow_call_s
+
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["failures"] += int(failed)
+            self._stats["slow"] += int(slow)
+
+            if self._state == CircuitState.HALF_OPEN:
+                if failed or slow:
+                    self._open()
+                else:
+                    self._probes_ok += 1
+                    if self._probes_ok >= self.half_open_calls:
+                        self._state = CircuitState.CLOSED
+                        self._outcomes.clear()
+                return
+
+            if self._state == CircuitState.OPEN:
+                # A call admitted before the breaker opened
+                return
+
+            self._outcomes.append((failed, slow))
+            n = len(self._outcomes)
+            if n < self.min_calls:
+                return
+
+            failures = sum(f for f, _ in self._outcomes)
+            slow_calls = sum(s for _, s in self._outcomes)
+            if failures / n >= self.failure_rate or slow_calls / n >= self.slow_call_rate:
+                self._open()
+
+    def _open(self) -> None:
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._stats["opened"] += 1
+
+
+def breaker_from_settings(name: str, slow_call_s: float) -> CircuitBreaker:
+    return CircuitBreaker(
+        name,
+        slow_call_s=slow_call_s,
+        failure_rate=settings.CIRCUIT_FAILURE_RATE,
+        slow_call_rate=settings.CIRCUIT_SLOW_CALL_RATE,
+        window=settings.CIRCUIT_WINDOW,
+        min_calls=settings.CIRCUIT_MIN_CALLS,
+        open_s=settings.CIRCUIT_OPEN_S,
+    )
+
+
+def is_client_error(e: BaseException) -> bool:
+    """
+    True for a 4xx HTTP error (other than 429): the request was bad,
+    e.g. a context-length error caused by huge user input. That says
+    nothing about the dependency's health, so callers pass it to
+    `ignore_failure`. 5xx, 429, timeouts and connection errors still
+    count as failures.
+    """
+    status = getattr(e, "status_code", None)
+    if status is None:
+        # requests.HTTPError carries the status on its response
+        status = getattr(getattr(e, "response", None), "status_code", None)
+    return isinstance(status, int) and 400 <= status < 500 and status != 429
+
+
+_registry: List[CircuitBreaker] = []
+
+
+def circuit_breaker_stats() -> List[dict]:
+    """State and counters of every breaker in the process."""
+    return [breaker.stats() for breaker in _registry]
+
+
+def degraded_dependencies() -> List[str]:
+    """Names of dependencies whose breaker is not closed."""
+    return [
+        breaker.name for breaker in _registry
+        if breaker.state != CircuitState.CLOSED
+    ]
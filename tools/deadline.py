@@ -0,0 +1,78 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when work is attempted after the request deadline."""
+
+
+class Deadline:
+    """
+    Absolute point in (monotonic) time by which a request must finish.
+    """
+
+    def __init__(self, timeout_s: float):
+        self.expires_at = time.monotonic() + timeout_s
+
+    @classmethod
+    def from_ms(cls, timeout_ms: int) -> "Deadline":
+        return cls(timeout_ms / 1000)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self, what: str = "operation") -> None:
+        if self.expired:
+            raise DeadlineExceeded(f"Deadline exceeded before {what}")
+
+    def clamp(self, timeout: Optional[float]) -> float:
+        """
+        `timeout` shortened to the time left (None means "no own limit").
+        """
+        remaining = self.remaining()
+        return remaining if timeout is None else min(timeout, remaining)
+
+
+# The deadline of the request being served by this thread / task.
+# Thread pools must copy the context (contextvars.copy_context) to see it.
+_current: ContextVar[Optional[Deadline]] = ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def check_deadline(what: str = "operation") -> None:
+    deadline = current_deadline()
+    if deadline is not None:
+        deadline.check(what)
+
+
+def clamp_timeout(timeout: Optional[float]) -> Optional[float]:
+    """
+    Per-call timeout honouring the current deadline, if any.
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return timeout
+    return deadline.clamp(timeout)
+
+
+def deadline_expired() -> bool:
+    deadline = current_deadline()
+    return deadline is not None and deadline.expired
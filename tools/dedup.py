@@ -0,0 +1,267 @@
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+from schemas.job import Job
+from schemas.job_batch import JobBatch, JobLike
+
+
+# Each scored job costs one LLM call for the fit score and, if it passes
+# the threshold, one for the outreach message.
+LLM_CALLS_PER_JOB = 2
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+_COMPANY_SUFFIX_RE = re.compile(
+    r"\b(inc|llc|ltd|limited|corp|corporation|co|gmbh|plc|pvt|private)\b"
+)
+
+
+class DedupStats(BaseModel):
+    jobs_in: int
+    jobs_out: int
+    duplicates_removed: int
+    llm_calls_saved: int  # upper bound: score + outreach per removed copy
+
+
+class MinHasher:
+    """
+    MinHash signatures over word shingles.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        tokens = _TOKEN_RE.findall(text.lower())
+        k = self.shingle_size
+        if len(tokens) <= k:
+            grams = [" ".join(tokens)] if tokens else []
+        else:
+            grams = {" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+        return np.fromiter(
+            (zlib.crc32(g.encode("utf-8")) for g in grams),
+            dtype=np.uint64,
+        )
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        hashes = self.shingles(text)
+        if hashes.size == 0:
+            return None
+        # (num_shingles, num_perm) universal hashes, min over shingles
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=0)
+
+
+class JobDeduplicator:
+    """
+    Collapses near-duplicate postings (the same job syndicated across
+    boards) before they reach the embedding and LLM stages.
+
+    Two jobs are duplicates when either
+      - their normalised (title, company) keys match, or
+      - their description MinHash signatures collide in an LSH band and
+        the estimated Jaccard similarity is at least `threshold`.
+    Groups are merged transitively, but never into a group that would
+    hold two different locations: a job without a location can join a
+    New York group or a San Francisco one, not link the two.
+
+    Runs in roughly linear time: one signature per job and hash-bucket
+    lookups, with pairwise checks only inside colliding buckets.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+
+    # -----------------------------
+    # PUBLIC API
+    # -----------------------------
+
+    def dedupe(self, jobs: Sequence[Job]) -> Tuple[List[Job], DedupStats]:
+        groups = self._group(jobs)
+        merged = [self._merge([jobs[i] for i in members]) for members in groups]
+        return merged, self._stats(len(jobs), len(merged))
+
+    def dedupe_batch(self, batch: JobBatch) -> Tuple[JobBatch, DedupStats]:
+        """
+        Same as `dedupe` for a columnar JobBatch; no pydantic objects are
+        created and unchanged rows share their strings with `batch`.
+        """
+        groups = self._group(batch)
+        out = JobBatch()
+        for members in groups:
+            self._merge_rows(batch, members, out)
+        return out, self._stats(len(batch), len(out))
+
+    # -----------------------------
+    # INTERNAL HELPERS
+    # -----------------------------
+
+    def _group(self, jobs: Sequence[JobLike]) -> List[List[int]]:
+        """Indices of duplicate groups, each ordered, in first-seen order."""
+        parent = list(range(len(jobs)))
+        # Normalised non-empty locations in each group, kept at the root
+        locations: List[Set[str]] = [
+            {loc} if loc else set()
+            for loc in (self._normalise(job.location) for job in jobs)
+        ]
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(i: int, j: int) -> bool:
+            ri, rj = find(i), find(j)
+            if ri == rj:
+                return True
+            merged = locations[ri] | locations[rj]
+            if len(merged) > 1:
+                return False
+            # Keep the earliest job as the group representative
+            root = min(ri, rj)
+            parent[max(ri, rj)] = root
+            locations[root] = merged
+            return True
+
+        # ---- (title, company) keys ----
+        by_key: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        for i, job in enumerate(jobs):
+            key = (self._normalise(job.title), self._normalise_company(job.company))
+            if key[0]:
+                for j in by_key[key]:
+                    if union(i, j):
+                        break
+                by_key[key].append(i)
+
+        # ---- MinHash + LSH over descriptions ----
+        signatures = [self.hasher.signature(job.description or "") for job in jobs]
+        buckets: Dict[Tuple[int, bytes], List[int]] = defaultdict(list)
+
+        for i, sig in enumerate(signatures):
+            if sig is None:
+                continue
+            for band in range(self.bands):
+                chunk = sig[band * self.rows:(band + 1) * self.rows].tobytes()
+                bucket = buckets[(band, chunk)]
+                for j in bucket:
+                    if find(i) == find(j):
+                        continue
+                    if np.mean(sig == signatures[j]) >= self.threshold:
+                        union(i, j)
+                bucket.append(i)
+
+        # ---- Merge groups ----
+        groups: Dict[int, List[int]] = defaultdict(list)
+        for i in range(len(jobs)):
+            groups[find(i)].append(i)
+
+        return list(groups.values())
+
+    @staticmethod
+    def _stats(jobs_in: int, jobs_out: int) -> DedupStats:
+        removed = jobs_in - jobs_out
+        return DedupStats(
+            jobs_in=jobs_in,
+            jobs_out=jobs_out,
+            duplicates_removed=removed,
+            llm_calls_saved=removed * LLM_CALLS_PER_JOB,
+        )
+
+    def _merge(self, group: List[Job]) -> Job:
+        if len(group) == 1:
+            job = group[0]
+            if job.url and not job.source_urls:
+                return job.model_copy(update={"source_urls": [job.url]})
+            return job
+
+        urls: List[str] = []
+        skills: List[str] = []
+        for job in group:
+            for url in [job.url, *job.source_urls]:
+                if url and url not in urls:
+                    urls.append(url)
+            for skill in job.skills:
+                if skill not in skills:
+                    skills.append(skill)
+
+        # Prefer the most complete description
+        best = max(group, key=lambda job: len(job.description or ""))
+        representative = group[0]
+
+        return representative.model_copy(
+            update={
+                "description": best.description,
+                "url": representative.url or (urls[0] if urls else None),
+                "source_urls": urls,
+                "skills": skills,
+            }
+        )
+
+    @staticmethod
+    def _merge_rows(batch: JobBatch, members: List[int], out: JobBatch) -> None:
+        """`_merge` for a group of JobBatch rows, appended to `out`."""
+        first = members[0]
+
+        urls: List[str] = []
+        skills: List[str] = []
+        for i in members:
+            for url in (batch.urls[i], *batch.source_urls[i]):
+                if url and url not in urls:
+                    urls.append(url)
+            for skill in batch.skills[i]:
+                if skill not in skills:
+                    skills.append(skill)
+
+        if len(members) == 1:
+            description = batch.descriptions[first]
+            urls = list(batch.source_urls[first]) or urls
+        else:
+            # Prefer the most complete description
+            description = max(
+                (batch.descriptions[i] for i in members), key=len
+            )
+
+        out.append(
+            title=batch.titles[first],
+            company=batch.companies[first],
+            description=description,
+            job_id=batch.job_ids[first],
+            location=batch.locations[first],
+            employment_type=batch.employment_types[first],
+            skills=skills,
+            source=batch.sources[first],
+            url=batch.urls[first] or (urls[0] if urls else None),
+            source_urls=urls,
+        )
+
+    @staticmethod
+    def _normalise(text: Optional[str]) -> str:
+        return " ".join(_TOKEN_RE.findall((text or "").lower()))
+
+    def _normalise_company(self, company: Optional[str]) -> str:
+        return self._normalise(_COMPANY_SUFFIX_RE.sub(" ", (company or "").lower()))
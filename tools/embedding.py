@@ -1,16 +1,347 @@
-from typing import List, Union
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from enum import Enum
+from itertools import islice
+from pathlib import Path
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
 import numpy as np
-from sentence_transformers import SentenceTransformer
 
+from config.settings import settings
+from tools.embedding_store import SharedEmbeddingStore
+
+
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+
+class Pooling(str, Enum):
+    MEAN = "mean"
+    MAX = "max"
+
+
+# -----------------------------
+# Backends
+# -----------------------------
+
+class EmbeddingBackend:
+    """
+    Base class for embedding backends.
+
+    Backends take a list of texts and return a float32 array of shape
+    (n, dim). Loading is left to the caller so that it can be deferred.
+    """
+
+    name = "base"
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    @property
+    def tag(self) -> str:
+        """Identifies the numerics (backend + precision) of the vectors."""
+        return self.name
+
+    @property
+    def dimension(self) -> int:
+        raise NotImplementedError
+
+    def load(self) -> None:
+        raise NotImplementedError
+
+    def encode(
+        self, texts: List[str], normalize: bool = True, batch_size: int = 32
+    ) -> np.ndarray:
+        raise NotImplementedError
+
+
+class TorchBackend(EmbeddingBackend):
+    """
+    PyTorch backend via sentence-transformers.
+    """
+
+    name = "torch"
+
+    def __init__(self, model_name: str, num_threads: Optional[int] = None):
+        super().__init__(model_name)
+        self.num_threads = num_threads
+        self.model = None
+
+    def load(self) -> None:
+        # Heavy import: pulls in torch
+        from sentence_transformers import SentenceTransformer
+
+        if self.num_threads:
+            import torch
+
+            torch.set_num_threads(self.num_threads)
+
+        self.model = SentenceTransformer(self.model_name)
+
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(
+        self, texts: List[str], normalize: bool = True, batch_size: int = 32
+    ) -> np.ndarray:
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=normalize,
+        )
+
+
+class OnnxBackend(EmbeddingBackend):
+    """
+    ONNX Runtime backend for CPU inference.
+
+    The transformer is exported to ONNX once (and optionally dynamically
+    quantized to int8) into `cache_dir`; later loads only need
+    onnxruntime and the tokenizer. Pooling and normalization mirror the
+    sentence-transformers MiniLM pipeline (mean pooling + L2).
+    """
+
+    name = "onnx"
+
+    def __init__(
+        self,
+        model_name: str,
+        quantize: bool = True,
+        num_threads: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        max_seq_length: int = 256,
+    ):
+        super().__init__(model_name)
+        self.quantize = quantize
+        self.num_threads = num_threads
+        self.cache_dir = Path(cache_dir or settings.EMBEDDING_CACHE_DIR)
+        self.max_seq_length = max_seq_length
+        self.session = None
+        self.tokenizer = None
+        self._input_names: List[str] = []
+
+    @property
+    def model_dir(self) -> Path:
+        return self.cache_dir / self.model_name.replace("/", "__")
+
+    @property
+    def model_path(self) -> Path:
+        filename = "model_int8.onnx" if self.quantize else "model.onnx"
+        return self.model_dir / filename
+
+    @property
+    def tag(self) -> str:
+        return "onnx-int8" if self.quantize else "onnx-fp32"
+
+    @property
+    def dimension(self) -> int:
+        return int(self.session.get_outputs()[0].shape[-1])
+
+    def load(self) -> None:
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        if not self.model_path.exists():
+            self._export()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.num_threads:
+            options.intra_op_num_threads = self.num_threads
+
+        self.session = ort.InferenceSession(
+            str(self.model_path),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self._input_names = [i.name for i in self.session.get_inputs()]
+        self.tokenizer = AutoTokenizer.from_pretrained(str(self.model_dir))
+
+    def _export(self) -> None:
+        """
+        Export the sentence-transformers model to ONNX (fp32), then
+        quantize to int8 if requested.
+        """
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        self.model_dir.mkdir(parents=True, exist_ok=True)
+        fp32_path = self.model_dir / "model.onnx"
+
+        if not fp32_path.exists():
+            st_model = SentenceTransformer(self.model_name, device="cpu")
+            transformer = st_model[0].auto_model.eval()
+            tokenizer = st_model.tokenizer
+            tokenizer.save_pretrained(str(self.model_dir))
+
+            sample = tokenizer(
+                ["export sample"], return_tensors="pt", padding=True
+            )
+            input_names = [
+                k for k in ("input_ids", "attention_mask", "token_type_ids")
+                if k in sample
+            ]
+            dynamic_axes = {k: {0: "batch", 1: "seq"} for k in input_names}
+            dynamic_axes["last_hidden_state"] = {0: "batch", 1: "seq"}
+
+            with torch.no_grad():
+                torch.onnx.export(
+                    transformer,
+                    tuple(sample[k] for k in input_names),
+                    str(fp32_path),
+                    input_names=input_names,
+                    output_names=["last_hidden_state"],
+                    dynamic_axes=dynamic_axes,
+                    opset_version=17,
+                )
+
+        if self.quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            quantize_dynamic(
+                str(fp32_path),
+                str(self.model_path),
+                weight_type=QuantType.QInt8,
+            )
+
+    def encode(
+        self, texts: List[str], normalize: bool = True, batch_size: int = 32
+    ) -> np.ndarray:
+        outputs = []
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            tokens = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            feeds = {
+                name: tokens[name].astype(np.int64)
+                for name in self._input_names
+            }
+            hidden = self.session.run(None, feeds)[0]
+
+            # Mean pooling over non-padding tokens
+            mask = tokens["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(
+                mask.sum(axis=1), 1e-9, None
+            )
+            outputs.append(pooled.astype(np.float32))
+
+        if not outputs:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        embeddings = np.vstack(outputs)
+        if normalize:
+            embeddings = _l2_normalize(embeddings)
+        return embeddings
+
+
+BACKENDS = {
+    TorchBackend.name: TorchBackend,
+    OnnxBackend.name: OnnxBackend,
+}
+
+
+def create_backend(
+    backend: str,
+    model_name: str,
+    quantize: Optional[bool] = None,
+    num_threads: Optional[int] = None,
+) -> EmbeddingBackend:
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown embedding backend '{backend}'. "
+            f"Expected one of: {', '.join(BACKENDS)}"
+        )
+
+    if backend == OnnxBackend.name:
+        return OnnxBackend(
+            model_name,
+            quantize=(
+                settings.EMBEDDING_ONNX_QUANTIZE if quantize is None else quantize
+            ),
+            num_threads=num_threads,
+        )
+
+    return TorchBackend(model_name, num_threads=num_threads)
+
+
+# -----------------------------
+# Model wrapper
+# -----------------------------
 
 class EmbeddingModel:
     """
     Thin wrapper around sentence-transformers embedding models.
+
+    The backend (torch or ONNX Runtime) is only imported and loaded on
+    first use, so constructing this class is cheap. When `store_dir` is
+    set, normalized embeddings are cached in a SharedEmbeddingStore that
+    every worker process maps.
     """
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = DEFAULT_EMBEDDING_MODEL,
+        backend: Optional[str] = None,
+        quantize: Optional[bool] = None,
+        num_threads: Optional[int] = None,
+        store_dir: Optional[str] = None,
+    ):
         self.model_name = model_name
-        self.model = SentenceTransformer(model_name)
+        self.backend_name = backend or settings.EMBEDDING_BACKEND
+        self.quantize = quantize
+        self.num_threads = (
+            num_threads if num_threads is not None
+            else settings.EMBEDDING_NUM_THREADS
+        )
+        self._backend = create_backend(
+            self.backend_name,
+            model_name,
+            quantize=quantize,
+            num_threads=self.num_threads,
+        )
+        self.store_dir = store_dir
+        self._store: Optional[SharedEmbeddingStore] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_size = 0
+        self._chunk_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._chunk_cache_lock = threading.Lock()
+
+    @property
+    def backend(self) -> EmbeddingBackend:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._backend.load()
+                    self._loaded = True
+        return self._backend
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def store(self) -> Optional[SharedEmbeddingStore]:
+        if self.store_dir and self._store is None:
+            backend = self.backend
+            with self._lock:
+                if self._store is None:
+                    name = self.model_name.strip("/").replace("/", "__")
+                    self._store = SharedEmbeddingStore(
+                        str(Path(self.store_dir) / f"{name}-{backend.tag}"),
+                        dim=backend.dimension,
+                    )
+        return self._store
 
     def embed(
         self,
@@ -30,10 +361,340 @@ class EmbeddingModel:
         if isinstance(texts, str):
             texts = [texts]
 
-        embeddings = self.model.encode(
-            texts,
-            convert_to_numpy=True,
-            normalize_embeddings=normalize,
-        )
+        if normalize and self.store is not None:
+            return self._embed_with_store(texts)
+
+        embeddings = self.backend.encode(texts, normalize=normalize)
 
         return embeddings
+
+    def _embed_with_store(self, texts: List[str]) -> np.ndarray:
+        found, missing = self.store.get_many(texts)
+
+        if missing:
+            computed = self.backend.encode(
+                [texts[i] for i in missing], normalize=True
+            )
+            self.store.put_many([texts[i] for i in missing], computed)
+            for i, vector in zip(missing, computed):
+                found[i] = vector
+
+        return np.vstack(found)
+
+    # -----------------------------
+    # Long documents
+    # -----------------------------
+
+    def embed_chunks(self, texts: Union[str, List[str]]) -> List[np.ndarray]:
+        """
+        Normalized vectors of each text's overlapping windows (see
+        `chunk_text`), one (k, dim) array per text.
+
+        The windows of all texts are encoded together, shortest first so
+        that each encoder batch holds windows of similar length. Vectors
+        are kept in an in-process LRU, so retrieving against a job that
+        was just scored re-encodes nothing.
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+
+        chunked = [
+            chunk_text(
+                text or "",
+                settings.EMBEDDING_CHUNK_WORDS,
+                settings.EMBEDDING_CHUNK_OVERLAP_WORDS,
+            )
+            for text in texts
+        ]
+        vectors = self._chunk_vectors(
+            list(dict.fromkeys(chunk for chunks in chunked for chunk in chunks))
+        )
+        return [np.vstack([vectors[chunk] for chunk in chunks]) for chunks in chunked]
+
+    def embed_documents(
+        self,
+        texts: Union[str, List[str]],
+        pooling: Optional[Pooling] = None,
+    ) -> np.ndarray:
+        """
+        Like `embed`, but texts longer than the model's input are not
+        truncated: their window vectors are pooled into one. Returns
+        normalized vectors of shape (n, dim).
+        """
+        return np.vstack([
+            pool_embeddings(vectors, pooling)
+            for vectors in self.embed_chunks(texts)
+        ])
+
+    def _chunk_vectors(self, chunks: List[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        with self._chunk_cache_lock:
+            for chunk in chunks:
+                vector = self._chunk_cache.get(chunk)
+                if vector is not None:
+                    self._chunk_cache.move_to_end(chunk)
+                    found[chunk] = vector
+
+        missing = sorted(
+            (chunk for chunk in chunks if chunk not in found), key=len
+        )
+        if not missing:
+            return found
+
+        computed = self.embed(missing)
+        with self._chunk_cache_lock:
+            for chunk, vector in zip(missing, computed):
+                found[chunk] = vector
+                self._chunk_cache[chunk] = vector
+            while len(self._chunk_cache) > settings.EMBEDDING_CHUNK_CACHE_SIZE:
+                self._chunk_cache.popitem(last=False)
+
+        return found
+
+    # -----------------------------
+    # Multi-process encoding
+    # -----------------------------
+
+    def start_multi_process_pool(
+        self,
+        num_workers: Optional[int] = None,
+        threads_per_worker: int = 1,
+    ) -> None:
+        """
+        Start a pool of worker processes, each loading the model once.
+
+        Workers default to one intra-op thread each so that N workers
+        use N cores instead of oversubscribing them.
+        """
+        if self._pool is not None:
+            return
+
+        num_workers = num_workers or os.cpu_count() or 1
+        self._pool = ProcessPoolExecutor(
+            max_workers=num_workers,
+            # spawn: torch/ORT thread pools are not fork-safe
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_pool_worker,
+            initargs=(
+                self.model_name,
+                self.backend_name,
+                self.quantize,
+                threads_per_worker,
+            ),
+        )
+        self._pool_size = num_workers
+
+    def stop_multi_process_pool(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            self._pool_size = 0
+
+    def embed_stream(
+        self,
+        texts: Iterable[str],
+        normalize: bool = True,
+        batch_size: int = 64,
+        window_batches: int = 4,
+    ) -> Iterator[np.ndarray]:
+        """
+        Embed an arbitrarily long stream of texts across the worker pool.
+
+        Texts are consumed in windows of `batch_size * window_batches *
+        num_workers`. Each window is sorted by length and cut into
+        batches of similar length (less padding per batch), the batches
+        are encoded in parallel, and the window's embeddings are yielded
+        as one (n, dim) array in the original input order. At most two
+        windows are in flight, so memory stays bounded regardless of
+        input size.
+
+        Falls back to in-process encoding when no pool is running.
+        """
+        window_size = batch_size * window_batches * max(self._pool_size, 1)
+        iterator = iter(texts)
+        pending: Deque[Tuple[int, List[Tuple[List[int], Future]]]] = deque()
+
+        while True:
+            window = list(islice(iterator, window_size))
+            if window:
+                pending.append((len(window), self._submit_window(
+                    window, normalize, batch_size
+                )))
+
+            # Keep one window queued behind the one being collected
+            if pending and (len(pending) > 1 or not window):
+                yield _collect_window(*pending.popleft())
+
+            if not window and not pending:
+                return
+
+    def embed_many(
+        self,
+        texts: Iterable[str],
+        normalize: bool = True,
+        batch_size: int = 64,
+    ) -> np.ndarray:
+        """
+        Multi-process equivalent of `embed` for large batches.
+        """
+        blocks = list(self.embed_stream(texts, normalize, batch_size))
+        if not blocks:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(blocks)
+
+    def _submit_window(
+        self, window: List[str], normalize: bool, batch_size: int
+    ) -> List[Tuple[List[int], Future]]:
+        order = sorted(range(len(window)), key=lambda i: len(window[i]))
+        submitted = []
+
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            batch = [window[i] for i in indices]
+
+            if self._pool is None:
+                future: Future = Future()
+                future.set_result(
+                    self.backend.encode(batch, normalize=normalize)
+                )
+            else:
+                future = self._pool.submit(
+                    _encode_in_worker, batch, normalize, batch_size
+                )
+            submitted.append((indices, future))
+
+        return submitted
+
+
+# -----------------------------
+# Pool worker helpers
+# -----------------------------
+
+_worker_model: Optional[EmbeddingModel] = None
+
+
+def _init_pool_worker(
+    model_name: str,
+    backend: str,
+    quantize: Optional[bool],
+    num_threads: int,
+) -> None:
+    global _worker_model
+    _worker_model = EmbeddingModel(
+        model_name,
+        backend=backend,
+        quantize=quantize,
+        num_threads=num_threads,
+    )
+    _worker_model.backend  # load eagerly, once per worker
+
+
+def _encode_in_worker(
+    texts: List[str], normalize: bool, batch_size: int
+) -> np.ndarray:
+    return _worker_model.backend.encode(
+        texts, normalize=normalize, batch_size=batch_size
+    )
+
+
+def _collect_window(
+    size: int, submitted: List[Tuple[List[int], Future]]
+) -> np.ndarray:
+    """
+    Stitch per-batch results back into input order.
+    """
+    out: Optional[np.ndarray] = None
+    for indices, future in submitted:
+        embeddings = future.result()
+        if out is None:
+            out = np.empty((size, embeddings.shape[1]), dtype=embeddings.dtype)
+        out[indices] = embeddings
+    return out
+
+
+# -----------------------------
+# Shared instances
+# -----------------------------
+
+_models: Dict[str, EmbeddingModel] = {}
+_models_lock = threading.Lock()
+
+
+def get_embedding_model(model_name: str = DEFAULT_EMBEDDING_MODEL) -> EmbeddingModel:
+    """
+    Return the process-wide EmbeddingModel for `model_name`, using the
+    backend configured in settings.
+    """
+    with _models_lock:
+        model = _models.get(model_name)
+        if model is None:
+            model = EmbeddingModel(
+                model_name, store_dir=settings.EMBEDDING_STORE_DIR
+            )
+            _models[model_name] = model
+    return model
+
+
+def warm_up_in_background(
+    model_name: str = DEFAULT_EMBEDDING_MODEL,
+) -> Optional[threading.Thread]:
+    """
+    Load the embedding model on a daemon thread so the first request
+    doesn't pay for it. Returns None if the model is already loaded.
+    """
+    model = get_embedding_model(model_name)
+    if model.is_loaded:
+        return None
+
+    thread = threading.Thread(
+        target=lambda: model.backend,
+        name=f"embedding-warmup-{model_name}",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+def chunk_text(text: str, window_words: int, overlap_words: int) -> List[str]:
+    """
+    Split `text` into windows of `window_words` words, each overlapping
+    the previous one by `overlap_words`. Texts that fit in one window
+    are returned unchanged.
+    """
+    words = text.split()
+    if len(words) <= window_words:
+        return [text]
+
+    step = max(1, window_words - overlap_words)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + window_words]))
+        if start + window_words >= len(words):
+            break
+    return chunks
+
+
+def pool_embeddings(
+    vectors: np.ndarray, pooling: Optional[Pooling] = None
+) -> np.ndarray:
+    """
+    One normalized vector from a text's (k, dim) window vectors.
+    """
+    pooling = Pooling(pooling or settings.EMBEDDING_POOLING)
+    if len(vectors) == 1:
+        return vectors[0]
+    pooled = vectors.max(axis=0) if pooling == Pooling.MAX else vectors.mean(axis=0)
+    return _l2_normalize(pooled)
+
+
+def _l2_normalize(x: np.ndarray) -> np.ndarray:
+    return x / np.clip(np.linalg.norm(x, axis=-1, keepdims=True), 1e-12, None)
+
+
+def cosine_similarity(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarity between rows of `a` (n, dim) and `b` (m, dim).
+    """
+    a = _l2_normalize(np.atleast_2d(a))
+    b = _l2_normalize(np.atleast_2d(b))
+    return a @ b.T
@@ -0,0 +1,211 @@
+import fcntl
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class SharedEmbeddingStore:
+    """
+    Append-only, memory-mapped embedding store shared between processes.
+
+    Layout (all files live next to each other under `path`):
+        meta  – int64[2]: committed row count, embedding dim
+        keys  – uint8[capacity, 16]: blake2b digest of each text
+        vecs  – float32[capacity, dim]: embedding rows
+        lock  – fcntl lock file serialising writers
+
+    Every worker maps the same files, so vectors are read straight from
+    the page cache without copying. Writers take an exclusive file lock,
+    write keys and vectors first and bump the committed count last, so
+    readers never observe a half-written row.
+    """
+
+    KEY_SIZE = 16
+    GROWTH_ROWS = 4096
+
+    def __init__(self, path: str, dim: int):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+
+        self._meta_path = self.path / "meta"
+        self._keys_path = self.path / "keys"
+        self._vecs_path = self.path / "vecs"
+        self._lock_path = self.path / "lock"
+
+        self._local_lock = threading.Lock()
+        self._index: Dict[bytes, int] = {}
+        self._indexed = 0
+        self._capacity = 0
+        self._keys: Optional[np.memmap] = None
+        self._vecs: Optional[np.memmap] = None
+
+        with self._file_lock():
+            if not self._meta_path.exists():
+                meta = np.memmap(self._meta_path, dtype=np.int64, mode="w+", shape=(2,))
+                meta[:] = (0, dim)
+                meta.flush()
+                del meta
+
+        self._meta = np.memmap(self._meta_path, dtype=np.int64, mode="r+", shape=(2,))
+        if int(self._meta[1]) != dim:
+            raise ValueError(
+                f"Embedding store at {self.path} has dim {int(self._meta[1])}, "
+                f"expected {dim}"
+            )
+
+    # -----------------------------
+    # PUBLIC API
+    # -----------------------------
+
+    def __len__(self) -> int:
+        return int(self._meta[0])
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """
+        Return a read-only view of the stored vector for `text`, if any.
+        """
+        with self._local_lock:
+            self._refresh()
+            row = self._index.get(self._key(text))
+            if row is None:
+                return None
+            return self._row(row)
+
+    def get_many(
+        self, texts: Sequence[str]
+    ) -> Tuple[List[Optional[np.ndarray]], List[int]]:
+        """
+        Look up several texts at once.
+
+        Returns the per-text vectors (None for misses) and the indices
+        of the misses.
+        """
+        with self._local_lock:
+            self._refresh()
+            found: List[Optional[np.ndarray]] = []
+            missing: List[int] = []
+            for i, text in enumerate(texts):
+                row = self._index.get(self._key(text))
+                if row is None:
+                    missing.append(i)
+                    found.append(None)
+                else:
+                    found.append(self._row(row))
+            return found, missing
+
+    def put_many(self, texts: Sequence[str], embeddings: np.ndarray) -> None:
+        """
+        Append vectors for texts not already stored.
+        """
+        if len(texts) == 0:
+            return
+
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+
+        with self._local_lock, self._file_lock():
+            # Another process may have added rows since our last refresh
+            self._refresh()
+
+            new_rows = []
+            seen = set()
+            for text, vector in zip(texts, embeddings):
+                key = self._key(text)
+                if key in self._index or key in seen:
+                    continue
+                seen.add(key)
+                new_rows.append((key, vector))
+
+            if not new_rows:
+                return
+
+            start = int(self._meta[0])
+            end = start + len(new_rows)
+            self._ensure_capacity(end)
+
+            for offset, (key, vector) in enumerate(new_rows):
+                self._keys[start + offset] = np.frombuffer(key, dtype=np.uint8)
+                self._vecs[start + offset] = vector
+            self._keys.flush()
+            self._vecs.flush()
+
+            # Commit: readers only look at rows below the count
+            self._meta[0] = end
+            self._meta.flush()
+
+            self._refresh()
+
+    # -----------------------------
+    # INTERNAL HELPERS
+    # -----------------------------
+
+    def _row(self, row: int) -> np.ndarray:
+        view = self._vecs[row]
+        view.flags.writeable = False
+        return view
+
+    def _key(self, text: str) -> bytes:
+        return hashlib.blake2b(
+            text.encode("utf-8"), digest_size=self.KEY_SIZE
+        ).digest()
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self._lock_path, "a+") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _file_rows(self) -> int:
+        if not self._vecs_path.exists():
+            return 0
+        return os.path.getsize(self._vecs_path) // (self.dim * 4)
+
+    def _map(self, rows: int) -> None:
+        self._capacity = rows
+        if rows == 0:
+            self._keys = self._vecs = None
+            return
+        self._keys = np.memmap(
+            self._keys_path, dtype=np.uint8, mode="r+", shape=(rows, self.KEY_SIZE)
+        )
+        self._vecs = np.memmap(
+            self._vecs_path, dtype=np.float32, mode="r+", shape=(rows, self.dim)
+        )
+
+    def _ensure_capacity(self, rows: int) -> None:
+        """
+        Grow the backing files (caller holds the file lock).
+        """
+        capacity = self._file_rows()
+        if rows > capacity:
+            capacity = max(rows, capacity + self.GROWTH_ROWS)
+            with open(self._keys_path, "ab") as fh:
+                fh.truncate(capacity * self.KEY_SIZE)
+            with open(self._vecs_path, "ab") as fh:
+                fh.truncate(capacity * self.dim * 4)
+        if capacity != self._capacity:
+            self._map(capacity)
+
+    def _refresh(self) -> None:
+        """
+        Index rows committed by any process since the last refresh.
+        """
+        count = int(self._meta[0])
+        if count <= self._indexed:
+            return
+
+        if count > self._capacity:
+            self._map(self._file_rows())
+
+        keys = self._keys[self._indexed:count]
+        for offset, key in enumerate(keys):
+            self._index[key.tobytes()] = self._indexed + offset
+        self._indexed = count
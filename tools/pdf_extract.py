@@ -0,0 +1,39 @@
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from PyPDF2 import PdfReader
+
+
+# PDFs with at least this many pages are extracted in parallel
+PARALLEL_MIN_PAGES = 16
+PAGES_PER_TASK = 8
+
+
+def extract_pages(data: bytes, start: int, end: int) -> List[str]:
+    """
+    Extract text from pages [start, end) of a PDF given as bytes.
+    """
+    reader = PdfReader(io.BytesIO(data))
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+def extract_pdf_text(data: bytes) -> str:
+    """
+    Extract text from a PDF. Large documents are split into page ranges
+    that are extracted in parallel worker processes (PyPDF2 is pure
+    Python, so threads would serialise on the GIL).
+    """
+    num_pages = len(PdfReader(io.BytesIO(data)).pages)
+
+    if num_pages < PARALLEL_MIN_PAGES:
+        return "\n".join(extract_pages(data, 0, num_pages))
+
+    starts = list(range(0, num_pages, PAGES_PER_TASK))
+    ends = [min(start + PAGES_PER_TASK, num_pages) for start in starts]
+    workers = min(len(starts), os.cpu_count() or 1)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunks = pool.map(extract_pages, [data] * len(starts), starts, ends)
+        return "\n".join(page for chunk in chunks for page in chunk)
@@ -0,0 +1,275 @@
+import contextvars
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel, computed_field
+
+
+# End of input marker passed down the queues
+_DONE = object()
+
+# How often blocked workers re-check for an aborted run
+_POLL_S = 0.1
+
+
+class Stage:
+    """
+    One step of a StagedPipeline.
+
+    `fn` receives a list of up to `batch_size` items and returns the
+    items to pass on (any number, so stages can filter or fan out).
+    `workers` threads run `fn` concurrently. With `batch_size=None` the
+    stage is a barrier: `fn` is called once with every input item.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[List[Any]], Iterable[Any]],
+        workers: int = 1,
+        batch_size: Optional[int] = 1,
+        queue_size: Optional[int] = None,
+    ):
+        self.name = name
+        self.fn = fn
+        self.workers = 1 if batch_size is None else max(1, workers)
+        self.batch_size = batch_size
+        # Bounded input queue: a slow stage blocks its producers
+        self.queue_size = queue_size or max(4, self.workers * (batch_size or 1) * 2)
+
+
+class StageStats(BaseModel):
+    name: str
+    workers: int
+    batch_size: Optional[int]
+    items_in: int = 0
+    items_out: int = 0
+    batches: int = 0
+    busy_s: float = 0.0
+    wall_s: float = 0.0
+
+    @computed_field
+    @property
+    def items_per_s(self) -> float:
+        return self.items_in / self.wall_s if self.wall_s else 0.0
+
+
+class _Abort(Exception):
+    pass
+
+
+class _StageRun:
+    def __init__(self, stage: Stage, inbox: "queue.Queue", outbox: "queue.Queue"):
+        self.stage = stage
+        self.inbox = inbox
+        self.outbox = outbox
+        self.stats = StageStats(
+            name=stage.name, workers=stage.workers, batch_size=stage.batch_size
+        )
+        self.lock = threading.Lock()
+        self.running = stage.workers
+        self.started_at: Optional[float] = None
+
+
+class StagedPipeline:
+    """
+    Runs items through a chain of stages connected by bounded queues.
+
+    Every stage has its own worker threads, so stages overlap: the
+    first jobs can be scored while later ones are still being embedded.
+    Because the queues are bounded, a slow stage blocks the stages
+    feeding it instead of letting items pile up in memory. Worker threads
+    run in a copy of the caller's context (request deadline, usage
+    meter, LLM tenant). If any stage raises, the run stops and `run`
+    re-raises the first error.
+    """
+
+    def __init__(self, name: str, stages: List[Stage]):
+        self.name = name
+        self.stages = stages
+
+    def run(self, items: Iterable[Any]) -> Tuple[List[Any], List[StageStats]]:
+        """
+        Feed `items` through every stage. Returns the last stage's output
+        and this run's per-stage counters.
+        """
+        queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        results: "queue.Queue" = queue.Queue()
+        queues.append(results)
+
+        runs = [
+            _StageRun(stage, queues[i], queues[i + 1])
+            for i, stage in enumerate(self.stages)
+        ]
+        abort = threading.Event()
+        errors: List[BaseException] = []
+
+        def fail(e: BaseException) -> None:
+            errors.append(e)
+            abort.set()
+
+        threads = []
+        for run in runs:
+            for i in range(run.stage.workers):
+                ctx = contextvars.copy_context()
+                threads.append(threading.Thread(
+                    target=ctx.run,
+                    args=(self._work, run, abort, fail),
+                    name=f"{self.name}-{run.stage.name}-{i}",
+                    daemon=True,
+                ))
+        for thread in threads:
+            thread.start()
+
+        try:
+            for item in items:
+                _put(queues[0], item, abort)
+            _put(queues[0], _DONE, abort)
+        except _Abort:
+            pass
+        except BaseException as e:
+            fail(e)
+
+        for thread in threads:
+            thread.join()
+
+        stats = [run.stats for run in runs]
+        _record(self.name, stats)
+
+        if errors:
+            raise errors[0]
+
+        out = []
+        while True:
+            item = results.get_nowait()
+            if item is _DONE:
+                return out, stats
+            out.append(item)
+
+    # -----------------------------
+    # INTERNAL HELPERS
+    # -----------------------------
+
+    def _work(self, run: _StageRun, abort: threading.Event, fail) -> None:
+        stage = run.stage
+        try:
+            while True:
+                batch, done = self._take(run, abort)
+                if batch:
+                    start = time.perf_counter()
+                    with run.lock:
+                        if run.started_at is None:
+                            run.started_at = start
+
+                    out = list(stage.fn(batch))
+
+                    with run.lock:
+                        run.stats.items_in += len(batch)
+                        run.stats.items_out += len(out)
+                        run.stats.batches += 1
+                        run.stats.busy_s += time.perf_counter() - start
+                    for item in out:
+                        _put(run.outbox, item, abort)
+                if done:
+                    break
+        except _Abort:
+            return
+        except BaseException as e:
+            fail(e)
+            return
+
+        with run.lock:
+            run.running -= 1
+            last = run.running == 0
+            if run.started_at is not None:
+                run.stats.wall_s = time.perf_counter() - run.started_at
+        if last:
+            try:
+                _put(run.outbox, _DONE, abort)
+            except _Abort:
+                pass
+
+    def _take(self, run: _StageRun, abort: threading.Event):
+        """Next batch and whether the input is exhausted."""
+        limit = run.stage.batch_size
+        batch: List[Any] = []
+
+        # Block for the first item, then take what is already queued
+        item = _get(run.inbox, abort)
+        while item is not _DONE:
+            batch.append(item)
+            if limit is not None and len(batch) >= limit:
+                return batch, False
+            if limit is None:
+                item = _get(run.inbox, abort)
+                continue
+            try:
+                item = run.inbox.get_nowait()
+            except queue.Empty:
+                return batch, False
+
+        # Leave the marker for this stage's other workers
+        run.inbox.put(_DONE)
+        return batch, True
+
+
+def _put(q: "queue.Queue", item: Any, abort: threading.Event) -> None:
+    while True:
+        if abort.is_set():
+            raise _Abort()
+        try:
+            q.put(item, timeout=_POLL_S)
+            return
+        except queue.Full:
+            continue
+
+
+def _get(q: "queue.Queue", abort: threading.Event) -> Any:
+    while True:
+        if abort.is_set():
+            raise _Abort()
+        try:
+            return q.get(timeout=_POLL_S)
+        except queue.Empty:
+            continue
+
+
+# -----------------------------
+# Process-wide stage counters
+# -----------------------------
+
+_totals_lock = threading.Lock()
+_totals: Dict[tuple, Dict[str, float]] = defaultdict(
+    lambda: {"runs": 0, "items_in": 0, "items_out": 0, "batches": 0, "busy_s": 0.0, "wall_s": 0.0}
+)
+
+
+def _record(pipeline: str, stats: List[StageStats]) -> None:
+    with _totals_lock:
+        for stage in stats:
+            totals = _totals[(pipeline, stage.name)]
+            totals["runs"] += 1
+            totals["items_in"] += stage.items_in
+            totals["items_out"] += stage.items_out
+            totals["batches"] += stage.batches
+            totals["busy_s"] += stage.busy_s
+            totals["wall_s"] += stage.wall_s
+
+
+def pipeline_stats() -> List[dict]:
+    """Per (pipeline, stage) item counts and throughput since start-up."""
+    with _totals_lock:
+        return [
+            {
+                "pipeline": pipeline,
+                "stage": stage,
+                **totals,
+                "items_per_s": (
+                    totals["items_in"] / totals["wall_s"] if totals["wall_s"] else 0.0
+                ),
+            }
+            for (pipeline, stage), totals in _totals.items()
+        ]
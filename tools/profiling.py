@@ -0,0 +1,221 @@
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from enum import Enum
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# (thread name, frames root-first); a frame is (function, file, line)
+Frame = Tuple[str, str, int]
+Stack = Tuple[str, Tuple[Frame, ...]]
+
+
+class ProfileFormat(str, Enum):
+    COLLAPSED = "collapsed"  # Brendan Gregg's folded stacks (flamegraph.pl)
+    SPEEDSCOPE = "speedscope"  # https://www.speedscope.app
+
+    @property
+    def suffix(self) -> str:
+        return ".collapsed.txt" if self == ProfileFormat.COLLAPSED else ".speedscope.json"
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler for one request.
+
+    A daemon thread wakes every `interval_s` and records the Python stack
+    of the thread that started the profiler plus every thread created
+    while it runs (e.g. discovery's search pool). Threads that already
+    existed, such as workers serving other requests, are ignored.
+
+    Nothing is installed globally (no sys.setprofile / settrace), so code
+    outside a `with SamplingProfiler()` block runs at full speed. Native
+    time (torch, parsing in C) is attributed to the Python frame that
+    called into it.
+    """
+
+    def __init__(self, interval_s: float = 0.005):
+        self.interval_s = interval_s
+        self.samples: Counter = Counter()
+        self.duration_s = 0.0
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._target_id: Optional[int] = None
+        self._existing: set = set()
+        self._start = 0.0
+
+    def __enter__(self) -> "SamplingProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self._target_id = threading.get_ident()
+        self._existing = {t.ident for t in threading.enumerate()}
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration_s = time.perf_counter() - self._start
+
+    # -----------------------------
+    # OUTPUT
+    # -----------------------------
+
+    def collapsed(self) -> str:
+        """
+        One line per distinct stack: "thread;root;...;leaf count".
+        """
+        lines = []
+        for (thread, frames), count in sorted(self.samples.items()):
+            names = [thread] + [_frame_label(frame) for frame in frames]
+            lines.append(";".join(n.replace(";", ":") for n in names) + f" {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str = "request") -> dict:
+        """
+        Speedscope "sampled" profile, one profile per thread. Weights are
+        in seconds.
+        """
+        frame_index: Dict[Frame, int] = {}
+        profiles: Dict[str, dict] = {}
+
+        for (thread, frames), count in sorted(self.samples.items()):
+            profile = profiles.setdefault(thread, {
+                "type": "sampled",
+                "name": thread,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": 0.0,
+                "samples": [],
+                "weights": [],
+            })
+            profile["samples"].append([
+                frame_index.setdefault(frame, len(frame_index)) for frame in frames
+            ])
+            weight = count * self.interval_s
+            profile["weights"].append(weight)
+            profile["endValue"] += weight
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "job-search sampling profiler",
+            "shared": {
+                "frames": [
+                    {"name": func, "file": file, "line": line}
+                    for (func, file, line) in frame_index
+                ]
+            },
+            "profiles": list(profiles.values()),
+        }
+
+    def render(self, fmt: ProfileFormat, name: str = "request") -> str:
+        if fmt == ProfileFormat.COLLAPSED:
+            return self.collapsed()
+        return json.dumps(self.speedscope(name))
+
+    # -----------------------------
+    # INTERNAL HELPERS
+    # -----------------------------
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        names: Dict[int, str] = {}
+
+        while not self._stop.wait(self.interval_s):
+            frames = sys._current_frames()
+            for thread_id, frame in frames.items():
+                if thread_id == own_id:
+                    continue
+                if thread_id != self._target_id and thread_id in self._existing:
+                    continue
+
+                if thread_id not in names:
+                    names[thread_id] = _thread_name(thread_id)
+
+                stack: List[Frame] = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((
+                        getattr(code, "co_qualname", code.co_name),
+                        code.co_filename,
+                        code.co_firstlineno,
+                    ))
+                    frame = frame.f_back
+                stack.reverse()
+
+                self.samples[(names[thread_id], tuple(stack))] += 1
+
+            del frames
+
+
+def _thread_name(thread_id: int) -> str:
+    for thread in threading.enumerate():
+        if thread.ident == thread_id:
+            return thread.name
+    return f"thread-{thread_id}"
+
+
+def _frame_label(frame: Frame) -> str:
+    func, file, line = frame
+    return f"{func} ({_short_path(file)}:{line})"
+
+
+def _short_path(path: str) -> str:
+    # Trim site-packages / repo prefixes so labels stay readable
+    for marker in ("site-packages" + os.sep, "dist-packages" + os.sep):
+        if marker in path:
+            return path.split(marker, 1)[1]
+    try:
+        return os.path.relpath(path)
+    except ValueError:
+        return path
+
+
+# -----------------------------
+# Stored profiles
+# -----------------------------
+
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def save_profile(
+    profiler: SamplingProfiler,
+    fmt: ProfileFormat,
+    directory: str,
+    name: str = "request",
+) -> str:
+    """Write a profile under `directory`; returns its id."""
+    profile_id = uuid.uuid4().hex
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    (path / f"{profile_id}{fmt.suffix}").write_text(
+        profiler.render(fmt, name), encoding="utf-8"
+    )
+    return profile_id
+
+
+def find_profile(profile_id: str, directory: str) -> Optional[Path]:
+    """Path of a stored profile, or None (ids are validated, not trusted)."""
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    for fmt in ProfileFormat:
+        path = Path(directory) / f"{profile_id}{fmt.suffix}"
+        if path.exists():
+            return path
+    return None
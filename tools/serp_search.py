@@ -3,6 +3,23 @@ from typing import List, Optional
 
 from config.settings import settings
 from schemas.job import Job
+from tools.circuit_breaker import breaker_from_settings, is_client_error
+from tools.deadline import (
+    DeadlineExceeded,
+    check_deadline,
+    clamp_timeout,
+    deadline_expired,
+)
+from tools.singleflight import SingleFlight
+
+
+# Concurrent identical searches (popular queries at peak) share one request
+_search_flight = SingleFlight(
+    "serp_search",
+    share=lambda jobs: [job.model_copy(deep=True) for job in jobs],
+)
+
+serp_breaker = breaker_from_settings("serpapi", settings.SERPAPI_SLOW_CALL_S)
 
 
 class SerpJobSearch:
@@ -29,7 +46,18 @@ class SerpJobSearch:
         """
         Search for jobs and return structured Job objects.
         """
+        return _search_flight.do(
+            (query, location, max_results),
+            lambda: self._search(query, location, max_results),
+            timeout=clamp_timeout(None),
+        )
 
+    def _search(
+        self,
+        query: str,
+        location: Optional[str],
+        max_results: int,
+    ) -> List[Job]:
         params = {
             "engine": "google_jobs",
             "q": query,
@@ -40,8 +68,27 @@ class SerpJobSearch:
         if location:
             params["location"] = location
 
-        response = requests.get(self.BASE_URL, params=params, timeout=15)
-        response.raise_for_status()
+        check_deadline("job search")
+
+        def fetch() -> requests.Response:
+            response = requests.get(
+                self.BASE_URL,
+                params=params,
+                timeout=clamp_timeout(settings.SERPAPI_TIMEOUT_S),
+            )
+            response.raise_for_status()
+            return response
+
+        try:
+            # Raises CircuitOpenError without calling while SerpAPI is failing
+            response = serp_breaker.call(
+                fetch,
+                ignore_failure=lambda e: deadline_expired() or is_client_error(e),
+            )
+        except requests.Timeout as e:
+            if deadline_expired():
+                raise DeadlineExceeded("Deadline exceeded during job search") from e
+            raise
 
         data = response.json()
 
@@ -0,0 +1,141 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+
+class SingleFlight:
+    """
+    Deduplicates identical in-flight calls.
+
+    The first caller for a key (the leader) runs the work; callers that
+    arrive with the same key while it is running wait for the leader's
+    result instead of repeating the work. Errors propagate to every
+    waiter. Once the call finishes the key is forgotten, so this is
+    coalescing, not caching.
+
+    Sync and async callers share the same in-flight calls: the result is
+    published through a concurrent.futures.Future, which threads wait on
+    directly and coroutines await via asyncio.wrap_future.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        share: Optional[Callable[[Any], Any]] = None,
+    ):
+        """
+        Args:
+            name: Label used in stats
+            share: Applied to the result handed to followers, e.g. a
+                deep copy so callers can't mutate each other's objects
+        """
+        self.name = name
+        self.share = share
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0, "errors": 0}
+        _registry.append(self)
+
+    # -----------------------------
+    # PUBLIC API
+    # -----------------------------
+
+    def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Any],
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Run `fn` or wait for the identical call in flight. A follower
+        gives up after `timeout` seconds (TimeoutError); the leader's
+        call is unaffected.
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return self._shared(future.result(timeout=timeout))
+
+        self._run(key, future, fn)
+        return future.result()
+
+    async def do_async(
+        self, key: Hashable, fn: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        future, leader = self._join(key)
+        if not leader:
+            # Shielded: a cancelled follower must not cancel the shared call
+            return self._shared(
+                await asyncio.shield(asyncio.wrap_future(future))
+            )
+
+        try:
+            result = await fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "in_flight": len(self._inflight),
+                **self._stats,
+            }
+
+    # -----------------------------
+    # INTERNAL HELPERS
+    # -----------------------------
+
+    def _join(self, key: Hashable):
+        with self._lock:
+            self._stats["calls"] += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                return future, False
+
+            future = Future()
+            self._inflight[key] = future
+            self._stats["executions"] += 1
+            return future, True
+
+    def _run(self, key: Hashable, future: Future, fn: Callable[[], Any]) -> None:
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            return
+        self._finish(key, future, result=result)
+
+    def _finish(
+        self,
+        key: Hashable,
+        future: Future,
+        result: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+            if error is not None:
+                self._stats["errors"] += 1
+
+        if future.cancelled():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _shared(self, result: Any) -> Any:
+        return self.share(result) if self.share is not None else result
+
+
+_registry: List[SingleFlight] = []
+
+
+def coalescing_stats() -> List[dict]:
+    """Counters for every SingleFlight in the process."""
+    return [flight.stats() for flight in _registry]
@@ -0,0 +1,283 @@
+import json
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from schemas.job import Job
+from schemas.resume import Resume
+
+
+# Tokens keep in-word "+", "#" and "." so that c++, c#, node.js survive,
+# while trailing punctuation ("python.") is dropped.
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+# Canonical skill -> aliases (the canonical name is always an alias too,
+# except for the ambiguous short names below).
+# Ambiguous short names (go, r, c) are only matched in unambiguous forms.
+DEFAULT_SKILL_ALIASES: Dict[str, List[str]] = {
+    # Languages
+    "Python": ["python3"],
+    "Java": [],
+    "JavaScript": ["js", "ecmascript"],
+    "TypeScript": [],
+    "Go": ["golang"],
+    "Rust": [],
+    "C++": ["cpp"],
+    "C#": ["csharp", "c sharp"],
+    "Scala": [],
+    "Kotlin": [],
+    "Swift": [],
+    "Ruby": [],
+    "PHP": [],
+    "R": ["r programming", "rstudio"],
+    "MATLAB": [],
+    "Julia": [],
+    "SQL": [],
+    "Bash": ["shell scripting"],
+    # ML / data science
+    "Machine Learning": ["ml"],
+    "Deep Learning": [],
+    "NLP": ["natural language processing"],
+    "Computer Vision": [],
+    "Reinforcement Learning": [],
+    "LLMs": ["llm", "large language models", "large language model"],
+    "Generative AI": ["genai", "gen ai"],
+    "RAG": ["retrieval augmented generation", "retrieval-augmented generation"],
+    "Statistics": ["statistical modeling", "statistical modelling"],
+    "Time Series": ["time-series"],
+    "Recommender Systems": ["recommendation systems", "recommender system"],
+    "MLOps": ["ml ops"],
+    "Feature Engineering": [],
+    "A/B Testing": ["ab testing"],
+    # ML libraries
+    "PyTorch": ["torch"],
+    "TensorFlow": ["tensorflow2"],
+    "Keras": [],
+    "JAX": [],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "XGBoost": [],
+    "LightGBM": [],
+    "Hugging Face": ["huggingface"],
+    "LangChain": [],
+    "spaCy": [],
+    "NLTK": [],
+    "OpenCV": [],
+    "pandas": [],
+    "NumPy": [],
+    "SciPy": [],
+    "Matplotlib": [],
+    "MLflow": [],
+    "Kubeflow": [],
+    # Data engineering
+    "Spark": ["apache spark", "pyspark"],
+    "Hadoop": [],
+    "Kafka": ["apache kafka"],
+    "Airflow": ["apache airflow"],
+    "dbt": [],
+    "Snowflake": [],
+    "BigQuery": ["big query"],
+    "Redshift": [],
+    "Databricks": [],
+    "ETL": ["elt"],
+    "Data Warehousing": ["data warehouse"],
+    # Databases
+    "PostgreSQL": ["postgres"],
+    "MySQL": [],
+    "MongoDB": ["mongo"],
+    "Redis": [],
+    "Elasticsearch": ["elastic search", "opensearch"],
+    "Cassandra": [],
+    "DynamoDB": [],
+    "SQLite": [],
+    # Cloud / infra
+    "AWS": ["amazon web services"],
+    "GCP": ["google cloud", "google cloud platform"],
+    "Azure": ["microsoft azure"],
+    "Docker": [],
+    "Kubernetes": ["k8s"],
+    "Terraform": [],
+    "CI/CD": ["continuous integration", "continuous delivery"],
+    "Jenkins": [],
+    "GitHub Actions": [],
+    "Git": ["github", "gitlab"],
+    "Linux": ["unix"],
+    # Web / backend
+    "React": ["react.js", "reactjs"],
+    "Angular": [],
+    "Vue": ["vue.js", "vuejs"],
+    "Node.js": ["nodejs"],
+    "Django": [],
+    "Flask": [],
+    "FastAPI": [],
+    "Spring": ["spring boot"],
+    "GraphQL": [],
+    "REST APIs": ["restful", "rest api"],
+    "Microservices": ["microservice"],
+    # Analytics / BI
+    "Tableau": [],
+    "Power BI": ["powerbi"],
+    "Excel": ["microsoft excel"],
+    "Looker": [],
+    "Data Visualization": ["data visualisation"],
+    # Practices
+    "Agile": ["scrum"],
+    "Distributed Systems": [],
+    "System Design": [],
+}
+
+
+# Common words or letters: only matched through their listed aliases
+AMBIGUOUS_SKILL_NAMES = frozenset({"go", "r", "c"})
+
+
+class SkillExtractor:
+    """
+    Dictionary-based skill extractor.
+
+    All aliases are tokenized and compiled into one Aho-Corasick
+    automaton over tokens, so a description is scanned in a single pass
+    regardless of vocabulary size, and matches always fall on word
+    boundaries. Matches are normalised to their canonical skill name.
+    """
+
+    def __init__(self, aliases: Optional[Dict[str, Sequence[str]]] = None):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[str]] = [set()]
+
+        for canonical, names in (aliases or DEFAULT_SKILL_ALIASES).items():
+            if canonical.lower() in AMBIGUOUS_SKILL_NAMES:
+                names = set(names)
+            else:
+                names = {canonical, *names}
+            for name in names:
+                tokens = tokenize(name)
+                if tokens:
+                    self._insert(tokens, canonical)
+
+        self._build_failure_links()
+
+    @classmethod
+    def from_json(cls, path: str) -> "SkillExtractor":
+        """
+        Load a {canonical: [aliases]} vocabulary, e.g. one learned offline.
+        """
+        with open(path, encoding="utf-8") as fh:
+            return cls(json.load(fh))
+
+    # -----------------------------
+    # PUBLIC API
+    # -----------------------------
+
+    def extract(self, text: str) -> List[str]:
+        """
+        Canonical skills mentioned in `text`, in order of first mention.
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        found: Dict[str, None] = {}
+        state = 0
+
+        for token in tokenize(text or ""):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for skill in output[state]:
+                found.setdefault(skill)
+
+        return list(found)
+
+    def extract_many(self, texts: Iterable[str]) -> List[List[str]]:
+        return [self.extract(text) for text in texts]
+
+    def normalise(self, names: Iterable[str]) -> Set[str]:
+        """
+        Map free-form skill names (e.g. from a resume) to canonical ones.
+        """
+        return set(self.extract(" , ".join(names)))
+
+    # -----------------------------
+    # AUTOMATON
+    # -----------------------------
+
+    def _insert(self, tokens: List[str], canonical: str) -> None:
+        state = 0
+        for token in tokens:
+            nxt = self._goto[state].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][token] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            state = nxt
+        self._output[state].add(canonical)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(token, 0)
+                self._output[nxt] |= self._output[self._fail[nxt]]
+
+
+# -----------------------------
+# Shared instance & scoring
+# -----------------------------
+
+_default_extractor: Optional[SkillExtractor] = None
+
+
+def get_skill_extractor() -> SkillExtractor:
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = SkillExtractor()
+    return _default_extractor
+
+
+def resume_skills(resume: Resume, extractor: Optional[SkillExtractor] = None) -> Set[str]:
+    """
+    Canonical skills from the resume's skills, tools and summary.
+    """
+    extractor = extractor or get_skill_extractor()
+    skills = extractor.normalise([*resume.skills, *resume.tools])
+    skills.update(extractor.extract(resume.summary or ""))
+    return skills
+
+
+def skill_overlap(candidate_skills: Set[str], job: Job) -> Optional[float]:
+    """
+    Fraction of the job's extracted skills the candidate has, or None
+    when no skills were extracted for the job.
+    """
+    if not job.skills:
+        return None
+    return len(candidate_skills.intersection(job.skills)) / len(job.skills)
+
+
+def gate_by_skill_overlap(
+    resume: Resume, jobs: Sequence[Job], min_overlap: float
+) -> Tuple[List[Job], List[Optional[float]]]:
+    """
+    Drop jobs whose skill overlap is below `min_overlap` (jobs with no
+    extracted skills are kept) and return the rest with their overlaps,
+    best overlap first.
+    """
+    candidate = resume_skills(resume)
+    kept = []
+    for job in jobs:
+        overlap = skill_overlap(candidate, job)
+        if overlap is None or overlap >= min_overlap:
+            kept.append((job, overlap))
+
+    kept.sort(key=lambda pair: -1.0 if pair[1] is None else pair[1], reverse=True)
+    return [job for job, _ in kept], [overlap for _, overlap in kept]
@@ -1,6 +1,6 @@
 import streamlit as st
 import os
-import io
+import hashlib
 import requests
 from typing import Optional
 
@@ -19,6 +19,7 @@ except ImportError:
 
 try:
     from PyPDF2 import PdfReader
+    from tools.pdf_extract import extract_pdf_text as _extract_pdf_text
 except ImportError:
     PdfReader = None
 
@@ -26,116 +27,196 @@ except ImportError:
 # Backend imports (ONLY used when deployed)
 # -----------------------------
 if DEPLOYED:
-    from crew.agents.resume_agent import ResumeAgent
-    from crew.agents.job_discovery import JobDiscoveryAgent
     from crew.agents.matcher_agent import MatcherAgent
-    from crew.agents.outreach_agent import OutreachAgent
-    from crew.agents.tracker_agent import TrackerAgent
+    from crew.pipeline import JobSearchPipeline
+    from schemas.job import Job
+    from schemas.resume import Resume
+    from schemas.score import FitScore
     from storage.db import init_db
 
 # -----------------------------
 # Constants
 # -----------------------------
 API_BASE_URL = "http://127.0.0.1:8000"  # Local dev only
+BACKEND_TIMEOUT_S = 120
 
 
 # -----------------------------
 # Helper Functions
 # -----------------------------
+@st.cache_data(show_spinner=False, max_entries=32)
+def extract_pdf_text(file_hash: str, _data: bytes) -> str:
+    """
+    Extract PDF text, cached by file hash so reruns don't re-parse it.
+    """
+    return _extract_pdf_text(_data)
+
+
 def extract_text_from_file(uploaded_file):
     if uploaded_file is None:
         return ""
 
     if uploaded_file.type == "text/plain":
-        return uploaded_file.read().decode("utf-8")
+        return uploaded_file.getvalue().decode("utf-8")
 
     if uploaded_file.type == "application/pdf" and PdfReader:
-        pdf_reader = PdfReader(io.BytesIO(uploaded_file.read()))
-        return "\n".join(page.extract_text() or "" for page in pdf_reader.pages)
+        data = uploaded_file.getvalue()
+        return extract_pdf_text(hashlib.sha256(data).hexdigest(), data)
 
     st.error("Unsupported file type. Upload TXT or PDF.")
     return ""
 
 
+@st.cache_data(show_spinner=False, max_entries=64)
 def run_pipeline_backend(
     resume_text: str,
     query: str,
     location: Optional[str],
     max_results: int,
-    min_score: int,
 ):
     """
-    Local development → call FastAPI backend
+    Local development → call FastAPI backend. Fetches every job
+    (min_score=0) so that moving the threshold slider only re-filters
+    these results instead of running the pipeline again.
     """
     payload = {
         "resume_text": resume_text,
         "query": query,
         "location": location,
         "max_results": max_results,
-        "min_score": min_score,
+        "min_score": 0,
+        # Leave the backend time to return partial results before the
+        # request itself times out
+        "deadline_ms": (BACKEND_TIMEOUT_S - 10) * 1000,
     }
 
     response = requests.post(
         f"{API_BASE_URL}/run-pipeline",
         json=payload,
-        timeout=120,
+        timeout=BACKEND_TIMEOUT_S,
     )
     response.raise_for_status()
     return response.json()
 
 
-def run_pipeline_inline(
+def filter_by_score(result: dict, min_score: int) -> dict:
+    return {
+        **result,
+        "results": [
+            job for job in result.get("results", [])
+            if job["fit_score"] >= min_score
+        ],
+    }
+
+
+@st.cache_resource(show_spinner=False)
+def get_pipelines():
+    """
+    Agents (and the DB) are created once per server process, not on
+    every rerun.
+    """
+    init_db()
+
+    full = JobSearchPipeline()
+    return {
+        # Scoring only; outreach runs later for jobs above the slider
+        "score": JobSearchPipeline(
+            llm=full.llm,
+            resume_agent=full.resume_agent,
+            discovery_agent=full.discovery_agent,
+            outreach=False,
+            track=False,
+        ),
+        "outreach": full,
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def score_jobs_inline(
     resume_text: str,
     query: str,
     location: Optional[str],
     max_results: int,
-    min_score: int,
 ):
     """
-    Streamlit Cloud → run pipeline in-process
+    Parse, discover and score. Independent of min_score so that moving
+    the threshold slider only re-filters these results.
     """
-    init_db()
+    result = get_pipelines()["score"].run(
+        resume_text, query=query, location=location,
+        max_results=max_results, min_score=0,
+    )
 
-    resume_agent = ResumeAgent()
-    job_agent = JobDiscoveryAgent()
-    matcher_agent = MatcherAgent()
-    outreach_agent = OutreachAgent()
-    tracker_agent = TrackerAgent()
+    return result.resume.model_dump(), [
+        (scored.job.model_dump(), scored.fit.model_dump()) for scored in result.jobs
+    ]
 
-    resume = resume_agent.parse(resume_text)
-    jobs = job_agent.discover(query=query, location=location, max_results=max_results)
-    scored = matcher_agent.score(resume, jobs)
 
-    results = []
+def outreach_inline(resume_data: dict, scored: list) -> list:
+    """
+    Generate and track outreach once per (resume, job, score) in this
+    session. Jobs without a message yet go through the pipeline's
+    outreach and track stages together, so their LLM calls overlap.
+    Returns one message (or None) per job, in order. Failures are shown
+    and not remembered, so the next rerun tries again.
+    """
+    memo = st.session_state.setdefault("outreach_messages", {})
+    resume_key = hashlib.sha256(repr(sorted(resume_data.items())).encode()).hexdigest()
+
+    jobs = [Job.model_validate(job_data) for job_data, _ in scored]
+    fits = [FitScore.model_validate(fit_data) for _, fit_data in scored]
+    keys = [
+        (resume_key, MatcherAgent.job_hash(job), fit.final_score)
+        for job, fit in zip(jobs, fits)
+    ]
+
+    missing = [i for i, key in enumerate(keys) if key not in memo]
+    if missing:
+        try:
+            result = get_pipelines()["outreach"].write_outreach(
+                Resume.model_validate(resume_data),
+                [(jobs[i], fits[i]) for i in missing],
+            )
+        except Exception as e:
+            st.error(f"Outreach generation failed: {e}")
+        else:
+            for i, scored_job in zip(missing, result.jobs):
+                if scored_job.outreach_message:
+                    memo[keys[i]] = scored_job.outreach_message
 
-    for job, score in scored:
-        if score < min_score:
-            continue
+    return [memo.get(key) for key in keys]
 
-        try:
-            message = outreach_agent.generate_message(resume, job, score)
-        except Exception:
-            message = ""
 
-        try:
-            tracker_agent.track(
-                job_id=job.job_id,
-                job_title=job.title,
-                company=job.company,
-                fit_score=score,
-                outreach_message=message,
-            )
-        except Exception:
-            pass
+def run_pipeline_inline(
+    resume_text: str,
+    query: str,
+    location: Optional[str],
+    max_results: int,
+    min_score: int,
+):
+    """
+    Streamlit Cloud → run pipeline in-process
+    """
+    resume_data, scored = score_jobs_inline(
+        resume_text, query, location, max_results
+    )
+    kept = [
+        (job_data, fit_data) for job_data, fit_data in scored
+        if fit_data["final_score"] >= min_score
+    ]
+    messages = outreach_inline(resume_data, kept)
 
+    results = []
+
+    for (job_data, fit_data), message in zip(kept, messages):
         results.append(
             {
-                "job_id": job.job_id,
-                "title": job.title,
-                "company": job.company,
-                "fit_score": score,
+                "job_id": job_data["job_id"],
+                "title": job_data["title"],
+                "company": job_data["company"],
+                "fit_score": fit_data["final_score"],
                 "outreach_message": message,
-                "url": job.url,
+                "url": job_data["url"],
             }
         )
 
@@ -187,36 +268,54 @@ if st.sidebar.button("🚀 Run Job Search", type="primary"):
     elif not query.strip():
         st.error("Please provide a job query.")
     else:
-        with st.spinner("Running job search pipeline..."):
-            try:
-                if DEPLOYED:
-                    result = run_pipeline_inline(
-                        resume_text, query, location or None, max_results, min_score
-                    )
-                else:
-                    result = run_pipeline_backend(
-                        resume_text, query, location or None, max_results, min_score
-                    )
-            except Exception as e:
-                st.error(f"Pipeline failed: {e}")
-                result = None
-
-        if result:
-            results = result.get("results", [])
-            if not results:
-                st.warning("No matching jobs found.")
-            else:
-                st.success(f"Found {len(results)} matching job(s)")
-                for i, job in enumerate(results, 1):
-                    st.subheader(f"{i}. {job['title']} @ {job['company']}")
-                    st.write(f"**Fit Score:** {job['fit_score']}/100")
+        # Remembered across reruns so that widget changes (e.g. the
+        # min score slider) refresh results from cache
+        st.session_state["run_inputs"] = (
+            resume_text, query, location or None, max_results
+        )
 
-                    if job.get("url"):
-                        st.markdown(f"[Apply here]({job['url']})")
+if "run_inputs" in st.session_state:
+    run_inputs = st.session_state["run_inputs"]
 
-                    st.markdown("**Outreach Message**")
+    with st.spinner("Running job search pipeline..."):
+        try:
+            if DEPLOYED:
+                result = run_pipeline_inline(*run_inputs, min_score)
+            else:
+                result = run_pipeline_backend(*run_inputs)
+                if result.get("deadline_exceeded"):
+                    # Partial results: retry in full on the next run
+                    run_pipeline_backend.clear()
+                result = filter_by_score(result, min_score)
+        except Exception as e:
+            st.error(f"Pipeline failed: {e}")
+            result = None
+
+    if result:
+        results = result.get("results", [])
+        if result.get("deadline_exceeded"):
+            st.info("Time ran out before every job finished; showing partial results.")
+
+        if not results:
+            st.warning("No matching jobs found.")
+        else:
+            st.success(f"Found {len(results)} matching job(s)")
+            for i, job in enumerate(results, 1):
+                st.subheader(f"{i}. {job['title']} @ {job['company']}")
+                st.write(f"**Fit Score:** {job['fit_score']}/100")
+
+                if job.get("url"):
+                    st.markdown(f"[Apply here]({job['url']})")
+
+                if job.get("status", "complete") == "timed_out":
+                    st.caption("LLM scoring timed out; showing the embedding score.")
+
+                st.markdown("**Outreach Message**")
+                if job.get("outreach_message"):
                     st.code(job["outreach_message"])
-                    st.divider()
+                else:
+                    st.caption("Not generated in time.")
+                st.divider()
 
 # -----------------------------
 # Footer